@@ -0,0 +1,154 @@
+# append_log.py
+# Group-commit append log — one long-lived handle per file, shared by FlameVault Ledger and RMP Core
+
+"""
+Appends are buffered and written as one batch when the buffer reaches
+`batch_size` lines or is older than `flush_interval_ms`. A background
+thread flushes idle buffers, so an entry reaches the OS within one interval
+even when writes stop. Durability modes, named as in fpt.adapters:
+
+  "per_event"  write and fdatasync every append
+  "group"      write and fdatasync once per batch
+  "none"       write per batch, leave syncing to the OS
+
+append(line, on_commit=fn) calls fn() once the batch holding the line has
+been written (and synced, unless durability is "none"), in append order.
+Anything that must not be seen before the line is durable, such as a
+network broadcast, belongs in that callback.
+
+Use open_append_log() to get the process-wide writer for a path, so every
+component appending to the same file shares one handle and one buffer.
+Each open_append_log() call takes a reference and close() drops one; the
+file is closed when the last holder closes it, or at interpreter exit.
+"""
+
+import os
+import atexit
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+DURABILITY_MODES = ("per_event", "group", "none")
+
+log = logging.getLogger("APPEND_LOG")
+
+_sync = getattr(os, "fdatasync", os.fsync)
+
+class AppendLog:
+    def __init__(self, path: Union[str, Path], durability: str = "group",
+                 batch_size: int = 512, flush_interval_ms: float = 50.0):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.path = Path(path)
+        self.durability = durability
+        self.batch_size = int(batch_size)
+        self.flush_interval_ms = float(flush_interval_ms)
+        self._file = self.path.open("ab")
+        # Re-entrant so an on_commit callback may append to the same log.
+        self._lock = threading.RLock()
+        self._buffer: List[bytes] = []
+        self._callbacks: List[Callable[[], None]] = []
+        self._first_buffered = 0.0
+        self._holders = 1
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_idle, name=f"append-log:{self.path.name}", daemon=True)
+        self._flusher.start()
+        atexit.register(self._close_file)
+
+    def append(self, line: Union[str, bytes], on_commit: Optional[Callable[[], None]] = None) -> None:
+        self.append_many((line,), on_commit=on_commit)
+
+    def append_many(self, lines: Iterable[Union[str, bytes]],
+                    on_commit: Optional[Callable[[], None]] = None) -> None:
+        with self._lock:
+            if self._file is None:
+                raise ValueError(f"append log {self.path} is closed")
+            if not self._buffer:
+                self._first_buffered = time.monotonic()
+            self._buffer.extend(l.encode() if isinstance(l, str) else l for l in lines)
+            if on_commit is not None:
+                self._callbacks.append(on_commit)
+            if (self.durability == "per_event"
+                    or len(self._buffer) >= self.batch_size
+                    or (time.monotonic() - self._first_buffered) * 1000.0 >= self.flush_interval_ms):
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._buffer:
+            return
+        data, self._buffer = b"".join(self._buffer), []
+        callbacks, self._callbacks = self._callbacks, []
+        self._file.write(data)
+        self._file.flush()
+        if self.durability != "none":
+            _sync(self._file.fileno())
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                log.exception(f"on_commit callback failed for {self.path}")
+
+    def _flush_idle(self) -> None:
+        interval = self.flush_interval_ms / 1000.0
+        while not self._closed.wait(interval):
+            with self._lock:
+                if self._file is not None and self._buffer \
+                        and (time.monotonic() - self._first_buffered) >= interval:
+                    self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._flush_locked()
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def close(self) -> None:
+        """Drop one reference; the last holder flushes and closes the file."""
+        with self._lock:
+            if self._file is None:
+                return
+            self._holders -= 1
+            if self._holders > 0:
+                self._flush_locked()
+                return
+        self._close_file()
+
+    def _close_file(self) -> None:
+        self._closed.set()
+        with self._lock:
+            if self._file is None:
+                return
+            self._flush_locked()
+            self._file.close()
+            self._file = None
+        atexit.unregister(self._close_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+_LOGS: Dict[Path, AppendLog] = {}
+_LOGS_LOCK = threading.Lock()
+
+def open_append_log(path: Union[str, Path], durability: Optional[str] = None, **kwargs) -> AppendLog:
+    """
+    Process-wide AppendLog for `path`; settings apply when it is first opened.
+    Each call takes a reference, to be released with close().
+    """
+    key = Path(path).resolve()
+    with _LOGS_LOCK:
+        shared = _LOGS.get(key)
+        if shared is not None:
+            with shared._lock:
+                if shared._file is not None:
+                    shared._holders += 1
+                    return shared
+        shared = _LOGS[key] = AppendLog(path, durability=durability or "group", **kwargs)
+        return shared
@@ -0,0 +1,317 @@
+"""
+benchmarks/bench_fpt.py
+Throughput benchmarks for the canonical fpt package with baseline comparison.
+
+  python benchmarks/bench_fpt.py run [--quick] [--suite projection,adapters] [--out results.json]
+  python benchmarks/bench_fpt.py compare baseline.json results.json [--threshold 0.10]
+  python benchmarks/bench_fpt.py run --baseline baseline.json   # run, then compare
+
+Every metric is a throughput (higher is better), measured as the best of
+`--repeat` runs. compare exits with status 1 when any metric present in both
+files dropped by more than the threshold.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+import numpy as np
+from fpt.algebra.living_zero_core import OwnershipProjector, OwnershipMemory, CA3Dynamics, normalize_rows
+from fpt.algebra.living_zero_projection import OnlineProjectionMemory
+from fpt.runtime.async_dispatch_pipeline import AsyncWorkerPool
+from fpt.events import ProjectionEvent, ProjectionEventBatch
+from fpt.adapters import SovereignLedgerAdapter, TordialManifoldAdapter, SegmentLedgerAdapter
+
+SCHEMA_VERSION = 1
+DENSE_MAX_N = 2048  # dense N x N projectors above this size are impractical to benchmark
+
+
+def _measure(setup: Callable[[], Any], run: Callable[[Any], None], ops: int, repeat: int) -> float:
+    """Best ops/sec over `repeat` runs; setup() builds fresh state outside the timed region."""
+    best = 0.0
+    for _ in range(repeat):
+        state = setup()
+        t0 = time.perf_counter()
+        run(state)
+        elapsed = time.perf_counter() - t0
+        best = max(best, ops / elapsed if elapsed > 0 else float("inf"))
+    return best
+
+
+def _patterns(n: int, N: int, seed: int = 0) -> np.ndarray:
+    return normalize_rows(np.random.default_rng(seed).normal(size=(n, N)))
+
+
+# ---------- Suites ----------
+def bench_projection(sizes: Iterable[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for N in sizes:
+        k = min(32, N // 2)
+        X = _patterns(k, N)
+        cues = _patterns(256, N, seed=1)
+        for storage in ("dense", "factored"):
+            if storage == "dense" and N > DENSE_MAX_N:
+                continue
+            prefix = f"projection.{storage}.N={N}"
+
+            def fresh():
+                return OnlineProjectionMemory(N=N, ownership_projector=OwnershipProjector(N=N), storage=storage)
+
+            def filled():
+                mem = fresh()
+                mem.encode_batch(X, raw_tags=[f"t{i}" for i in range(k)])
+                return mem
+
+            def encode(mem):
+                for i in range(k):
+                    mem.encode(X[i], raw_tag=f"t{i}")
+
+            def recall(mem):
+                for i in range(64):
+                    mem.recall(cues[i])
+
+            def revoke(mem):
+                for i in range(k // 2):
+                    mem.selective_revoke(f"t{i}")
+
+            results[f"{prefix}.encode"] = {"value": _measure(fresh, encode, k, repeat), "unit": "ops/s"}
+            results[f"{prefix}.encode_batch"] = {
+                "value": _measure(fresh, lambda mem: mem.encode_batch(X), k, repeat), "unit": "rows/s"}
+            results[f"{prefix}.recall"] = {"value": _measure(filled, recall, 64, repeat), "unit": "ops/s"}
+            results[f"{prefix}.recall_batch"] = {
+                "value": _measure(filled, lambda mem: mem.recall_batch(cues), cues.shape[0], repeat), "unit": "rows/s"}
+            results[f"{prefix}.revoke"] = {"value": _measure(filled, revoke, k // 2, repeat), "unit": "ops/s"}
+    return results
+
+
+def bench_ownership_memory(sizes: Iterable[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for N in sizes:
+        if N > DENSE_MAX_N:
+            continue
+        k = 32
+        X = _patterns(k, N)
+        tags = [f"owner:{i % 4}" for i in range(k)]
+
+        def fresh():
+            return OwnershipMemory(N=N, ownership_projector=OwnershipProjector(N=N), eta=1e-2)
+
+        def hebb(mem):
+            for i in range(k):
+                mem.encode(X[i], raw_tag=tags[i])
+
+        results[f"ownership_memory.N={N}.hebbian"] = {"value": _measure(fresh, hebb, k, repeat), "unit": "ops/s"}
+        results[f"ownership_memory.N={N}.hebbian_batch"] = {
+            "value": _measure(fresh, lambda mem: mem.encode_batch(X, raw_tags=tags), k, repeat), "unit": "rows/s"}
+    return results
+
+
+def bench_ca3(sizes: Iterable[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for N in sizes:
+        if N > DENSE_MAX_N:
+            continue
+        steps = 200
+        X = _patterns(8, N)
+
+        def setup():
+            mem = OwnershipMemory(N=N, ownership_projector=OwnershipProjector(N=N))
+            mem.encode_batch(X)
+            ca3 = CA3Dynamics(N=N, memory=mem)
+            for pid, p in enumerate(X):
+                ca3.encode_pattern(pid, p)
+            return ca3
+
+        def run(ca3):
+            ca3.simulate(X[0], steps)
+
+        results[f"ca3.N={N}.steps"] = {"value": _measure(setup, run, steps, repeat), "unit": "steps/s"}
+    return results
+
+
+def _noop_handler(payload: Dict[str, Any]) -> float:
+    return float(np.dot(payload["v"], payload["v"]))
+
+
+def bench_pool(worker_counts: Iterable[int], repeat: int, tasks: int = 2000) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    v = np.ones(64)
+
+    async def run_pool(workers: int) -> None:
+        pool = AsyncWorkerPool(num_workers=workers, max_queue_size=1000)
+        await pool.start(handler=_noop_handler)
+        futures = await pool.submit_batch([{"id": f"b{i}", "v": v} for i in range(tasks)])
+        await asyncio.gather(*futures)
+        await pool.shutdown()
+
+    for workers in worker_counts:
+        value = _measure(lambda: None, lambda _: asyncio.run(run_pool(workers)), tasks, repeat)
+        results[f"pool.workers={workers}.tasks"] = {"value": value, "unit": "tasks/s"}
+    return results
+
+
+def bench_adapters(repeat: int, rows: int = 5000) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    events = [
+        ProjectionEvent(timestamp_ns=i, vector_dim=64, projection_norm=1.0, shadow_energy=0.0,
+                        action="encode", task_id=f"task_{i}", metadata={"i": i})
+        for i in range(rows)
+    ]
+    batch = ProjectionEventBatch.from_events(events)
+    cases = {
+        "sovereign.per_event": (lambda d: SovereignLedgerAdapter(os.path.join(d, "s.db")), 500),
+        "sovereign.group": (lambda d: SovereignLedgerAdapter(os.path.join(d, "s.db"), durability="group"), rows),
+        "sovereign.chained": (lambda d: SovereignLedgerAdapter(os.path.join(d, "s.db"), durability="group",
+                                                               chained=True), rows),
+        "tordial.group": (lambda d: TordialManifoldAdapter(os.path.join(d, "t.db"), durability="group"), rows),
+        "segment.group": (lambda d: SegmentLedgerAdapter(os.path.join(d, "seg"), durability="group"), rows),
+    }
+    for name, (make, n) in cases.items():
+        for mode in ("events", "batch"):
+            if mode == "batch" and name.endswith("per_event"):
+                continue
+
+            def run(tmp):
+                with make(tmp.name) as adapter:
+                    if mode == "batch":
+                        adapter.on_projection_batch(batch)
+                    else:
+                        for ev in events[:n]:
+                            adapter.on_projection(ev)
+
+            value = _measure(tempfile.TemporaryDirectory, run, n if mode == "events" else rows, repeat)
+            results[f"adapters.{name}.{mode}"] = {"value": value, "unit": "rows/s"}
+    return results
+
+
+SUITES = ("projection", "ownership_memory", "ca3", "pool", "adapters")
+
+
+def machine_info() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(__file__), timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "git_commit": commit,
+    }
+
+
+def run_suites(suites: Iterable[str], quick: bool = False, repeat: int = 3) -> Dict[str, Any]:
+    sizes = (64, 256, 1024) if quick else (64, 256, 1024, 4096, 8192)
+    workers = (1, 4) if quick else (1, 2, 4, 8)
+    results: Dict[str, Dict[str, Any]] = {}
+    for suite in suites:
+        t0 = time.perf_counter()
+        if suite == "projection":
+            results.update(bench_projection(sizes, repeat))
+        elif suite == "ownership_memory":
+            results.update(bench_ownership_memory(sizes, repeat))
+        elif suite == "ca3":
+            results.update(bench_ca3(sizes, repeat))
+        elif suite == "pool":
+            results.update(bench_pool(workers, repeat))
+        elif suite == "adapters":
+            results.update(bench_adapters(repeat))
+        else:
+            raise ValueError(f"Unknown suite: {suite}")
+        print(f"[*] {suite}: {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+    return {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "quick": quick,
+        "machine": machine_info(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = 0.10) -> List[Dict[str, Any]]:
+    """Per-metric comparison rows; `regression` is set when current < baseline * (1 - threshold)."""
+    rows = []
+    for name, base in sorted(baseline["results"].items()):
+        cur = current["results"].get(name)
+        if cur is None:
+            continue
+        ratio = cur["value"] / base["value"] if base["value"] else float("inf")
+        rows.append({"metric": name, "baseline": base["value"], "current": cur["value"],
+                     "unit": cur.get("unit", ""), "ratio": ratio, "regression": ratio < 1.0 - threshold})
+    return rows
+
+
+def print_results(report: Dict[str, Any]) -> None:
+    print(f"{'Metric':<52} | {'Throughput':>14} | Unit")
+    print("-" * 78)
+    for name, r in report["results"].items():
+        print(f"{name:<52} | {r['value']:>14.1f} | {r['unit']}")
+
+
+def print_comparison(rows: List[Dict[str, Any]], baseline: Dict[str, Any], current: Dict[str, Any]) -> int:
+    if baseline.get("machine", {}).get("platform") != current.get("machine", {}).get("platform"):
+        print("[!] Warning: baseline was recorded on a different platform.")
+    print(f"{'Metric':<52} | {'Baseline':>12} | {'Current':>12} | {'Change':>8}")
+    print("-" * 94)
+    regressions = 0
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        regressions += row["regression"]
+        print(f"{row['metric']:<52} | {row['baseline']:>12.1f} | {row['current']:>12.1f} | "
+              f"{(row['ratio'] - 1.0) * 100:>+7.1f}%{flag}")
+    print(f"[{'-' if regressions else '+'}] {regressions} regression(s) across {len(rows)} metrics.")
+    return 1 if regressions else 0
+
+
+def _load(path: str) -> Dict[str, Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="fpt throughput benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_p = sub.add_parser("run", help="run benchmark suites and emit JSON")
+    run_p.add_argument("--suite", default=",".join(SUITES), help="comma-separated subset of " + ", ".join(SUITES))
+    run_p.add_argument("--quick", action="store_true", help="smaller sizes for CI smoke runs")
+    run_p.add_argument("--repeat", type=int, default=3)
+    run_p.add_argument("--out", help="write results JSON here (default: stdout table only)")
+    run_p.add_argument("--baseline", help="compare against this results JSON after running")
+    run_p.add_argument("--threshold", type=float, default=0.10)
+    cmp_p = sub.add_parser("compare", help="compare two results files")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current")
+    cmp_p.add_argument("--threshold", type=float, default=0.10)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        baseline, current = _load(args.baseline), _load(args.current)
+        return print_comparison(compare(baseline, current, args.threshold), baseline, current)
+
+    report = run_suites([s for s in args.suite.split(",") if s], quick=args.quick, repeat=args.repeat)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    print_results(report)
+    if args.baseline:
+        baseline = _load(args.baseline)
+        return print_comparison(compare(baseline, report, args.threshold), baseline, report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
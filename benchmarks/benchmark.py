@@ -1,53 +1,121 @@
 """
 benchmarks/benchmark.py
 Comparative benchmark evaluating Hebbian vs. Projection Rule capacity and invariant stability.
+
+The projection rule W = X^T (X X^T)^+ X is the orthogonal projector onto the
+pattern span, so it is kept factored as Q Q^T (Q from a reduced QR of X^T)
+and never materialized. Recall, band checks and the spectral radius estimate
+all run against the factored operator, which keeps sweeps to N = 16k and
+P up to the 0.138 N capacity limit practical.
+
+  python benchmarks/benchmark.py --N 4096 --jobs 4
+  python benchmarks/benchmark.py --N 16384 --P 256,1024,2260 --jobs 3
 """
+from __future__ import annotations
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
 import numpy as np
-from living_zero_core import OwnershipProjector, OwnershipMemory, MemoryBand, normalize
-from living_zero_diagnostics import audit_memory_state
+from fpt.algebra.living_zero_core import OwnershipProjector, MemoryBand, normalize_rows
+from fpt.algebra.living_zero_projection import OnlineProjectionMemory
 
-def evaluate_capacity_scaling(N: int = 512, d: int = 64, P_list: list[int] = [10, 25, 50, 75, 100], seed: int = 42):
-    rng = np.random.RandomState(seed)
-    band = MemoryBand()
-    print(f"{'P':<6} | {'Projection Sim':<16} | {'In-Band':<10} | {'Spectral Radius':<16}")
-    print("-" * 56)
 
-    for P in P_list:
-        X = np.array([normalize(rng.normal(size=(N,))) for _ in range(P)])
-        W_proj = X.T @ np.linalg.pinv(X @ X.T) @ X
+class LowRankProjector:
+    """The projector Q Q^T applied as two skinny GEMMs; supports `W @ M`."""
+    def __init__(self, Q: np.ndarray):
+        self.Q = Q
+        self.shape = (Q.shape[0], Q.shape[0])
 
-        sims, in_band = [], []
-        for p in X:
-            cue = normalize(p + 0.3 * normalize(rng.normal(size=(N,))))
-            rec = normalize(W_proj @ cue)
-            sims.append(float(np.dot(rec, p)))
-            in_band.append(band.check_state(rec, p, W_proj)["in_angular_band"])
+    def __matmul__(self, M: np.ndarray) -> np.ndarray:
+        return self.Q @ (self.Q.T @ M)
 
-        spec_rad = float(np.max(np.abs(np.linalg.eigvals(W_proj))))
-        print(f"{P:<6} | {np.mean(sims):<16.4f} | {np.mean(in_band)*100:<9.1f}% | {spec_rad:<16.4f}")
 
-if __name__ == "__main__":
-    evaluate_capacity_scaling()
+def spectral_radius(W, N: int, iters: int = 100, tol: float = 1e-8, seed: int = 0) -> float:
+    """Power-iteration estimate of the spectral radius of a symmetric operator W."""
+    v = normalize_rows(np.random.default_rng(seed).normal(size=(1, N)))[0]
+    lam = 0.0
+    for _ in range(iters):
+        w = W @ v
+        norm = float(np.linalg.norm(w))
+        if norm == 0.0:
+            return 0.0
+        v = w / norm
+        if abs(norm - lam) <= tol * max(norm, 1.0):
+            return norm
+        lam = norm
+    return lam
+
+
+def _capacity_point(N: int, P: int, seed: int, noise: float = 0.3) -> dict:
+    rng = np.random.default_rng([seed, P])
+    X = normalize_rows(rng.normal(size=(P, N)))
+    Q, _ = np.linalg.qr(X.T, mode="reduced")
+    W_proj = LowRankProjector(Q)
+
+    cues = normalize_rows(X + noise * normalize_rows(rng.normal(size=(P, N))))
+    rec = normalize_rows((W_proj @ cues.T).T)
+    sims = np.einsum("ij,ij->i", rec, X)
+    checks = MemoryBand().check_states(rec, X, W_proj)
+    return {
+        "P": P,
+        "similarity": float(sims.mean()),
+        "in_band": float(checks["in_angular_band"].mean()),
+        "spectral_radius": spectral_radius(W_proj, N, seed=seed),
+    }
 
-def evaluate_revocation_scaling(N: int = 512, d: int = 64, P: int = 50, n_revoke: int = 10):
-    from living_zero_projection import OnlineProjectionMemory
+
+def evaluate_capacity_scaling(N: int = 512, d: int = 64, P_list=None, seed: int = 42, jobs: int = 1) -> list:
+    if P_list is None:
+        P_list = [10, 25, 50, 75, 100] if N <= 512 else list(np.linspace(0.01, MemoryBand().alpha_capacity, 6) * N)
+    P_list = [int(P) for P in P_list]
+    if jobs > 1 and len(P_list) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rows = list(pool.map(_capacity_point, [N] * len(P_list), P_list, [seed] * len(P_list)))
+    else:
+        rows = [_capacity_point(N, P, seed) for P in P_list]
+
+    print(f"{'P':<6} | {'Projection Sim':<16} | {'In-Band':<10} | {'Spectral Radius':<16}")
+    print("-" * 56)
+    for r in rows:
+        print(f"{r['P']:<6} | {r['similarity']:<16.4f} | {r['in_band']*100:<9.1f}% | {r['spectral_radius']:<16.4f}")
+    return rows
+
+
+def evaluate_revocation_scaling(N: int = 512, d: int = 64, P: int = 50, n_revoke: int = 10) -> dict:
     rng = np.random.RandomState(42)
     O = OwnershipProjector(N=N, d=d, seed=42)
-    mem = OnlineProjectionMemory(N=N, ownership_projector=O)
-
-    patterns = [normalize(rng.normal(size=(N,))) for _ in range(P)]
-    for i, p in enumerate(patterns):
-        mem.encode(p, raw_tag=f"owner:{i}")
+    mem = OnlineProjectionMemory(N=N, ownership_projector=O, storage="factored")
 
+    patterns = normalize_rows(rng.normal(size=(P, N)))
+    mem.encode_batch(patterns, raw_tags=[f"owner:{i}" for i in range(P)])
     for i in range(n_revoke):
         mem.selective_revoke(f"owner:{i}")
 
-    revoked_sims = [float(np.dot(mem.recall(patterns[i]), patterns[i])) for i in range(n_revoke)]
-    retained_sims = [float(np.dot(mem.recall(patterns[i]), patterns[i])) for i in range(n_revoke, P)]
+    sims = np.einsum("ij,ij->i", mem.recall_batch(patterns), patterns)
+    result = {"revoked": float(sims[:n_revoke].mean()), "retained": float(sims[n_revoke:].mean())}
 
     print(f"Revocation Benchmark (Total={P}, Revoked={n_revoke}):")
-    print(f"  Mean Revoked Target Similarity:  {np.mean(revoked_sims):.4f}")
-    print(f"  Mean Retained Target Similarity: {np.mean(retained_sims):.4f}")
+    print(f"  Mean Revoked Target Similarity:  {result['revoked']:.4f}")
+    print(f"  Mean Retained Target Similarity: {result['retained']:.4f}")
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Projection-rule capacity and revocation sweeps")
+    parser.add_argument("--N", type=int, default=512)
+    parser.add_argument("--d", type=int, default=64)
+    parser.add_argument("--P", help="comma-separated pattern counts (default: up to 0.138 N)")
+    parser.add_argument("--jobs", type=int, default=1, help="processes to spread P values across")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--revoke-P", type=int, default=50)
+    parser.add_argument("--n-revoke", type=int, default=10)
+    args = parser.parse_args()
 
-if __name__ == '__main__':
-    evaluate_revocation_scaling()
+    P_list = [int(p) for p in args.P.split(",")] if args.P else None
+    evaluate_capacity_scaling(N=args.N, d=args.d, P_list=P_list, seed=args.seed, jobs=args.jobs)
+    print()
+    evaluate_revocation_scaling(N=args.N, d=args.d, P=args.revoke_P, n_revoke=args.n_revoke)
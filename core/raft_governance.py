@@ -1,6 +1,7 @@
 import os
 import json
 import time
+import asyncio
 import threading
 from typing import List, Dict, Any, Optional, Tuple
 
@@ -72,17 +73,33 @@ class DeterministicStateMachine:
         }
 
 class RaftEngine:
-    def __init__(self, node_id: str, peers: List[str], storage_dir: str = "raft_storage", max_log_window: int = 1000):
+    """
+    Replicated log for the governance state machine.
+
+    The log is a contiguous list behind the snapshot: entry `index` lives at
+    self.log[index - snapshot_base - 1], so lookups, conflict truncation and
+    state machine application are O(1) per entry. Followers take batches of
+    up to `max_batch` entries per AppendEntries; the leader drives
+    replication through a pluggable transport (see core.raft_transport) whose
+    `send(peer, message)` coroutine delivers a message to the peer's
+    handle_rpc() and returns its reply.
+    """
+    def __init__(self, node_id: str, peers: List[str], storage_dir: str = "raft_storage", max_log_window: int = 1000,
+                 transport: Optional[Any] = None, max_batch: int = 512):
         self.node_id = node_id
         self.peers = peers
         self.storage_dir = storage_dir
         self.max_log_window = max_log_window
+        self.max_batch = max_batch
+        self.transport = transport
         os.makedirs(storage_dir, exist_ok=True)
 
         self.current_term: int = 0
         self.voted_for: Optional[str] = None
         self.log: List[RaftLogEntry] = []
-        
+        self.snapshot_base: int = 0
+        self.snapshot_term: int = 0
+
         self.commit_index: int = 0
         self.last_applied: int = 0
 
@@ -92,49 +109,93 @@ class RaftEngine:
 
         self.state_machine = DeterministicStateMachine()
         self._lock = threading.RLock()
-        
+        self._round: Optional["asyncio.Future"] = None
+
         self.log_file = os.path.join(self.storage_dir, "wal.jsonl")
         self.snapshot_file = os.path.join(self.storage_dir, "snapshot.json")
         self._recover_state()
+        if transport is not None:
+            transport.register(self)
+
+    # ---------- Log indexing ----------
+    @property
+    def last_log_index(self) -> int:
+        return self.snapshot_base + len(self.log)
+
+    def _entry(self, index: int) -> Optional[RaftLogEntry]:
+        pos = index - self.snapshot_base - 1
+        return self.log[pos] if 0 <= pos < len(self.log) else None
+
+    def _term_at(self, index: int) -> Optional[int]:
+        if index == self.snapshot_base:
+            return self.snapshot_term
+        entry = self._entry(index)
+        return entry.term if entry is not None else None
+
+    def _truncate_from(self, index: int):
+        del self.log[index - self.snapshot_base - 1:]
+
+    # ---------- Persistence ----------
+    def _restore_snapshot(self, snap: Dict[str, Any]):
+        self.current_term = max(self.current_term, snap.get("term", 0))
+        self.snapshot_base = self.last_applied = snap.get("last_included_index", 0)
+        self.snapshot_term = snap.get("last_included_term", snap.get("term", 0))
+        self.commit_index = max(self.commit_index, self.last_applied)
+        sm_data = snap.get("state_machine", {})
+        self.state_machine.cycle_id = sm_data.get("cycle_id", 0)
+        self.state_machine.frequency_hz = sm_data.get("frequency_hz", 79.0)
+        self.state_machine.r_chase = sm_data.get("r_chase", 1.9427)
+        self.state_machine.phase_vector = sm_data.get("phase_vector", [0.0] * 6)
+        self.state_machine.damping_coefficients = sm_data.get("damping_coefficients", {})
+        self.state_machine.signer_root = sm_data.get("signer_root", "99733-Q")
+        self.state_machine.safety_tripped = sm_data.get("safety_tripped", False)
+        self.state_machine.last_applied_index = self.last_applied
 
     def _recover_state(self):
         with self._lock:
             if os.path.exists(self.snapshot_file):
                 with open(self.snapshot_file, "r") as f:
-                    snap = json.load(f)
-                    self.current_term = snap.get("term", 0)
-                    self.last_applied = snap.get("last_included_index", 0)
-                    self.commit_index = self.last_applied
-                    sm_data = snap.get("state_machine", {})
-                    self.state_machine.cycle_id = sm_data.get("cycle_id", 0)
-                    self.state_machine.frequency_hz = sm_data.get("frequency_hz", 79.0)
-                    self.state_machine.r_chase = sm_data.get("r_chase", 1.9427)
-                    self.state_machine.phase_vector = sm_data.get("phase_vector", [0.0] * 6)
-                    self.state_machine.damping_coefficients = sm_data.get("damping_coefficients", {})
-                    self.state_machine.signer_root = sm_data.get("signer_root", "99733-Q")
-                    self.state_machine.last_applied_index = self.last_applied
+                    self._restore_snapshot(json.load(f))
 
             if os.path.exists(self.log_file):
                 with open(self.log_file, "r") as f:
                     for line in f:
                         if line.strip():
                             entry = RaftLogEntry.from_dict(json.loads(line))
+                            if entry.index <= self.snapshot_base or entry.index > self.last_log_index + 1:
+                                continue
+                            if entry.index <= self.last_log_index:
+                                # A later record for the same index overwrote a conflicting entry.
+                                self._truncate_from(entry.index)
                             self.log.append(entry)
-                            if entry.index > self.last_applied:
-                                self.state_machine.apply(entry)
-                                self.last_applied = entry.index
-                                self.commit_index = entry.index
-                                self.current_term = max(self.current_term, entry.term)
+                            self.current_term = max(self.current_term, entry.term)
+                # Recovered entries are treated as committed, as before.
+                self.commit_index = max(self.commit_index, self.last_log_index)
+                self._apply_to_state_machine()
 
     def _persist_entry(self, entry: RaftLogEntry):
+        self._persist_entries([entry])
+
+    def _persist_entries(self, entries: List[RaftLogEntry]):
         with open(self.log_file, "a") as f:
-            f.write(json.dumps(entry.to_dict()) + "\n")
+            f.write("".join(json.dumps(e.to_dict()) + "\n" for e in entries))
+
+    def _rewrite_log(self):
+        tmp = self.log_file + ".tmp"
+        with open(tmp, "w") as f:
+            f.write("".join(json.dumps(e.to_dict()) + "\n" for e in self.log))
+        os.replace(tmp, self.log_file)
+
+    def _write_snapshot(self, snapshot: Dict[str, Any]):
+        tmp = self.snapshot_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(tmp, self.snapshot_file)
 
     def propose(self, command_type: str, payload: Dict[str, Any], signature: str = "") -> Optional[RaftLogEntry]:
         with self._lock:
-            last_index = self.log[-1].index if self.log else self.last_applied
             new_entry = RaftLogEntry(
-                index=last_index + 1,
+                index=self.last_log_index + 1,
                 term=self.current_term,
                 timestamp_ns=time.time_ns(),
                 command_type=command_type,
@@ -147,6 +208,7 @@ class RaftEngine:
             self._try_advance_commit()
             return new_entry
 
+    # ---------- Follower RPCs ----------
     def handle_append_entries(
         self, term: int, leader_id: str, prev_log_index: int,
         prev_log_term: int, entries: List[Dict[str, Any]], leader_commit: int
@@ -159,71 +221,188 @@ class RaftEngine:
                 self.current_term = term
                 self.voted_for = None
 
-            if prev_log_index > 0:
-                matching_entry = None
-                for e in self.log:
-                    if e.index == prev_log_index:
-                        matching_entry = e
-                        break
-                if prev_log_index > self.last_applied and (not matching_entry or matching_entry.term != prev_log_term):
-                    return False, self.current_term
-
-            for raw in entries:
-                entry = RaftLogEntry.from_dict(raw)
-                existing = [e for e in self.log if e.index == entry.index]
-                if existing and existing[0].term != entry.term:
-                    idx = self.log.index(existing[0])
-                    self.log = self.log[:idx]
-                if not any(e.index == entry.index for e in self.log):
-                    self.log.append(entry)
-                    self._persist_entry(entry)
+            if prev_log_index > self.last_log_index:
+                return False, self.current_term
+            if prev_log_index > self.snapshot_base and self._term_at(prev_log_index) != prev_log_term:
+                return False, self.current_term
+
+            appended: List[RaftLogEntry] = []
+            truncated = False
+            for offset, raw in enumerate(entries):
+                index = prev_log_index + 1 + offset
+                if index <= self.snapshot_base:
+                    continue
+                existing = self._entry(index)
+                if existing is not None:
+                    if existing.term == raw["term"]:
+                        continue
+                    self._truncate_from(index)
+                    truncated = True
+                appended = [RaftLogEntry.from_dict(r) for r in entries[offset:]]
+                self.log.extend(appended)
+                break
+            if truncated:
+                self._rewrite_log()
+            elif appended:
+                self._persist_entries(appended)
 
             if leader_commit > self.commit_index:
-                last_new_index = self.log[-1].index if self.log else self.last_applied
-                self.commit_index = min(leader_commit, last_new_index)
+                last_new_index = prev_log_index + len(entries)
+                self.commit_index = max(self.commit_index, min(leader_commit, last_new_index))
                 self._apply_to_state_machine()
 
             return True, self.current_term
 
+    def handle_install_snapshot(self, term: int, leader_id: str, snapshot: Dict[str, Any]) -> int:
+        """Replace state with the leader's snapshot when the entries we need were compacted away."""
+        with self._lock:
+            if term < self.current_term:
+                return self.current_term
+            self.current_term = term
+            last_included = snapshot.get("last_included_index", 0)
+            if last_included <= self.commit_index:
+                return self.current_term
+            tail = self._entry(last_included)
+            keep = [e for e in self.log if e.index > last_included] \
+                if tail is not None and tail.term == snapshot.get("last_included_term") else []
+            self._restore_snapshot(snapshot)
+            self.log = keep
+            self._write_snapshot(snapshot)
+            self._rewrite_log()
+            return self.current_term
+
+    def handle_rpc(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Transport entry point: dispatch a request dict and return the reply dict."""
+        kind = message.get("type")
+        if kind == "append_entries":
+            success, term = self.handle_append_entries(
+                message["term"], message["leader_id"], message["prev_log_index"],
+                message["prev_log_term"], message["entries"], message["leader_commit"],
+            )
+            return {"success": success, "term": term, "last_index": self.last_log_index}
+        if kind == "install_snapshot":
+            term = self.handle_install_snapshot(message["term"], message["leader_id"], message["snapshot"])
+            return {"term": term, "last_index": self.last_log_index}
+        raise ValueError(f"Unknown raft message type: {kind}")
+
+    # ---------- Leader replication ----------
+    def _append_request(self, peer: str) -> Dict[str, Any]:
+        with self._lock:
+            next_index = max(self.next_index.get(peer, 1), 1)
+            if next_index <= self.snapshot_base:
+                return {"type": "install_snapshot", "term": self.current_term, "leader_id": self.node_id,
+                        "snapshot": self._snapshot_data()}
+            prev = next_index - 1
+            pos = next_index - self.snapshot_base - 1
+            return {
+                "type": "append_entries",
+                "term": self.current_term,
+                "leader_id": self.node_id,
+                "prev_log_index": prev,
+                "prev_log_term": self._term_at(prev) or 0,
+                "entries": [e.to_dict() for e in self.log[pos:pos + self.max_batch]],
+                "leader_commit": self.commit_index,
+            }
+
+    def _handle_reply(self, peer: str, request: Dict[str, Any], reply: Dict[str, Any]) -> bool:
+        """Fold one follower reply into next/match index; True if the peer is caught up."""
+        with self._lock:
+            if reply["term"] > self.current_term:
+                self.current_term = reply["term"]
+                self.voted_for = None
+                return True
+            if request["type"] == "install_snapshot":
+                match = request["snapshot"]["last_included_index"]
+            elif reply["success"]:
+                match = request["prev_log_index"] + len(request["entries"])
+            else:
+                # Jump straight back to the follower's log end instead of stepping one index at a time.
+                self.next_index[peer] = max(1, min(request["prev_log_index"], reply["last_index"] + 1))
+                return False
+            self.match_index[peer] = max(self.match_index.get(peer, 0), match)
+            self.next_index[peer] = self.match_index[peer] + 1
+            self._try_advance_commit()
+            return self.match_index[peer] >= self.last_log_index
+
+    async def _replicate_to(self, peer: str):
+        for _ in range(64):
+            request = self._append_request(peer)
+            try:
+                reply = await self.transport.send(peer, request)
+            except (ConnectionError, OSError, asyncio.TimeoutError):
+                return
+            if reply is None or self._handle_reply(peer, request, reply):
+                return
+
+    async def replicate(self) -> int:
+        """One replication round to every peer; returns the commit index afterwards."""
+        if self.transport is None:
+            raise ValueError("RaftEngine has no transport to replicate over")
+        await asyncio.gather(*(self._replicate_to(p) for p in self.peers if p != self.node_id))
+        return self.commit_index
+
+    async def replicate_until(self, index: int, retry_interval_s: float = 0.05):
+        """
+        Wait until `index` commits. Callers share replication rounds, so
+        entries proposed while a round is in flight go out together in the
+        next one (group commit).
+        """
+        while self.commit_index < index:
+            if self._round is None or self._round.done():
+                self._round = asyncio.ensure_future(self.replicate())
+                before = self.commit_index
+                await asyncio.shield(self._round)
+                if self.commit_index == before and self.commit_index < index:
+                    await asyncio.sleep(retry_interval_s)
+            else:
+                await asyncio.shield(self._round)
+
+    async def submit(self, command_type: str, payload: Dict[str, Any], signature: str = "") -> RaftLogEntry:
+        """Propose on this (leader) node and return once the entry is committed."""
+        entry = self.propose(command_type, payload, signature)
+        await self.replicate_until(entry.index)
+        return entry
+
+    # ---------- Commit & apply ----------
     def _try_advance_commit(self):
         if not self.log:
             return
-        match_values = sorted(self.match_index.values())
-        majority_idx = len(self.peers) // 2
-        median_match = match_values[majority_idx]
+        # Highest index replicated on a majority of the nodes tracked in match_index.
+        match_values = sorted(self.match_index.values(), reverse=True)
+        majority_match = match_values[len(match_values) // 2]
 
-        if median_match > self.commit_index:
-            for entry in reversed(self.log):
-                if entry.index == median_match and entry.term == self.current_term:
-                    self.commit_index = median_match
-                    self._apply_to_state_machine()
-                    break
+        if majority_match > self.commit_index and self._term_at(majority_match) == self.current_term:
+            self.commit_index = majority_match
+            self._apply_to_state_machine()
 
     def _apply_to_state_machine(self):
         while self.last_applied < self.commit_index:
+            entry = self._entry(self.last_applied + 1)
+            if entry is None:
+                break
+            self.state_machine.apply(entry)
             self.last_applied += 1
-            for entry in self.log:
-                if entry.index == self.last_applied:
-                    self.state_machine.apply(entry)
-                    break
 
         if len(self.log) > self.max_log_window:
             self.compact_log()
 
+    def _snapshot_data(self) -> Dict[str, Any]:
+        return {
+            "last_included_index": self.last_applied,
+            "last_included_term": self._term_at(self.last_applied) or 0,
+            "term": self.current_term,
+            "timestamp_ns": time.time_ns(),
+            "state_machine": self.state_machine.get_runtime_snapshot()
+        }
+
     def compact_log(self):
         with self._lock:
-            if not self.log:
+            if not self.log or self.last_applied <= self.snapshot_base:
                 return
-            snapshot_data = {
-                "last_included_index": self.last_applied,
-                "term": self.current_term,
-                "timestamp_ns": time.time_ns(),
-                "state_machine": self.state_machine.get_runtime_snapshot()
-            }
-            with open(self.snapshot_file, "w") as f:
-                json.dump(snapshot_data, f, indent=2)
+            snapshot_data = self._snapshot_data()
+            self._write_snapshot(snapshot_data)
 
-            self.log = [e for e in self.log if e.index > self.last_applied]
-            with open(self.log_file, "w") as f:
-                for entry in self.log:
-                    f.write(json.dumps(entry.to_dict()) + "\n")
+            del self.log[:self.last_applied - self.snapshot_base]
+            self.snapshot_base = self.last_applied
+            self.snapshot_term = snapshot_data["last_included_term"]
+            self._rewrite_log()
@@ -0,0 +1,142 @@
+"""
+Transports for core.raft_governance.RaftEngine.
+
+A transport delivers a request dict to the named peer's RaftEngine.handle_rpc()
+and returns the reply dict:
+
+  await transport.send(peer_id, message) -> reply
+
+InProcessTransport is a hub shared by every engine in one process, for tests
+and local benchmarks. AsyncTCPTransport gives each node a server and keeps one
+persistent connection per peer, framing each JSON message with a 4-byte
+big-endian length.
+"""
+import asyncio
+import json
+import struct
+from typing import Any, Dict, Optional, Tuple
+
+_FRAME = struct.Struct(">I")
+
+
+class RaftTransport:
+    def register(self, engine) -> None:
+        raise NotImplementedError
+
+    async def send(self, peer: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        pass
+
+
+class InProcessTransport(RaftTransport):
+    """Delivers messages by direct call; `latency_s` adds a simulated one-way network delay."""
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.engines: Dict[str, Any] = {}
+        self.down: set = set()
+
+    def register(self, engine) -> None:
+        self.engines[engine.node_id] = engine
+
+    async def send(self, peer: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if peer in self.down or peer not in self.engines:
+            raise ConnectionError(f"peer {peer} unreachable")
+        # Round-trip through JSON so in-process runs see the same payloads as TCP.
+        message = json.loads(json.dumps(message))
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        reply = self.engines[peer].handle_rpc(message)
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        else:
+            await asyncio.sleep(0)
+        return reply
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    (size,) = _FRAME.unpack(await reader.readexactly(_FRAME.size))
+    return json.loads(await reader.readexactly(size))
+
+
+def _frame(message: Dict[str, Any]) -> bytes:
+    body = json.dumps(message, separators=(",", ":")).encode()
+    return _FRAME.pack(len(body)) + body
+
+
+class AsyncTCPTransport(RaftTransport):
+    """
+    One instance per node: serves `host:port` for the local engine and sends
+    to peers listed in `addresses` ({node_id: (host, port)}). Requests to a
+    peer are serialized over one connection, which is reopened on failure.
+    """
+
+    def __init__(self, host: str, port: int, addresses: Dict[str, Tuple[str, int]], timeout_s: float = 1.0):
+        self.host = host
+        self.port = port
+        self.addresses = addresses
+        self.timeout_s = timeout_s
+        self.engine = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._conns: Dict[str, Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._handlers: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def register(self, engine) -> None:
+        self.engine = engine
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        if self.port == 0:
+            self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while True:
+                message = await _read_frame(reader)
+                writer.write(_frame(self.engine.handle_rpc(message)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._handlers.pop(task, None)
+            writer.close()
+
+    async def _connection(self, peer: str) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        conn = self._conns.get(peer)
+        if conn is None or conn[1].is_closing():
+            host, port = self.addresses[peer]
+            conn = self._conns[peer] = await asyncio.wait_for(asyncio.open_connection(host, port), self.timeout_s)
+        return conn
+
+    async def send(self, peer: str, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        lock = self._locks.setdefault(peer, asyncio.Lock())
+        async with lock:
+            try:
+                reader, writer = await self._connection(peer)
+                writer.write(_frame(message))
+                await writer.drain()
+                return await asyncio.wait_for(_read_frame(reader), self.timeout_s)
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, OSError):
+                conn = self._conns.pop(peer, None)
+                if conn is not None:
+                    conn[1].close()
+                raise ConnectionError(f"peer {peer} unreachable")
+
+    async def close(self) -> None:
+        for _, writer in self._conns.values():
+            writer.close()
+        self._conns.clear()
+        if self._server is not None:
+            self._server.close()
+            # Closing the server side of each connection ends its handler with EOF.
+            handlers = list(self._handlers.items())
+            for _, writer in handlers:
+                writer.close()
+            await asyncio.gather(*(task for task, _ in handlers), return_exceptions=True)
+            await self._server.wait_closed()
+            self._server = None
@@ -4,17 +4,23 @@
 # Root: Vadzaih Zhoo, 99733
 # Fuel: Spruce Plastolene | Seal: 79Hz | Proof: FlameLockV2 | Orbit: SSC
 
+import os
 import json
+import atexit
 import time
 import hashlib
+import itertools
 import logging
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 from dataclasses import dataclass
 import numpy as np
 
 # Local modules
 from rmp_core import sign_receipt, verify_receipt
+from append_log import open_append_log
 from flame_lock_v2_proof import FlameLockV2
 from orbital_relay import OrbitalRelay
 
@@ -26,6 +32,9 @@ LEDGER_PATH = Path("flamevault_ledger.jsonl")
 LEDGER_PATH.touch(exist_ok=True)
 MERKLE_PATH = Path("flamevault_merkle.json")
 MERKLE_PATH.touch(exist_ok=True)
+FRONTIER_PATH = Path("flamevault_merkle_frontier.json")
+CHECKPOINT_PATH = Path("flamevault_verify_checkpoint.json")
+VERIFY_PARALLEL_MIN_CHUNKS = 4   # fewer chunks than this verify serially unless workers is given
 
 logging.basicConfig(
     level=logging.INFO,
@@ -72,47 +81,165 @@ class LedgerEntry:
 # MERKLE TREE
 # =============================================================================
 
-class MerkleTree:
-    def __init__(self, leaves: List[str]):
-        self.leaves = [hashlib.sha256(l.encode()).hexdigest() for l in leaves]
-        self.root = self._build_tree()
-
-    def _build_tree(self) -> str:
-        if not self.leaves:
+class MerkleFrontier:
+    """
+    Append-only Merkle accumulator (Merkle mountain range frontier).
+
+    Keeps one perfect-subtree root per set bit of the leaf count, so append
+    and root are O(log n). Nodes use the ledger's original hex scheme,
+    sha256(hex(left) + hex(right)) with an odd last node paired with itself
+    and sha256(b"genesis") for the empty tree. Every entry chains its
+    merkle_root, so this stays on that scheme rather than fpt.merkle's
+    RFC 6962 trees to keep existing ledgers verifiable.
+    """
+    def __init__(self, size: int = 0, peaks: Optional[List[Optional[str]]] = None):
+        self.size = size
+        self.peaks: List[Optional[str]] = list(peaks or [])
+
+    @staticmethod
+    def _node(left: str, right: str) -> str:
+        return hashlib.sha256((left + right).encode()).hexdigest()
+
+    def append(self, leaf: str) -> None:
+        self.append_hash(hashlib.sha256(leaf.encode()).hexdigest())
+
+    def append_hash(self, node: str) -> None:
+        """Append a leaf that is already hashed (hex)."""
+        h = 0
+        while h < len(self.peaks) and self.peaks[h] is not None:
+            node = self._node(self.peaks[h], node)
+            self.peaks[h] = None
+            h += 1
+        if h == len(self.peaks):
+            self.peaks.append(node)
+        else:
+            self.peaks[h] = node
+        self.size += 1
+
+    def root(self) -> str:
+        n = self.size
+        if n == 0:
             return hashlib.sha256(b"genesis").hexdigest()
-        nodes = self.leaves[:]
-        while len(nodes) > 1:
-            new_level = []
-            for i in range(0, len(nodes), 2):
-                left = nodes[i]
-                right = nodes[i + 1] if i + 1 < len(nodes) else left
-                new_level.append(hashlib.sha256((left + right).encode()).hexdigest())
-            nodes = new_level
-        return nodes[0]
+        low = (n & -n).bit_length() - 1         # smallest peak is the rightmost node
+        node, h = self.peaks[low], low
+        while (1 << h) < n:                     # more than one node left at level h
+            if h > low and (n >> h) & 1:
+                node = self._node(self.peaks[h], node)
+            else:
+                node = self._node(node, node)   # odd count: last node pairs with itself
+            h += 1
+        return node
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"size": self.size, "peaks": self.peaks}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "MerkleFrontier":
+        return cls(size=int(state["size"]), peaks=state["peaks"])
+
+# =============================================================================
+# STREAMING VERIFICATION
+# =============================================================================
+
+def _iter_chunks(path: Path, offset: int, lineno: int, chunk_lines: int) -> Iterator[Dict[str, Any]]:
+    """Yield runs of up to chunk_lines non-blank lines with their byte offsets."""
+    with path.open("rb") as f:
+        f.seek(offset)
+        lines: List[Tuple[int, bytes]] = []
+        last_offset = offset
+        for line in f:
+            if line.strip():
+                lines.append((lineno, line))
+                last_offset = offset
+            offset += len(line)
+            lineno += 1
+            if len(lines) >= chunk_lines:
+                yield {"lines": lines, "end": offset, "next_line": lineno, "last_offset": last_offset}
+                lines = []
+        if lines:
+            yield {"lines": lines, "end": offset, "next_line": lineno, "last_offset": last_offset}
+
+def _check_chunk(lines: List[Tuple[int, bytes]]) -> List[Tuple[int, Optional[str], Optional[str], Optional[str], bool]]:
+    """Parse and re-hash one chunk: (line, prev_hash, merkle_root, leaf hash, receipt ok) per entry."""
+    out = []
+    for i, line in lines:
+        try:
+            entry = json.loads(line)
+            leaf = hashlib.sha256(json.dumps(entry["data"], sort_keys=True).encode()).hexdigest()
+            out.append((i, entry["prev_hash"], entry["merkle_root"], leaf,
+                        verify_receipt(entry, entry["rmp_receipt"])))
+        except (ValueError, KeyError, TypeError):
+            out.append((i, None, None, None, False))
+    return out
 
 # =============================================================================
 # FLAMEVAULT LEDGER CORE
 # =============================================================================
 
 class FlameVaultLedger:
-    def __init__(self):
-        self.entries: List[LedgerEntry] = []
-        self.merkle_leaves: List[str] = []
+    def __init__(self, durability: str = "group", snapshot_every: int = 1024):
+        # Entries go through a group-commit log; the frontier and MERKLE_PATH
+        # snapshot are rewritten every `snapshot_every` entries and on flush().
+        self.log = open_append_log(LEDGER_PATH, durability=durability)
+        self.snapshot_every = int(snapshot_every)
+        self._closed = False
+        self._unsnapshotted = 0
+        self.size = 0
+        self.head: Optional[LedgerEntry] = None
+        self.merkle_leaves: deque = deque(maxlen=10)   # recent leaves for the MERKLE_PATH snapshot
+        self.frontier = MerkleFrontier()
         self.flamelock = FlameLockV2()
         self.orbital = OrbitalRelay()
         self._load_ledger()
+        atexit.register(self.flush)
         log.info("FLAMEVAULT LEDGER INITIALIZED — IMMUTABLE")
 
     def _load_ledger(self):
         if not LEDGER_PATH.exists():
             self._write_genesis()
             return
+        # Stream the file: only the head entry and a few recent leaves stay in
+        # memory. Leaves past the persisted frontier are folded in on the way.
+        frontier, last = self._read_frontier(), None
+        trusted = frontier.size
+        for entry in self._iter_entries():
+            self.size += 1
+            last = entry
+            leaf = json.dumps(entry["data"], sort_keys=True)
+            self.merkle_leaves.append(leaf)
+            if frontier is None:
+                continue
+            if self.size > trusted:
+                frontier.append(leaf)
+            elif self.size == trusted and frontier.root() != entry["merkle_root"]:
+                frontier = None
+        self.head = LedgerEntry(**last) if last is not None else None
+        rebuilt = frontier is None or frontier.size != self.size
+        if rebuilt:
+            frontier = MerkleFrontier()
+            for entry in self._iter_entries():
+                frontier.append(json.dumps(entry["data"], sort_keys=True))
+            log.info(f"MERKLE FRONTIER REBUILT — {frontier.size} LEAVES")
+        self.frontier = frontier
+        if rebuilt or frontier.size != trusted:
+            self._save_frontier(frontier)
+
+    def _iter_entries(self) -> Iterator[Dict[str, Any]]:
         with LEDGER_PATH.open() as f:
             for line in f:
                 if line.strip():
-                    entry = json.loads(line)
-                    self.entries.append(LedgerEntry(**entry))
-                    self.merkle_leaves.append(json.dumps(entry["data"], sort_keys=True))
+                    yield json.loads(line)
+
+    def _read_frontier(self) -> MerkleFrontier:
+        try:
+            return MerkleFrontier.from_dict(json.loads(FRONTIER_PATH.read_text()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return MerkleFrontier()
+
+    def _save_frontier(self, frontier: MerkleFrontier):
+        tmp = FRONTIER_PATH.with_suffix(".tmp")
+        tmp.write_text(json.dumps(frontier.to_dict()))
+        os.replace(tmp, FRONTIER_PATH)
 
     def _write_genesis(self):
         genesis = {
@@ -128,7 +255,7 @@ class FlameVaultLedger:
         self._append_entry(genesis)
 
     def _get_prev_hash(self) -> str:
-        return "0" * 64 if not self.entries else self.entries[-1].merkle_root
+        return "0" * 64 if self.head is None else self.head.merkle_root
 
     def _generate_toft_seal(self) -> str:
         t = np.linspace(0, 0.1266, 5567)
@@ -136,7 +263,7 @@ class FlameVaultLedger:
         return hashlib.sha256(pulse.tobytes()).hexdigest()[:32]
 
     def _append_entry(self, event: Dict[str, Any]):
-        index = len(self.entries)
+        index = self.size
         prev_hash = self._get_prev_hash()
         toft_seal = self._generate_toft_seal()
 
@@ -148,10 +275,11 @@ class FlameVaultLedger:
         }
         rmp_receipt = sign_receipt(receipt_data)
 
-        # Merkle root
-        self.merkle_leaves.append(json.dumps(event["data"], sort_keys=True))
-        merkle = MerkleTree(self.merkle_leaves)
-        merkle_root = merkle.root
+        # Merkle root — O(log n) frontier update instead of a full tree rebuild
+        leaf = json.dumps(event["data"], sort_keys=True)
+        self.merkle_leaves.append(leaf)
+        self.frontier.append(leaf)
+        merkle_root = self.frontier.root()
 
         # Create entry
         entry = LedgerEntry(
@@ -169,14 +297,16 @@ class FlameVaultLedger:
 
         # Append to ledger
         line = entry.to_jsonl()
-        LEDGER_PATH.open("a").write(line)
-        self.entries.append(entry)
+        # Broadcast once the line is committed, so the mesh never sees an
+        # index that a crash could still drop from the ledger file.
+        self.log.append(line, on_commit=lambda: self._broadcast_entry(entry))
+        self.size += 1
+        self.head = entry
 
         # Save merkle
-        MERKLE_PATH.write_text(json.dumps({"root": merkle_root, "leaves": self.merkle_leaves[-10:]}, indent=2))
-
-        # Broadcast
-        self._broadcast_entry(entry)
+        self._unsnapshotted += 1
+        if self._unsnapshotted >= self.snapshot_every:
+            self.flush()
 
         log.info(f"LEDGER ENTRY {index} — {event['event_type']} — SEALED")
 
@@ -198,28 +328,114 @@ class FlameVaultLedger:
         event = {"event_type": event_type, "data": data}
         self._append_entry(event)
 
-    def verify_ledger(self) -> bool:
-        prev_hash = "0" * 64
-        leaves = []
-        with LEDGER_PATH.open() as f:
-            for i, line in enumerate(f):
-                if not line.strip(): continue
-                entry = json.loads(line)
-                if entry["prev_hash"] != prev_hash:
+    def flush(self):
+        """Commit buffered entries, then snapshot the frontier and MERKLE_PATH."""
+        self.log.flush()
+        if self._unsnapshotted:
+            self._save_frontier(self.frontier)
+            MERKLE_PATH.write_text(json.dumps({"root": self.frontier.root(), "leaves": list(self.merkle_leaves)}, indent=2))
+            self._unsnapshotted = 0
+
+    def close(self):
+        """Flush and release this ledger's reference to the shared append log."""
+        if self._closed:
+            return
+        self.flush()
+        self._closed = True
+        self.log.close()
+        atexit.unregister(self.flush)
+
+    def verify_ledger(self, workers: Optional[int] = None, chunk_lines: int = 4096, resume: bool = True) -> bool:
+        """
+        Stream-verify the ledger: prev_hash links and Merkle roots in order,
+        leaf hashing and RMP receipts on a process pool one chunk at a time.
+
+        After each verified chunk its end offset, chain head and frontier go
+        to CHECKPOINT_PATH; with resume=True the next run re-checks the last
+        checkpointed line and verifies only what follows it. With workers
+        unset, a pool of os.cpu_count() processes is used only when at least
+        VERIFY_PARALLEL_MIN_CHUNKS chunks remain.
+        """
+        self.log.flush()
+        prev_hash, frontier, offset, lineno = "0" * 64, MerkleFrontier(), 0, 0
+        state = self._load_checkpoint() if resume else None
+        if state is not None:
+            if not self._checkpoint_matches(state):
+                log.error(f"LEDGER CHANGED BEFORE VERIFIED CHECKPOINT AT INDEX {state['next_line'] - 1}")
+                return False
+            prev_hash, frontier = state["prev_hash"], MerkleFrontier.from_dict(state["frontier"])
+            offset, lineno = state["offset"], state["next_line"]
+
+        chunks = _iter_chunks(LEDGER_PATH, offset, lineno, chunk_lines)
+        if workers is None:
+            head = list(itertools.islice(chunks, VERIFY_PARALLEL_MIN_CHUNKS))
+            chunks = itertools.chain(head, chunks)
+            workers = (os.cpu_count() or 1) if len(head) >= VERIFY_PARALLEL_MIN_CHUNKS else 1
+        if workers == 1:
+            results = ((chunk, _check_chunk(chunk["lines"])) for chunk in chunks)
+            return self._verify_results(results, prev_hash, frontier)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Keep a bounded window of chunks in flight; results are consumed in file order.
+            def in_order():
+                pending = deque()
+                for chunk in chunks:
+                    pending.append((chunk, pool.submit(_check_chunk, chunk["lines"])))
+                    if len(pending) >= 2 * workers:
+                        chunk, fut = pending.popleft()
+                        yield chunk, fut.result()
+                while pending:
+                    chunk, fut = pending.popleft()
+                    yield chunk, fut.result()
+            ok = self._verify_results(in_order(), prev_hash, frontier)
+            if not ok:
+                pool.shutdown(cancel_futures=True)
+            return ok
+
+    def _verify_results(self, results, prev_hash: str, frontier: MerkleFrontier) -> bool:
+        for chunk, rows in results:
+            for i, entry_prev, entry_root, leaf, receipt_ok in rows:
+                if entry_prev is None or entry_prev != prev_hash:
                     log.error(f"LEDGER CORRUPTED AT INDEX {i}")
                     return False
-                leaves.append(json.dumps(entry["data"], sort_keys=True))
-                if not verify_receipt(entry, entry["rmp_receipt"]):
+                frontier.append_hash(leaf)
+                if frontier.root() != entry_root:
+                    log.error(f"MERKLE ROOT MISMATCH AT INDEX {i}")
+                    return False
+                if not receipt_ok:
                     log.error(f"INVALID RMP RECEIPT AT INDEX {i}")
                     return False
-                prev_hash = entry["merkle_root"]
-        merkle = MerkleTree(leaves)
-        if merkle.root != prev_hash:
-            log.error("MERKLE ROOT MISMATCH")
-            return False
+                prev_hash = entry_root
+            last_line = chunk["lines"][-1][1]
+            self._save_checkpoint({
+                "offset": chunk["end"],
+                "next_line": chunk["next_line"],
+                "last_offset": chunk["last_offset"],
+                "last_sha256": hashlib.sha256(last_line).hexdigest(),
+                "prev_hash": prev_hash,
+                "frontier": frontier.to_dict(),
+            })
         log.info("FLAMEVAULT LEDGER VERIFIED — IMMUTABLE")
         return True
 
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(CHECKPOINT_PATH.read_text())
+        except (OSError, ValueError):
+            return None
+
+    def _checkpoint_matches(self, state: Dict[str, Any]) -> bool:
+        """The last checkpointed line must still be where it was, unchanged."""
+        with LEDGER_PATH.open("rb") as f:
+            f.seek(state["last_offset"])
+            line = f.readline()
+        return (state["last_offset"] + len(line) <= state["offset"]
+                and hashlib.sha256(line).hexdigest() == state["last_sha256"])
+
+    def _save_checkpoint(self, state: Dict[str, Any]):
+        tmp = CHECKPOINT_PATH.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, CHECKPOINT_PATH)
+
 # =============================================================================
 # RUN
 # =============================================================================
@@ -164,6 +164,11 @@ from enum import Enum
 from datetime import datetime, timezone
 import hmac
 import secrets
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "src"))
+from fpt.merkle import MerkleTree as RawMerkleTree, hash_leaf, hash_node
 
 # Try to import cryptographic libraries
 try:
@@ -277,77 +282,51 @@ class SSCReceipt:
 
 
 class MerkleTree:
-    """Merkle tree for efficient verification of orbital state chains"""
+    """
+    Merkle tree for efficient verification of orbital state chains.
+
+    Hex-string facade over fpt.merkle (RFC 6962, raw SHA-256 digests); leaves
+    are state hash strings and roots/proof hashes are returned as hex.
+    """
     
     def __init__(self, leaves: List[str]):
         self.leaves = leaves
-        self.tree = self._build_tree(leaves)
-    
-    @staticmethod
-    def _hash_pair(left: str, right: str) -> str:
-        """Hash a pair of nodes"""
-        combined = left + right
-        return hashlib.sha256(combined.encode()).hexdigest()
-    
-    def _build_tree(self, nodes: List[str]) -> List[List[str]]:
-        """Build complete Merkle tree"""
-        if not nodes:
-            return []
-        
-        tree = [nodes]
-        while len(tree[-1]) > 1:
-            level = tree[-1]
-            next_level = []
-            
-            for i in range(0, len(level), 2):
-                left = level[i]
-                right = level[i + 1] if i + 1 < len(level) else level[i]
-                next_level.append(self._hash_pair(left, right))
-            
-            tree.append(next_level)
-        
-        return tree
+        self.tree = RawMerkleTree(leaves)
     
     def get_root(self) -> str:
         """Get Merkle root"""
-        return self.tree[-1][0] if self.tree else ""
+        return self.tree.root.hex() if self.leaves else ""
     
     def get_proof(self, index: int) -> List[Tuple[str, bool]]:
         """
         Get Merkle proof for leaf at index.
         Returns list of (hash, is_right) tuples.
         """
-        if index >= len(self.leaves):
+        if not 0 <= index < len(self.leaves):
             return []
         
-        proof = []
-        for level in self.tree[:-1]:
-            if index % 2 == 0:
-                # Left node, need right sibling
-                sibling_idx = index + 1
-                is_right = True
-            else:
-                # Right node, need left sibling
-                sibling_idx = index - 1
-                is_right = False
-            
-            if sibling_idx < len(level):
-                proof.append((level[sibling_idx], is_right))
-            
+        proof = self.tree.inclusion_proof(index)
+        # The audit path skips levels where the node has no sibling; record
+        # which side each remaining sibling sits on.
+        sides = []
+        width = len(self.leaves)
+        while width > 1:
+            if index ^ 1 < width:
+                sides.append(index % 2 == 0)
             index //= 2
-        
-        return proof
+            width = (width + 1) // 2
+        return [(sibling.hex(), is_right) for sibling, is_right in zip(proof, sides)]
     
     @staticmethod
     def verify_proof(leaf: str, proof: List[Tuple[str, bool]], root: str) -> bool:
         """Verify Merkle proof"""
-        current = leaf
+        current = hash_leaf(leaf)
         for sibling, is_right in proof:
             if is_right:
-                current = MerkleTree._hash_pair(current, sibling)
+                current = hash_node(current, bytes.fromhex(sibling))
             else:
-                current = MerkleTree._hash_pair(sibling, current)
-        return current == root
+                current = hash_node(bytes.fromhex(sibling), current)
+        return current.hex() == root
 
 
 class SSCVerifier:
@@ -18,6 +18,9 @@ from pathlib import Path
 from ecdsa import SigningKey, VerifyingKey, SECP256k1
 from ecdsa.util import sigencode_der, sigdecode_der
 
+# Local modules
+from append_log import open_append_log
+
 # =============================================================================
 # CONFIGURATION — SOVEREIGN ROOT
 # =============================================================================
@@ -157,7 +160,8 @@ class RMPPacket:
         return json.dumps(data, separators=(',', ':')) + "\n"
 
 class RMPCore:
-    def __init__(self):
+    def __init__(self, log_durability: str = "group"):
+        self.mesh_log = open_append_log(RMP_LOG_PATH, durability=log_durability)
         self.neighbors: Dict[str, dict] = {}
         self.local_glyphs: List[str] = []
         self.meta_glyphs: List[str] = []
@@ -199,7 +203,7 @@ class RMPCore:
             }
 
             # Log to mesh
-            RMP_LOG_PATH.open("a").write(json.dumps(packet) + "\n")
+            self.mesh_log.append(json.dumps(packet) + "\n")
 
             # Propagate if high resonance
             if packet["intensity_S"] > 0.7:
@@ -253,7 +257,7 @@ class RMPCore:
 
     def _broadcast(self, packet: RMPPacket):
         line = packet.to_jsonl()
-        RMP_LOG_PATH.open("a").write(line)
+        self.mesh_log.append(line)
         self.udp_sock.sendto(line.encode(), ('<broadcast>', 7979))
         log.info(f"RMP BROADCAST → {packet.scrape_id} | S={packet.intensity_S:.3f}")
 
@@ -6,16 +6,20 @@ from __future__ import annotations
 
 __version__ = "0.1.0"
 
-from .events import ProjectionEvent, EventDispatcher
-from .adapters import SovereignLedgerAdapter, TordialManifoldAdapter
+from .events import ProjectionEvent, ProjectionEventBatch, EventDispatcher, QueuedEventDispatcher
+from .adapters import SovereignLedgerAdapter, TordialManifoldAdapter, SegmentLedgerAdapter
+from .ledger_reader import LedgerReader, SegmentLedgerReader
 
 # Canonical algebra & memory dynamics
 from .algebra.living_zero_core import (
     normalize,
+    normalize_rows,
     OwnershipEncoder,
     OwnershipProjector,
     OwnershipMemory,
     CA3Dynamics,
+    CA3Ensemble,
+    MemoryBand,
     demo_small_run,
 )
 from .algebra.living_zero_projection import OnlineProjectionMemory
@@ -23,21 +27,34 @@ from .algebra.living_zero_projection import OnlineProjectionMemory
 # Canonical runtime & worker services
 from .runtime.async_dispatch_pipeline import AsyncWorkerPool, ProcessingTask
 from .runtime.async_projection_service import AsyncProjectionService
+from .runtime.dead_letter import DeadLetterError, RingBufferDLQ, SegmentFileDLQ, SQLiteDLQ
 
 __all__ = [
     "__version__",
     "ProjectionEvent",
+    "ProjectionEventBatch",
     "EventDispatcher",
+    "QueuedEventDispatcher",
     "SovereignLedgerAdapter",
     "TordialManifoldAdapter",
+    "SegmentLedgerAdapter",
+    "LedgerReader",
+    "SegmentLedgerReader",
     "normalize",
+    "normalize_rows",
     "OwnershipEncoder",
     "OwnershipProjector",
     "OwnershipMemory",
     "CA3Dynamics",
+    "CA3Ensemble",
+    "MemoryBand",
     "OnlineProjectionMemory",
     "AsyncWorkerPool",
     "ProcessingTask",
     "AsyncProjectionService",
+    "DeadLetterError",
+    "RingBufferDLQ",
+    "SegmentFileDLQ",
+    "SQLiteDLQ",
     "demo_small_run",
 ]
@@ -1,92 +1,710 @@
 """
 fpt.adapters
 SQLite persistence adapters implementing the LedgerListener protocol.
+
+Each adapter keeps one long-lived WAL connection. Rows are buffered and
+written with executemany according to the durability policy:
+
+  "per_event"  commit after every event, synchronous=FULL (default)
+  "group"      group commit every `batch_size` rows or `flush_interval_ms`,
+               synchronous=NORMAL
+  "none"       group commit with synchronous=OFF (no fsync)
+
+In the group modes a background thread commits a partial batch once it is
+`flush_interval_ms` old, even if no further events arrive, and open adapters
+are flushed and closed at interpreter exit. flush() commits immediately.
+on_projection_batch() writes a whole ProjectionEventBatch from its columns
+(one commit per batch under "per_event").
+
+Secondary indexes are added by numbered schema migrations (SCHEMA_MIGRATIONS),
+applied in order when an adapter opens a database; the applied version per
+table is recorded in the `schema_version` table. Use fpt.ledger_reader for
+indexed queries.
+
+SovereignLedgerAdapter(chained=True) hash-chains projection_records and
+writes Merkle checkpoints; see fpt.ledger_chain for the format and verifier.
+
+SegmentLedgerAdapter is a non-SQL alternative: fixed-width binary records in
+rolling segment files (read with fpt.ledger_reader.SegmentLedgerReader).
 """
 from __future__ import annotations
+import atexit
+import os
 import sqlite3
 import json
-from typing import Optional
-from .events import ProjectionEvent, LedgerListener
+import struct
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from .events import ProjectionEvent, ProjectionEventBatch, LedgerListener
+from .ledger_chain import GENESIS_HASH, chain_hash
+from .merkle import merkle_root
+
+DURABILITY_MODES = {"per_event": "FULL", "group": "NORMAL", "none": "OFF"}
+
+# Ordered migrations per table; version n is SCHEMA_MIGRATIONS[table][n - 1].
+SCHEMA_MIGRATIONS = {
+    "projection_records": [
+        (
+            "CREATE INDEX IF NOT EXISTS idx_projection_records_task_id ON projection_records (task_id)",
+            "CREATE INDEX IF NOT EXISTS idx_projection_records_timestamp ON projection_records (timestamp_ns)",
+            "CREATE INDEX IF NOT EXISTS idx_projection_records_action ON projection_records (action, timestamp_ns)",
+        ),
+        (
+            "ALTER TABLE projection_records ADD COLUMN prev_hash BLOB",
+            "ALTER TABLE projection_records ADD COLUMN row_hash BLOB",
+            """CREATE TABLE IF NOT EXISTS ledger_checkpoints (
+                seq INTEGER PRIMARY KEY,
+                first_id INTEGER NOT NULL,
+                last_id INTEGER NOT NULL,
+                row_count INTEGER NOT NULL,
+                merkle_root BLOB NOT NULL,
+                chain_head BLOB NOT NULL,
+                created_ns INTEGER NOT NULL
+            )""",
+        ),
+    ],
+    "manifold_telemetry": [
+        (
+            "CREATE INDEX IF NOT EXISTS idx_manifold_telemetry_timestamp ON manifold_telemetry (timestamp_ns)",
+        ),
+    ],
+}
+
+
+# Adapters still open at interpreter exit; weak, so dropped adapters are not kept alive.
+_OPEN_ADAPTERS: "weakref.WeakSet" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_open_adapters() -> None:
+    for adapter in list(_OPEN_ADAPTERS):
+        adapter.close()
+
+
+def _start_idle_flusher(adapter, stop: threading.Event, name: str) -> threading.Thread:
+    """Daemon thread calling adapter._flush_if_idle() every flush interval until `stop` is set."""
+    ref = weakref.ref(adapter)
+    interval = adapter.flush_interval_ms / 1000.0
+
+    def run() -> None:
+        while not stop.wait(interval):
+            target = ref()
+            if target is None:
+                return
+            target._flush_if_idle(interval)
+            del target
+
+    thread = threading.Thread(target=run, daemon=True, name=name)
+    thread.start()
+    return thread
+
+
+def migrate_schema(conn: sqlite3.Connection, table: str) -> int:
+    """Apply pending SCHEMA_MIGRATIONS for `table`; returns the resulting schema version."""
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (table_name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+    row = conn.execute("SELECT version FROM schema_version WHERE table_name = ?", (table,)).fetchone()
+    version = row[0] if row else 0
+    steps = SCHEMA_MIGRATIONS.get(table, [])
+    for target in range(version + 1, len(steps) + 1):
+        with conn:
+            for statement in steps[target - 1]:
+                conn.execute(statement)
+            conn.execute("INSERT OR REPLACE INTO schema_version (table_name, version) VALUES (?, ?)", (table, target))
+        version = target
+    return version
+
 
+class _BatchedSQLiteWriter:
+    """Shared connection, buffering and group-commit logic for the SQLite adapters."""
+    insert_sql: str = ""
 
-class SovereignLedgerAdapter(LedgerListener):
-    """Persists projection transactions and operator signatures to sovereign_ledger.db."""
-    def __init__(self, db_path: str = "sovereign_ledger.db"):
+    def __init__(
+        self,
+        db_path: str,
+        durability: str = "per_event",
+        batch_size: int = 1000,
+        flush_interval_ms: float = 50.0,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
         self.db_path = db_path
+        self.durability = durability
+        self.batch_size = int(batch_size)
+        self.flush_interval_ms = float(flush_interval_ms)
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={DURABILITY_MODES[durability]}")
+        self._lock = threading.Lock()
+        self._buffer: List[Tuple[Any, ...]] = []
+        self._last_flush = time.monotonic()
         self._init_db()
+        self._closed = threading.Event()
+        if durability != "per_event":
+            self._flusher = _start_idle_flusher(self, self._closed, f"ledger-flush:{type(self).__name__}")
+        _OPEN_ADAPTERS.add(self)
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS projection_records (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id TEXT,
-                    timestamp_ns INTEGER,
-                    vector_dim INTEGER,
-                    projection_norm REAL,
-                    shadow_energy REAL,
-                    action TEXT,
-                    operator_signature TEXT,
-                    metadata_json TEXT
-                )
-            """)
-            conn.commit()
+        raise NotImplementedError
+
+    def _row(self, event: ProjectionEvent) -> Tuple[Any, ...]:
+        raise NotImplementedError
+
+    def _rows(self, batch: ProjectionEventBatch) -> List[Tuple[Any, ...]]:
+        raise NotImplementedError
+
+    def _seal_rows(self, rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+        """Hook run under the writer lock before rows are buffered."""
+        return rows
+
+    def _write_rows(self, rows: List[Tuple[Any, ...]]) -> None:
+        with self._lock:
+            if self._conn is None:
+                raise ValueError(f"{type(self).__name__} is closed")
+            self._buffer.extend(self._seal_rows(rows))
+            if (self.durability == "per_event"
+                    or len(self._buffer) >= self.batch_size
+                    or (time.monotonic() - self._last_flush) * 1000.0 >= self.flush_interval_ms):
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._buffer:
+            self._insert_locked(self._buffer)
+            self._conn.commit()
+            self._buffer.clear()
+        self._last_flush = time.monotonic()
+
+    def _insert_locked(self, rows: List[Tuple[Any, ...]]) -> None:
+        self._conn.executemany(self.insert_sql, rows)
+
+    def _flush_if_idle(self, interval: float) -> None:
+        with self._lock:
+            if self._conn is not None and self._buffer \
+                    and time.monotonic() - self._last_flush >= interval:
+                self._flush_locked()
 
     def on_projection(self, event: ProjectionEvent) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT INTO projection_records (
-                    task_id, timestamp_ns, vector_dim, projection_norm,
-                    shadow_energy, action, operator_signature, metadata_json
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (
-                    event.task_id,
-                    event.timestamp_ns,
-                    event.vector_dim,
-                    event.projection_norm,
-                    event.shadow_energy,
-                    event.action,
-                    event.operator_signature,
-                    json.dumps(event.metadata),
-                )
+        self._write_rows([self._row(event)])
+
+    def on_projection_batch(self, batch: ProjectionEventBatch) -> None:
+        self._write_rows(self._rows(batch))
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        self._closed.set()
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
+        _OPEN_ADAPTERS.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SovereignLedgerAdapter(_BatchedSQLiteWriter, LedgerListener):
+    """
+    Persists projection transactions and operator signatures to sovereign_ledger.db.
+
+    With chained=True each row is linked by prev_hash/row_hash and a Merkle
+    checkpoint is written every `checkpoint_every` rows. Chained mode assigns
+    row ids itself and assumes it is the only writer to the ledger.
+    """
+    insert_sql = """
+        INSERT INTO projection_records (
+            task_id, timestamp_ns, vector_dim, projection_norm,
+            shadow_energy, action, operator_signature, metadata_json
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    chained_insert_sql = """
+        INSERT INTO projection_records (
+            id, task_id, timestamp_ns, vector_dim, projection_norm,
+            shadow_energy, action, operator_signature, metadata_json,
+            prev_hash, row_hash
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    checkpoint_sql = """
+        INSERT INTO ledger_checkpoints (
+            seq, first_id, last_id, row_count, merkle_root, chain_head, created_ns
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+    """
+
+    def __init__(
+        self,
+        db_path: str = "sovereign_ledger.db",
+        durability: str = "per_event",
+        batch_size: int = 1000,
+        flush_interval_ms: float = 50.0,
+        chained: bool = False,
+        checkpoint_every: int = 1024,
+    ):
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be positive")
+        self.chained = chained
+        self.checkpoint_every = int(checkpoint_every)
+        super().__init__(db_path, durability=durability, batch_size=batch_size,
+                         flush_interval_ms=flush_interval_ms)
+
+    def _init_db(self):
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS projection_records (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id TEXT,
+                timestamp_ns INTEGER,
+                vector_dim INTEGER,
+                projection_norm REAL,
+                shadow_energy REAL,
+                action TEXT,
+                operator_signature TEXT,
+                metadata_json TEXT
             )
-            conn.commit()
+        """)
+        self._conn.commit()
+        migrate_schema(self._conn, "projection_records")
+        if self.chained:
+            self._load_chain_state()
+
+    def _load_chain_state(self) -> None:
+        self.insert_sql = self.chained_insert_sql
+        self._pending_checkpoints: List[Tuple[Any, ...]] = []
+        self._next_id = (self._conn.execute("SELECT MAX(id) FROM projection_records").fetchone()[0] or 0) + 1
+        last = self._conn.execute(
+            "SELECT seq, last_id, chain_head FROM ledger_checkpoints ORDER BY seq DESC LIMIT 1").fetchone()
+        self._checkpoint_seq, after_id = (last[0] + 1, last[1]) if last else (0, 0)
+        # Row hashes since the last checkpoint feed the next Merkle root.
+        segment = self._conn.execute(
+            "SELECT id, row_hash FROM projection_records WHERE id > ? AND row_hash IS NOT NULL ORDER BY id",
+            (after_id,)).fetchall()
+        self._segment_ids = [r[0] for r in segment[:1]]
+        self._segment_hashes = [r[1] for r in segment]
+        if segment:
+            self._chain_head = segment[-1][1]
+        else:
+            self._chain_head = last[2] if last else GENESIS_HASH
 
+    def _seal_rows(self, rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+        if not self.chained:
+            return rows
+        sealed = []
+        for row in rows:
+            row_id, prev = self._next_id, self._chain_head
+            h = chain_hash(prev, row)
+            sealed.append((row_id, *row, prev, h))
+            self._next_id += 1
+            self._chain_head = h
+            if not self._segment_hashes:
+                self._segment_ids = [row_id]
+            self._segment_hashes.append(h)
+            if len(self._segment_hashes) == self.checkpoint_every:
+                self._pending_checkpoints.append((
+                    self._checkpoint_seq, self._segment_ids[0], row_id, len(self._segment_hashes),
+                    merkle_root(self._segment_hashes), h, time.time_ns(),
+                ))
+                self._checkpoint_seq += 1
+                self._segment_hashes = []
+        return sealed
 
-class TordialManifoldAdapter(LedgerListener):
+    def _insert_locked(self, rows: List[Tuple[Any, ...]]) -> None:
+        super()._insert_locked(rows)
+        if self.chained and self._pending_checkpoints:
+            self._conn.executemany(self.checkpoint_sql, self._pending_checkpoints)
+            self._pending_checkpoints.clear()
+
+    def _row(self, event: ProjectionEvent) -> Tuple[Any, ...]:
+        return (
+            event.task_id,
+            event.timestamp_ns,
+            event.vector_dim,
+            event.projection_norm,
+            event.shadow_energy,
+            event.action,
+            event.operator_signature,
+            json.dumps(event.metadata),
+        )
+
+    def _rows(self, batch: ProjectionEventBatch) -> List[Tuple[Any, ...]]:
+        return list(zip(
+            batch.task_id_column(),
+            batch.timestamp_ns.tolist(),
+            batch.vector_dim.tolist(),
+            batch.projection_norm.tolist(),
+            batch.shadow_energy.tolist(),
+            batch.action_column(),
+            batch.signature_column(),
+            batch.metadata_json_column(),
+        ))
+
+
+class TordialManifoldAdapter(_BatchedSQLiteWriter, LedgerListener):
     """Persists manifold state vectors and telemetry metrics to tordial_manifold.db."""
-    def __init__(self, db_path: str = "tordial_manifold.db"):
-        self.db_path = db_path
-        self._init_db()
+    insert_sql = """
+        INSERT INTO manifold_telemetry (
+            timestamp_ns, vector_dim, norm, residual_energy
+        ) VALUES (?, ?, ?, ?)
+    """
+
+    def __init__(
+        self,
+        db_path: str = "tordial_manifold.db",
+        durability: str = "per_event",
+        batch_size: int = 1000,
+        flush_interval_ms: float = 50.0,
+    ):
+        super().__init__(db_path, durability=durability, batch_size=batch_size,
+                         flush_interval_ms=flush_interval_ms)
 
     def _init_db(self):
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS manifold_telemetry (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    timestamp_ns INTEGER,
-                    vector_dim INTEGER,
-                    norm REAL,
-                    residual_energy REAL
-                )
-            """)
-            conn.commit()
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS manifold_telemetry (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp_ns INTEGER,
+                vector_dim INTEGER,
+                norm REAL,
+                residual_energy REAL
+            )
+        """)
+        self._conn.commit()
+        migrate_schema(self._conn, "manifold_telemetry")
+
+    def _row(self, event: ProjectionEvent) -> Tuple[Any, ...]:
+        return (
+            event.timestamp_ns,
+            event.vector_dim,
+            event.projection_norm,
+            event.shadow_energy,
+        )
+
+    def _rows(self, batch: ProjectionEventBatch) -> List[Tuple[Any, ...]]:
+        return list(zip(
+            batch.timestamp_ns.tolist(),
+            batch.vector_dim.tolist(),
+            batch.projection_norm.tolist(),
+            batch.shadow_energy.tolist(),
+        ))
+
+
+# ---------- Segment-file ledger ----------
+# Segment layout: SEGMENT_MAGIC header, then RECORD_DTYPE records. A sealed
+# segment ends with a JSON footer index followed by SEGMENT_TRAILER
+# (footer offset, footer length, FOOTER_MAGIC). task_id and metadata live in
+# a .meta side file addressed by (meta_offset, meta_length); actions and
+# signatures are interned once per directory in strings.log (line n = code n).
+# While a segment is being sealed, a .sealing marker next to it records where
+# its records end, so a crash mid-footer never exposes footer bytes as records.
+RECORD_DTYPE = np.dtype([
+    ("timestamp_ns", "<i8"),
+    ("projection_norm", "<f8"),
+    ("shadow_energy", "<f8"),
+    ("meta_offset", "<i8"),
+    ("vector_dim", "<i4"),
+    ("action", "<i4"),
+    ("signature", "<i4"),
+    ("meta_length", "<i4"),
+])
+SEGMENT_MAGIC = b"FPTSEG01"
+SEGMENT_HEADER = struct.Struct("<8sII")
+SEGMENT_TRAILER = struct.Struct("<QQ8s")
+FOOTER_MAGIC = b"FPTIDX01"
+SPARSE_INDEX_STRIDE = 4096
+
+
+def _segment_name(seq: int) -> str:
+    return f"segment-{seq:08d}.rec"
+
+
+def read_seal_marker(path: Path) -> Optional[int]:
+    """Record data end saved by an interrupted seal of `path`, or None."""
+    try:
+        return int(json.loads(path.with_suffix(".sealing").read_text())["data_end"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def read_segment_footer(path: Path) -> Optional[Dict[str, Any]]:
+    """Return the footer index of a sealed segment, or None if it is still open."""
+    size = path.stat().st_size
+    if size < SEGMENT_HEADER.size + SEGMENT_TRAILER.size:
+        return None
+    with open(path, "rb") as f:
+        f.seek(size - SEGMENT_TRAILER.size)
+        offset, length, magic = SEGMENT_TRAILER.unpack(f.read(SEGMENT_TRAILER.size))
+        if magic != FOOTER_MAGIC or offset + length + SEGMENT_TRAILER.size != size:
+            return None
+        f.seek(offset)
+        footer = json.loads(f.read(length))
+    footer["data_end"] = offset
+    return footer
+
+
+class SegmentLedgerAdapter(LedgerListener):
+    """
+    Append-only ledger of fixed-width binary records in rolling segment files.
+
+    Buffers records as a NumPy structured array and appends them under the
+    same durability modes as the SQLite adapters ("per_event" and "group"
+    fsync on every write, "none" leaves it to the OS). New strings.log
+    entries are synced before the records that use them. A segment is sealed
+    with its footer index after `segment_max_records` records.
+    """
+    def __init__(
+        self,
+        directory: str = "projection_segments",
+        durability: str = "per_event",
+        batch_size: int = 1000,
+        flush_interval_ms: float = 50.0,
+        segment_max_records: int = 1 << 20,
+    ):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.durability = durability
+        self.batch_size = int(batch_size)
+        self.flush_interval_ms = float(flush_interval_ms)
+        self.segment_max_records = int(segment_max_records)
+        self._lock = threading.Lock()
+        self._buffer: List[np.ndarray] = []
+        self._meta_buffer: List[bytes] = []
+        self._buffered = 0
+        self._last_flush = time.monotonic()
+        self._closed = False
+        self._load_strings()
+        self._open_tail_segment()
+        self._idle = threading.Event()
+        if durability != "per_event":
+            self._flusher = _start_idle_flusher(self, self._idle, "ledger-flush:segments")
+        _OPEN_ADAPTERS.add(self)
+
+    # ---------- Interned strings ----------
+    def _load_strings(self) -> None:
+        self._strings_path = self.directory / "strings.log"
+        self._strings: Dict[str, int] = {}
+        if self._strings_path.exists():
+            data = self._strings_path.read_bytes()
+            end = data.rfind(b"\n") + 1
+            if end < len(data):
+                # Drop a torn last line so the next entry starts on its own line.
+                with open(self._strings_path, "r+b") as f:
+                    f.truncate(end)
+            for line in data[:end].decode("utf-8").splitlines():
+                self._strings[json.loads(line)] = len(self._strings)
+        self._strings_file = open(self._strings_path, "a", encoding="utf-8")
+        self._strings_dirty = False
+
+    def _code(self, value: Optional[str]) -> int:
+        if self._closed:
+            raise ValueError("SegmentLedgerAdapter is closed")
+        if value is None:
+            return -1
+        code = self._strings.get(value)
+        if code is None:
+            code = self._strings[value] = len(self._strings)
+            self._strings_file.write(json.dumps(value) + "\n")
+            self._strings_file.flush()
+            self._strings_dirty = True
+        return code
+
+    # ---------- Segment lifecycle ----------
+    def _open_tail_segment(self) -> None:
+        segments = sorted(self.directory.glob("segment-*.rec"))
+        if not segments:
+            self._start_segment(0)
+            return
+        last = segments[-1]
+        seq = int(last.stem.split("-")[1])
+        marker = last.with_suffix(".sealing")
+        data_end = read_seal_marker(last)
+        if data_end is None and read_segment_footer(last) is not None:
+            self._start_segment(seq + 1)
+            return
+        # Reopen an unsealed segment, dropping any torn trailing record and,
+        # after an interrupted seal, the partial footer; the seal is redone below.
+        size = data_end if data_end is not None else last.stat().st_size
+        count = max(0, (size - SEGMENT_HEADER.size) // RECORD_DTYPE.itemsize)
+        with open(last, "r+b") as f:
+            f.truncate(SEGMENT_HEADER.size + count * RECORD_DTYPE.itemsize)
+            if count:
+                f.seek(SEGMENT_HEADER.size)
+                ts = np.fromfile(f, dtype=RECORD_DTYPE, count=count)["timestamp_ns"].copy()
+                f.seek(SEGMENT_HEADER.size + (count - 1) * RECORD_DTYPE.itemsize)
+                tail = np.fromfile(f, dtype=RECORD_DTYPE, count=1)[0]
+                meta_end = int(tail["meta_offset"]) + int(tail["meta_length"])
+            else:
+                ts = np.zeros(0, dtype=np.int64)
+                meta_end = 0
+        meta_path = last.with_suffix(".meta")
+        with open(meta_path, "ab") as m:
+            m.truncate(meta_end)
+        self._seq, self._seg_count = seq, count
+        self._seg_file = open(last, "ab")
+        self._meta_file = open(meta_path, "ab")
+        self._meta_offset = meta_end
+        self._seg_ts_chunks: List[np.ndarray] = [ts]
+        marker.unlink(missing_ok=True)
+        if self._seg_count >= self.segment_max_records:
+            self._seal_segment()
+
+    def _start_segment(self, seq: int) -> None:
+        path = self.directory / _segment_name(seq)
+        self._seq, self._seg_count, self._meta_offset = seq, 0, 0
+        self._seg_file = open(path, "wb")
+        self._seg_file.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, RECORD_DTYPE.itemsize, 0))
+        self._seg_file.flush()
+        self._meta_file = open(path.with_suffix(".meta"), "wb")
+        self._seg_ts_chunks = []
+
+    def _seal_segment(self) -> None:
+        ts = np.concatenate(self._seg_ts_chunks) if self._seg_ts_chunks else np.zeros(0, dtype=np.int64)
+        footer = {
+            "count": self._seg_count,
+            "record_size": RECORD_DTYPE.itemsize,
+            "ts_min": int(ts.min()) if ts.size else None,
+            "ts_max": int(ts.max()) if ts.size else None,
+            "sorted": bool(np.all(ts[1:] >= ts[:-1])),
+            # (timestamp, record index) every SPARSE_INDEX_STRIDE records for range seeks.
+            "sparse_index": [[int(ts[i]), i] for i in range(0, ts.size, SPARSE_INDEX_STRIDE)],
+        }
+        body = json.dumps(footer).encode("utf-8")
+        self._sync()
+        offset = self._seg_file.tell()
+        path = self.directory / _segment_name(self._seq)
+        marker = path.with_suffix(".sealing")
+        tmp = marker.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"data_end": offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, marker)
+        self._seg_file.write(body + SEGMENT_TRAILER.pack(offset, len(body), FOOTER_MAGIC))
+        self._sync()
+        self._seg_file.close()
+        self._meta_file.close()
+        marker.unlink()
+        self._start_segment(self._seq + 1)
+
+    # ---------- Writes ----------
+    @staticmethod
+    def _meta_entry(task_id: Optional[str], metadata_json: str) -> bytes:
+        if task_id is None and metadata_json == "{}":
+            return b""
+        return json.dumps(task_id).encode("utf-8") + b"\t" + metadata_json.encode("utf-8")
+
+    def _append(self, records: np.ndarray, meta: List[bytes]) -> None:
+        with self._lock:
+            if self._closed:
+                raise ValueError("SegmentLedgerAdapter is closed")
+            self._buffer.append(records)
+            self._meta_buffer.extend(meta)
+            self._buffered += records.shape[0]
+            if (self.durability == "per_event"
+                    or self._buffered >= self.batch_size
+                    or (time.monotonic() - self._last_flush) * 1000.0 >= self.flush_interval_ms):
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._buffered:
+            if self._strings_dirty:
+                # Codes referenced by these records must be durable before the records are.
+                if self.durability != "none":
+                    os.fsync(self._strings_file.fileno())
+                self._strings_dirty = False
+            records = np.concatenate(self._buffer) if len(self._buffer) > 1 else self._buffer[0]
+            meta = self._meta_buffer
+            start = 0
+            while start < records.shape[0]:
+                room = self.segment_max_records - self._seg_count
+                chunk = records[start:start + room].copy()
+                lengths = np.fromiter((len(m) for m in meta[start:start + chunk.shape[0]]),
+                                      dtype=np.int64, count=chunk.shape[0])
+                offsets = self._meta_offset + np.concatenate(([0], np.cumsum(lengths)[:-1]))
+                chunk["meta_offset"] = offsets
+                chunk["meta_length"] = lengths
+                blob = b"".join(meta[start:start + chunk.shape[0]])
+                # Side file first, so every persisted record points at persisted metadata.
+                self._meta_file.write(blob)
+                self._meta_offset += len(blob)
+                self._seg_file.write(chunk.tobytes())
+                self._seg_ts_chunks.append(chunk["timestamp_ns"].copy())
+                self._seg_count += chunk.shape[0]
+                start += chunk.shape[0]
+                if self._seg_count >= self.segment_max_records:
+                    self._seal_segment()
+            self._sync()
+            self._buffer.clear()
+            self._meta_buffer = []
+            self._buffered = 0
+        self._last_flush = time.monotonic()
+
+    def _sync(self) -> None:
+        self._meta_file.flush()
+        self._seg_file.flush()
+        if self.durability != "none":
+            os.fsync(self._meta_file.fileno())
+            os.fsync(self._seg_file.fileno())
 
     def on_projection(self, event: ProjectionEvent) -> None:
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                """
-                INSERT INTO manifold_telemetry (
-                    timestamp_ns, vector_dim, norm, residual_energy
-                ) VALUES (?, ?, ?, ?)
-                """,
-                (
-                    event.timestamp_ns,
-                    event.vector_dim,
-                    event.projection_norm,
-                    event.shadow_energy,
-                )
-            )
-            conn.commit()
+        rec = np.zeros(1, dtype=RECORD_DTYPE)
+        rec["timestamp_ns"] = event.timestamp_ns
+        rec["vector_dim"] = event.vector_dim
+        rec["projection_norm"] = event.projection_norm
+        rec["shadow_energy"] = event.shadow_energy
+        with self._lock:
+            rec["action"] = self._code(event.action)
+            rec["signature"] = self._code(event.operator_signature)
+        self._append(rec, [self._meta_entry(event.task_id, json.dumps(event.metadata))])
+
+    def on_projection_batch(self, batch: ProjectionEventBatch) -> None:
+        n = len(batch)
+        rec = np.zeros(n, dtype=RECORD_DTYPE)
+        rec["timestamp_ns"] = batch.timestamp_ns
+        rec["vector_dim"] = batch.vector_dim
+        rec["projection_norm"] = batch.projection_norm
+        rec["shadow_energy"] = batch.shadow_energy
+        with self._lock:
+            # Remap batch-local interned codes to directory-wide codes; -1 (None) stays -1.
+            action_map = np.array([self._code(a) for a in batch.actions] + [-1], dtype=np.int32)
+            sig_map = np.array([self._code(sg) for sg in batch.signatures] + [-1], dtype=np.int32)
+        rec["action"] = action_map[batch.action_codes]
+        rec["signature"] = sig_map[batch.signature_codes]
+        meta = [self._meta_entry(t, m) for t, m in zip(batch.task_id_column(), batch.metadata_json_column())]
+        self._append(rec, meta)
+
+    def _flush_if_idle(self, interval: float) -> None:
+        with self._lock:
+            if not self._closed and self._buffered \
+                    and time.monotonic() - self._last_flush >= interval:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush_locked()
+
+    def close(self) -> None:
+        """Flush pending records; the open segment stays unsealed and is resumed on reopen."""
+        self._idle.set()
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._seg_file.close()
+            self._meta_file.close()
+            self._strings_file.close()
+            self._closed = True
+        _OPEN_ADAPTERS.discard(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -5,22 +5,50 @@ Lightweight, single-file module ready for import and local development.
 """
 
 from __future__ import annotations
-import math, hashlib, time
-from typing import Dict, Optional
+import math, hashlib, threading, time
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 import numpy as np
 
 # ---------- Utilities ----------
-def normalize(v, eps=1e-12):
-    v = np.array(v, dtype=float)
+FLOAT_DTYPES = (np.dtype(np.float32), np.dtype(np.float64))
+
+def resolve_dtype(dtype=None, like=None) -> np.dtype:
+    """Validated float dtype: `dtype` if given, else a float32/float64 `like` array's dtype, else float64."""
+    if dtype is None:
+        # Inferred dtypes never raise: float16, longdouble and non-float inputs compute in float64.
+        like_dtype = getattr(like, "dtype", None)
+        return like_dtype if like_dtype is not None and like_dtype in FLOAT_DTYPES else np.dtype(np.float64)
+    dtype = np.dtype(dtype)
+    if dtype not in FLOAT_DTYPES:
+        raise ValueError(f"Unsupported dtype: {dtype}; expected float32 or float64")
+    return dtype
+
+def normalize(v, eps=1e-12, dtype=None):
+    v = np.array(v, dtype=resolve_dtype(dtype, like=v))
     n = np.linalg.norm(v)
     if n < eps:
         return v
     return v / n
 
+def normalize_rows(V, eps=1e-12, dtype=None):
+    V = np.array(V, dtype=resolve_dtype(dtype, like=V))
+    n = np.linalg.norm(V, axis=1, keepdims=True)
+    return np.where(n < eps, V, V / np.where(n < eps, 1.0, n))
+
+def _broadcast_tags(raw_tags, B:int) -> list:
+    if raw_tags is None or isinstance(raw_tags, str):
+        return [raw_tags] * B
+    raw_tags = list(raw_tags)
+    if len(raw_tags) != B:
+        raise ValueError(f"Expected {B} tags, got {len(raw_tags)}")
+    return raw_tags
+
 # ---------- Ownership Encoder & Projector ----------
 class OwnershipEncoder:
-    def __init__(self, d: int = 64):
-        self.d = int(d)
+    def __init__(self, d: int = 64, dtype=np.float64):
+        self.d = int(d); self.dtype = resolve_dtype(dtype)
     def _seed_from_raw(self, raw) -> int:
         s = str(raw).encode('utf-8')
         h = hashlib.md5(s).hexdigest()
@@ -29,11 +57,16 @@ class OwnershipEncoder:
         seed = self._seed_from_raw(raw)
         rng = np.random.RandomState(seed)
         v = rng.normal(size=(self.d,))
-        return normalize(v)
+        # Drawn in float64 so a tag maps to the same direction at every precision.
+        return normalize(v).astype(self.dtype)
 
 class OwnershipProjector:
-    def __init__(self, N:int, d:int=64, seed:int=0):
-        self.N = int(N); self.d = int(d)
+    def __init__(self, N:int, d:int=64, seed:int=0, cache_size:int=1024, dtype=np.float64):
+        self.N = int(N); self.d = int(d); self.dtype = resolve_dtype(dtype)
+        self.cache_size = int(cache_size)
+        self._directions: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0; self.cache_misses = 0
         rng = np.random.RandomState(seed)
         Q_random = rng.normal(size=(self.N, self.d))
         if self.N >= self.d:
@@ -41,31 +74,72 @@ class OwnershipProjector:
         else:
             U, _, _ = np.linalg.svd(Q_random, full_matrices=False)
             Q_mat = U[:, :self.d]
-        self.Q = Q_mat[:, :self.d]
+        self.Q = Q_mat[:, :self.d].astype(self.dtype)
     def projector(self, ownership_vector:np.ndarray):
         w = self.Q @ ownership_vector
         w_hat = normalize(w)
         Phi = np.outer(w_hat, w_hat)
         return Phi, w_hat
+    def direction(self, raw_tag) -> np.ndarray:
+        """Unit ownership direction w_hat for raw_tag, memoized in a bounded LRU cache (thread-safe)."""
+        key = str(raw_tag)
+        with self._cache_lock:
+            w_hat = self._directions.get(key)
+            if w_hat is not None:
+                self.cache_hits += 1
+                self._directions.move_to_end(key)
+                return w_hat
+            self.cache_misses += 1
+        # Encoded outside the lock; a concurrent miss on the same tag computes the same vector.
+        w_hat = normalize(self.Q @ OwnershipEncoder(d=self.d, dtype=self.dtype).encode(raw_tag))
+        w_hat.setflags(write=False)
+        if self.cache_size > 0:
+            with self._cache_lock:
+                self._directions[key] = w_hat
+                self._directions.move_to_end(key)
+                while len(self._directions) > self.cache_size:
+                    self._directions.popitem(last=False)
+        return w_hat
+    def cache_info(self) -> dict:
+        with self._cache_lock:
+            return {"hits": self.cache_hits, "misses": self.cache_misses,
+                    "size": len(self._directions), "max_size": self.cache_size}
+    def cache_clear(self) -> None:
+        with self._cache_lock:
+            self._directions.clear()
+            self.cache_hits = 0; self.cache_misses = 0
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_cache_lock"]
+        return state
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._cache_lock = threading.Lock()
 
 # ---------- Ownership-aware associative memory ----------
+def _inherit_dtype(dtype, source, owner:str) -> np.dtype:
+    """dtype defaults to `source.dtype`; an explicit mismatch would force upcasts, so it is rejected."""
+    dtype = resolve_dtype(dtype if dtype is not None else source.dtype)
+    if dtype != source.dtype:
+        raise ValueError(f"{owner} dtype {dtype} does not match {type(source).__name__} dtype {source.dtype}")
+    return dtype
+
 class OwnershipMemory:
-    def __init__(self, N:int, ownership_projector:OwnershipProjector, eta=1e-3, gamma=1.0, weight_decay=0.0):
+    def __init__(self, N:int, ownership_projector:OwnershipProjector, eta=1e-3, gamma=1.0, weight_decay=0.0, dtype=None):
         self.N = int(N)
         self.Oproj = ownership_projector
-        self.W = np.zeros((self.N, self.N), dtype=float)
+        self.dtype = _inherit_dtype(dtype, ownership_projector, "OwnershipMemory")
+        self.W = np.zeros((self.N, self.N), dtype=self.dtype)
         self.eta = float(eta); self.gamma = float(gamma); self.weight_decay = float(weight_decay)
     def standard_hebb(self, s):
         return self.eta * np.outer(s, s)
     def ownership_hebb_multiplicative(self, s, raw_tag):
-        enc = OwnershipEncoder(d=self.Oproj.d)
-        u = enc.encode(raw_tag)
-        Phi, _ = self.Oproj.projector(u)
-        M = np.eye(self.N) + self.gamma * Phi
-        Delta = M @ (np.outer(s, s) * self.eta) @ M.T
-        return Delta
+        # M (eta s s^T) M^T with M = I + gamma * w_hat w_hat^T is eta * m m^T, m = M s.
+        w_hat = self.Oproj.direction(raw_tag)
+        m = s + self.gamma * float(np.dot(w_hat, s)) * w_hat
+        return self.eta * np.outer(m, m)
     def encode(self, s, raw_tag=None):
-        s = np.array(s, dtype=float)
+        s = np.array(s, dtype=self.dtype)
         if raw_tag is None:
             Delta = self.standard_hebb(s)
         else:
@@ -74,71 +148,312 @@ class OwnershipMemory:
         if self.weight_decay > 0:
             self.W *= (1.0 - self.weight_decay)
         self.W = 0.5 * (self.W + self.W.T)
+    def encode_batch(self, S, raw_tags=None):
+        """Apply B Hebbian updates as one blocked GEMM; equivalent to B sequential encodes."""
+        S = np.atleast_2d(np.array(S, dtype=self.dtype))
+        B = S.shape[0]
+        tags = _broadcast_tags(raw_tags, B)
+        # M s = s + gamma * w_hat (w_hat . s), so each Delta is eta * (M s)(M s)^T.
+        Ms = S.copy()
+        for tag in set(t for t in tags if t is not None):
+            w_hat = self.Oproj.direction(tag)
+            rows = np.array([t == tag for t in tags])
+            Ms[rows] += self.gamma * np.outer(S[rows] @ w_hat, w_hat)
+        keep = 1.0 - self.weight_decay if self.weight_decay > 0 else 1.0
+        coeff = (self.eta * keep ** np.arange(B, 0, -1, dtype=float)).astype(self.dtype)
+        self.W *= keep ** B
+        self.W += (Ms * coeff[:, None]).T @ Ms
+        self.W = 0.5 * (self.W + self.W.T)
     def recall_iter(self, x0, steps=10, bias_tag=None, beta=0.0, kappa=150.0, activation=np.tanh):
-        x = np.array(x0, dtype=float)
-        Phi = None
-        if bias_tag is not None:
-            enc = OwnershipEncoder(d=self.Oproj.d)
-            u = enc.encode(bias_tag)
-            Phi, _ = self.Oproj.projector(u)
+        x = np.array(x0, dtype=self.dtype)
+        w_hat = None
+        if bias_tag is not None and beta != 0.0:
+            w_hat = self.Oproj.direction(bias_tag)
         for _ in range(steps):
             u = self.W @ x
-            if Phi is not None and beta != 0.0:
-                u = (np.eye(self.N) + beta * Phi) @ u
+            if w_hat is not None:
+                u = u + beta * float(np.dot(w_hat, u)) * w_hat
             x = normalize(activation(kappa * u))
         return x
+    def recall_batch(self, X0, steps=10, bias_tag=None, beta=0.0, kappa=150.0, activation=np.tanh):
+        """Run recall_iter on the rows of X0 (B, N) with one GEMM per step."""
+        X = np.atleast_2d(np.array(X0, dtype=self.dtype))
+        w_hat = None
+        if bias_tag is not None and beta != 0.0:
+            w_hat = self.Oproj.direction(bias_tag)
+        for _ in range(steps):
+            U = X @ self.W.T
+            if w_hat is not None:
+                U += beta * np.outer(U @ w_hat, w_hat)
+            X = normalize_rows(activation(kappa * U))
+        return X
     def selective_revoke(self, raw_tag, rho=1.0):
-        enc = OwnershipEncoder(d=self.Oproj.d)
-        u = enc.encode(raw_tag)
-        Phi, _ = self.Oproj.projector(u)
-        M = np.eye(self.N) - rho * Phi
-        self.W = M @ self.W @ M.T
+        # M W M^T with M = I - rho * w_hat w_hat^T, expanded as a rank-2 update.
+        w_hat = self.Oproj.direction(raw_tag)
+        Ww = self.W @ w_hat
+        a = float(np.dot(w_hat, Ww))
+        self.W -= rho * (np.outer(w_hat, Ww) + np.outer(Ww, w_hat))
+        self.W += (rho * rho * a) * np.outer(w_hat, w_hat)
         self.W = 0.5 * (self.W + self.W.T)
     def tag_similarity(self, raw_tag1, raw_tag2):
-        enc = OwnershipEncoder(d=self.Oproj.d)
-        u1 = enc.encode(raw_tag1); u2 = enc.encode(raw_tag2)
-        Phi1, w1 = self.Oproj.projector(u1); Phi2, w2 = self.Oproj.projector(u2)
+        w1 = self.Oproj.direction(raw_tag1); w2 = self.Oproj.direction(raw_tag2)
         sim = (float(np.dot(w1, w2)))**2
         return float(sim)
 
 # ---------- CA3 Dynamics & Living Zero ----------
 class CA3Dynamics:
-    def __init__(self, N:int, memory:OwnershipMemory, tau=0.1, dt=0.01):
+    """
+    Single-trajectory CA3 attractor dynamics over an OwnershipMemory.
+
+    Patterns live in contiguous arrays, so `alpha` and `patterns` are
+    read-only snapshots: item assignment raises TypeError. Assign a whole
+    mapping to `alpha` to change strengths, and use encode_pattern() to add
+    or replace patterns.
+    """
+    def __init__(self, N:int, memory:OwnershipMemory, tau=0.1, dt=0.01, dtype=None):
         self.N = int(N); self.memory = memory; self.tau=float(tau); self.dt=float(dt)
-        self.A = np.eye(self.N)
-        self.alpha:Dict[int,float] = {}
-        self.patterns:Dict[int, np.ndarray] = {}
+        self.dtype = _inherit_dtype(dtype, memory, "CA3Dynamics")
+        self.A = np.eye(self.N, dtype=self.dtype)
+        # Stored patterns as contiguous rows with an aligned alpha vector.
+        self._pmat = np.zeros((4, self.N), dtype=self.dtype)
+        self._alpha = np.zeros(4, dtype=self.dtype)
+        self._rows:Dict[int,int] = {}
         self.P = 0.0
+    @property
+    def alpha(self) -> Mapping[int,float]:
+        """Read-only snapshot of pattern strengths keyed by pattern id."""
+        return MappingProxyType({pid: float(self._alpha[i]) for pid, i in self._rows.items()})
+    @alpha.setter
+    def alpha(self, strengths: Mapping[int,float]):
+        """Replace all strengths; stored patterns missing from `strengths` get 0."""
+        unknown = set(strengths) - set(self._rows)
+        if unknown:
+            raise KeyError(f"No stored pattern for ids {sorted(unknown)}; use encode_pattern()")
+        self._alpha[:] = 0.0
+        for pid, value in strengths.items():
+            self._alpha[self._rows[pid]] = float(value)
+    @property
+    def patterns(self) -> Mapping[int, np.ndarray]:
+        """Read-only snapshot of stored (normalized) patterns keyed by pattern id."""
+        return MappingProxyType({pid: self._pmat[i].copy() for pid, i in self._rows.items()})
     def energy_grad(self, x):
-        x = np.array(x, dtype=float)
+        x = np.array(x, dtype=self.dtype)
         grad = self.A @ x
-        for mu, alpha_mu in self.alpha.items():
-            p = self.patterns[mu]
-            proj = np.dot(p, x)
-            grad -= alpha_mu * proj * p
+        k = len(self._rows)
+        if k:
+            Pm = self._pmat[:k]
+            grad -= (self._alpha[:k] * (Pm @ x)) @ Pm
         return grad
     def step(self, x, Vd=1.0, R=1.0, b=None, noise_std=0.0):
         g = float(Vd) * float(R)
         gradE = self.energy_grad(x)
         drive = self.memory.W @ x if b is None else self.memory.W @ x + b
         drive = np.tanh(drive)
-        eta = np.random.randn(self.N) * noise_std if noise_std > 0 else np.zeros(self.N)
-        dx = (-gradE + g * drive + eta) * (self.dt / self.tau)
+        dx = -gradE + g * drive
+        if noise_std > 0:
+            dx += (np.random.randn(self.N) * noise_std).astype(self.dtype)
+        dx *= (self.dt / self.tau)
         return x + dx
+    def simulate(self, x0, steps:int, Vd=1.0, R=1.0, b=None, noise_std=0.0,
+                 target_pid:Optional[int]=None, on_handshake=None, **handshake_kw):
+        """
+        Run `steps` Euler steps with preallocated buffers.
+
+        When target_pid is given, reward_handshake is evaluated after every step
+        and each trigger is recorded as (t, theta, r); on_handshake(t, x, theta, r)
+        is called at that point, before the next step. Returns (x, events).
+        """
+        x = np.array(x0, dtype=self.dtype)
+        g = float(Vd) * float(R); h = self.dt / self.tau
+        grad = np.empty(self.N, dtype=self.dtype); drive = np.empty(self.N, dtype=self.dtype)
+        events = []
+        for t in range(int(steps)):
+            np.matmul(self.A, x, out=grad)
+            k = len(self._rows)
+            if k:
+                Pm = self._pmat[:k]
+                grad -= (self._alpha[:k] * (Pm @ x)) @ Pm
+            np.matmul(self.memory.W, x, out=drive)
+            if b is not None:
+                drive += b
+            np.tanh(drive, out=drive)
+            drive *= g; drive -= grad
+            if noise_std > 0:
+                drive += (np.random.randn(self.N) * noise_std).astype(self.dtype)
+            drive *= h
+            x += drive
+            if target_pid is not None:
+                trig, theta, r = self.reward_handshake(x, target_pid, **handshake_kw)
+                if trig:
+                    events.append((t, theta, r))
+                    if on_handshake is not None:
+                        on_handshake(t, x.copy(), theta, r)
+        return x, events
     def encode_pattern(self, pid:int, p_vec, strength=0.1):
-        self.patterns[pid] = normalize(p_vec); self.alpha[pid]=float(strength)
+        row = self._rows.get(pid)
+        if row is None:
+            row = len(self._rows)
+            if row == self._pmat.shape[0]:
+                self._pmat = np.vstack([self._pmat, np.zeros_like(self._pmat)])
+                self._alpha = np.concatenate([self._alpha, np.zeros_like(self._alpha)])
+            self._rows[pid] = row
+        self._pmat[row] = normalize(p_vec); self._alpha[row] = float(strength)
     def reward_handshake(self, x, target_pid:int, eps=0.03*math.pi, R0=1.0, kappa_r=1e-2, kappa_P=1e-2):
-        p = self.patterns[target_pid]
+        row = self._rows[target_pid]
+        p = self._pmat[row]
         x_hat = normalize(x); p_hat = normalize(p)
         dot = max(-1.0, min(1.0, float(np.dot(x_hat, p_hat))))
         theta = math.acos(dot)
         if theta <= eps:
             r = R0 * math.exp(-theta/eps)
-            self.alpha[target_pid] += kappa_r * r
+            self._alpha[row] += kappa_r * r
             self.P += kappa_P * r
             return True, theta, r
         return False, theta, 0.0
 
+# ---------- CA3 Ensemble (lockstep trajectories) ----------
+def _simulate_shard(ensemble, X0, steps, kwargs):
+    X, events = ensemble.simulate(X0, steps, **kwargs)
+    return X, events, ensemble._alpha, ensemble.P
+
+class CA3Ensemble:
+    """
+    B independent CA3 trajectories advanced in lockstep as a (B, N) state.
+
+    Patterns and the memory W are shared; every row carries its own alpha
+    and P accumulators and handshake counter. tau and dt, like the reward
+    parameters passed to simulate, may be scalars or per-row (B,) arrays.
+    """
+    def __init__(self, N:int, memory:OwnershipMemory, B:int, tau=0.1, dt=0.01, band:Optional["MemoryBand"]=None,
+                 dtype=None):
+        self.N = int(N); self.memory = memory; self.B = int(B)
+        self.dtype = _inherit_dtype(dtype, memory, "CA3Ensemble")
+        self.tau = np.broadcast_to(np.asarray(tau, dtype=self.dtype), (self.B,)).copy()
+        self.dt = np.broadcast_to(np.asarray(dt, dtype=self.dtype), (self.B,)).copy()
+        self.band = band if band is not None else MemoryBand()
+        self.A = np.eye(self.N, dtype=self.dtype)
+        self._pmat = np.zeros((0, self.N), dtype=self.dtype)
+        self._alpha = np.zeros((self.B, 0), dtype=self.dtype)
+        self._rows:Dict[int,int] = {}
+        self.P = np.zeros(self.B, dtype=self.dtype)
+        self.events = np.zeros(self.B, dtype=np.int64)
+    @classmethod
+    def from_dynamics(cls, ca3:CA3Dynamics, B:int, tau=None, dt=None, band=None) -> "CA3Ensemble":
+        """Replicate a CA3Dynamics (patterns, alpha, A) into B rows."""
+        ens = cls(ca3.N, ca3.memory, B, tau=ca3.tau if tau is None else tau,
+                  dt=ca3.dt if dt is None else dt, band=band)
+        ens.A = ca3.A.astype(ens.dtype)
+        k = len(ca3._rows)
+        ens._pmat = ca3._pmat[:k].copy()
+        ens._alpha = np.tile(ca3._alpha[:k], (ens.B, 1))
+        ens._rows = dict(ca3._rows)
+        ens.P[:] = ca3.P
+        return ens
+    @property
+    def alpha(self) -> Mapping[int, np.ndarray]:
+        """Read-only snapshot of per-row pattern strengths keyed by pattern id, each of shape (B,)."""
+        return MappingProxyType({pid: self._alpha[:, i].copy() for pid, i in self._rows.items()})
+    def encode_pattern(self, pid:int, p_vec, strength=0.1):
+        row = self._rows.get(pid)
+        if row is None:
+            row = len(self._rows); self._rows[pid] = row
+            self._pmat = np.vstack([self._pmat, np.zeros((1, self.N), dtype=self.dtype)])
+            self._alpha = np.hstack([self._alpha, np.zeros((self.B, 1), dtype=self.dtype)])
+        self._pmat[row] = normalize(p_vec); self._alpha[:, row] = strength
+    def _subset(self, idx) -> "CA3Ensemble":
+        sub = CA3Ensemble(self.N, self.memory, len(idx), tau=self.tau[idx], dt=self.dt[idx], band=self.band)
+        sub.A = self.A; sub._pmat = self._pmat; sub._rows = self._rows
+        sub._alpha = self._alpha[idx].copy(); sub.P = self.P[idx].copy(); sub.events = self.events[idx].copy()
+        return sub
+    def energy_grad(self, X):
+        G = X @ self.A.T
+        if self._rows:
+            G -= (self._alpha * (X @ self._pmat.T)) @ self._pmat
+        return G
+    def reward_handshake(self, X, target_pid:int, eps=None, R0=1.0, kappa_r=1e-2, kappa_P=1e-2):
+        """Vectorized reward_handshake; returns (triggered, theta, r) arrays of shape (B,)."""
+        eps = self.band.eps_handshake if eps is None else eps
+        row = self._rows[target_pid]
+        dots = normalize_rows(X) @ self._pmat[row]
+        theta = np.arccos(np.clip(dots, -1.0, 1.0))
+        trig = theta <= eps
+        r = np.where(trig, R0 * np.exp(-theta / eps), 0.0)
+        self._alpha[:, row] += kappa_r * r
+        self.P += kappa_P * r
+        self.events += trig
+        return trig, theta, r
+    def simulate(self, X0, steps:int, Vd=1.0, R=1.0, b=None, noise_std=0.0, target_pid:Optional[int]=None,
+                 seed=None, workers:Optional[int]=None, executor:str="process", **handshake_kw):
+        """
+        Advance all rows `steps` Euler steps; returns (X, events) with per-row event counts.
+
+        With workers > 1 the rows are sharded across a concurrent.futures
+        process (or thread) pool. Each shard draws noise from its own stream
+        spawned from `seed`, so sharded runs are reproducible per worker count.
+        """
+        X0 = np.array(X0, dtype=self.dtype)
+        if X0.ndim == 1:
+            X0 = np.tile(X0, (self.B, 1))
+        if workers is not None and workers > 1 and self.B > 1:
+            return self._simulate_sharded(X0, steps, workers, executor, seed,
+                                          dict(Vd=Vd, R=R, b=b, noise_std=noise_std,
+                                               target_pid=target_pid, **handshake_kw))
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        X = X0
+        g = (np.asarray(Vd, dtype=self.dtype) * np.asarray(R, dtype=self.dtype)).reshape(-1, 1)
+        h = (self.dt / self.tau)[:, None]
+        sigma = np.broadcast_to(np.asarray(noise_std, dtype=self.dtype), (self.B,))[:, None]
+        noisy = bool(np.any(sigma > 0))
+        drive = np.empty_like(X)
+        for _ in range(int(steps)):
+            grad = self.energy_grad(X)
+            np.matmul(X, self.memory.W.T, out=drive)
+            if b is not None:
+                drive += b
+            np.tanh(drive, out=drive)
+            drive *= g; drive -= grad
+            if noisy:
+                drive += rng.standard_normal(X.shape, dtype=self.dtype) * sigma
+            drive *= h
+            X += drive
+            if target_pid is not None:
+                self.reward_handshake(X, target_pid, **handshake_kw)
+        return X, self.events.copy()
+    def _shard_kwargs(self, kwargs, idx):
+        """Slice per-row simulate arguments down to the rows in `idx`."""
+        out = {}
+        for key, value in kwargs.items():
+            arr = value if isinstance(value, np.ndarray) else None
+            if arr is None and isinstance(value, (list, tuple)):
+                arr = np.asarray(value)
+            # b is an (N,) bias shared by every row unless given per row as (B, N).
+            per_row = arr is not None and arr.ndim == (2 if key == "b" else 1) and arr.shape[0] == self.B
+            out[key] = arr[idx] if per_row else value
+        return out
+    def _simulate_sharded(self, X0, steps, workers, executor, seed, kwargs):
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        if executor not in ("process", "thread"):
+            raise ValueError(f"Unknown executor: {executor}")
+        shards = [idx for idx in np.array_split(np.arange(self.B), workers) if idx.size]
+        if isinstance(seed, np.random.Generator):
+            # Generator.spawn needs numpy >= 1.25; its seed sequence spawns the same children.
+            bitgen = seed.bit_generator
+            seed_seq = getattr(bitgen, "seed_seq", None) or bitgen._seed_seq
+        else:
+            seed_seq = np.random.SeedSequence(seed)
+        seeds = seed_seq.spawn(len(shards))
+        pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        X = np.empty_like(X0)
+        with pool_cls(max_workers=len(shards)) as pool:
+            futures = [pool.submit(_simulate_shard, self._subset(idx), X0[idx], steps,
+                                   dict(self._shard_kwargs(kwargs, idx), seed=np.random.default_rng(ss)))
+                       for idx, ss in zip(shards, seeds)]
+            for idx, fut in zip(shards, futures):
+                X_s, events_s, alpha_s, P_s = fut.result()
+                X[idx] = X_s; self.events[idx] = events_s
+                self._alpha[idx] = alpha_s; self.P[idx] = P_s
+        return X, self.events.copy()
+
 # ---------- Convenience: small demo function ----------
 def demo_small_run(seed=0):
     rng = np.random.RandomState(seed)
@@ -150,18 +465,22 @@ def demo_small_run(seed=0):
     p = normalize(rng.normal(size=(N,))); tag = "owner:collective"
     mem.encode(p, raw_tag=tag); ca3.encode_pattern(0, p, strength=0.05)
     x = normalize(p + 0.8 * rng.normal(size=(N,)))
-    events = 0
-    for t in range(400):
-        x = ca3.step(x, Vd=1.0, R=1.0, noise_std=0.01)
-        trig, theta, r = ca3.reward_handshake(x, 0)
-        if trig:
-            events += 1
-            mem.encode(x, raw_tag=tag)
-    return {"final_sim": float(np.dot(normalize(x), normalize(p))), "events": events}
+    x, events = ca3.simulate(x, 400, Vd=1.0, R=1.0, noise_std=0.01, target_pid=0,
+                             on_handshake=lambda t, x_t, theta, r: mem.encode(x_t, raw_tag=tag))
+    return {"final_sim": float(np.dot(normalize(x), normalize(p))), "events": len(events)}
 
 # ---------- Memory Band Definition ----------
 from dataclasses import dataclass
 
+STATE_CHECK_DTYPE = np.dtype([
+    ("theta_rad", np.float64),
+    ("spectral_norm", np.float64),
+    ("in_angular_band", np.bool_),
+    ("in_handshake", np.bool_),
+    ("in_spectral_band", np.bool_),
+    ("stable", np.bool_),
+])
+
 @dataclass(frozen=True)
 class MemoryBand:
     spectral_min: float = 1e-3
@@ -191,3 +510,33 @@ class MemoryBand:
             "stable": in_angular_band and in_spectral_band,
         }
 
+    def check_states(self, X: np.ndarray, P: np.ndarray, W=None, WX: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        check_state over the rows of X and P (B, N) as a STATE_CHECK_DTYPE array.
+
+        The spectral norms come from one GEMM, X_n @ W^T. Callers that already
+        hold WX = X @ W^T (B, N) for the same X can pass it instead of W; it
+        is rescaled by the row norms of X rather than recomputed.
+        """
+        X = np.atleast_2d(X)
+        norms = np.linalg.norm(X, axis=1)
+        norms = np.where(norms < 1e-12, 1.0, norms)  # zero rows stay zero, as in normalize()
+        Xn = X / norms[:, None]
+        Pn = normalize_rows(np.atleast_2d(P))
+        out = np.empty(X.shape[0], dtype=STATE_CHECK_DTYPE)
+        theta = out["theta_rad"]
+        np.arccos(np.clip(np.einsum("ij,ij->i", Xn, Pn), -1.0, 1.0), out=theta)
+        if WX is not None:
+            out["spectral_norm"] = np.linalg.norm(WX, axis=1) / norms
+        elif W is not None:
+            # (W @ X_n^T) keeps W on the left so low-rank operators work too.
+            out["spectral_norm"] = np.linalg.norm(W @ Xn.T, axis=0)
+        else:
+            raise ValueError("check_states needs W or WX")
+        spectral_norm = out["spectral_norm"]
+        out["in_angular_band"] = theta <= self.theta_band
+        out["in_handshake"] = theta <= self.eps_handshake
+        out["in_spectral_band"] = (self.spectral_min <= spectral_norm) & (spectral_norm <= self.spectral_max)
+        out["stable"] = out["in_angular_band"] & out["in_spectral_band"]
+        return out
+
@@ -1,45 +1,207 @@
 from __future__ import annotations
 import numpy as np
-from .living_zero_core import normalize, OwnershipEncoder, OwnershipProjector
+from .living_zero_core import normalize, normalize_rows, _broadcast_tags, _inherit_dtype, OwnershipProjector
+
+STORAGE_MODES = ("dense", "factored")
+
 
 class OnlineProjectionMemory:
-    def __init__(self, N: int, ownership_projector: OwnershipProjector):
+    """
+    Online projection-rule memory.
+
+    storage="dense" keeps the full N x N projector P_mat.
+    storage="factored" keeps an orthonormal basis Q (N x k) and only
+    materializes P_mat = Q Q^T when the attribute is read.
+    dtype defaults to the ownership projector's (float32 or float64).
+    """
+    def __init__(self, N: int, ownership_projector: OwnershipProjector, storage: str = "dense", dtype=None):
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage mode: {storage}")
         self.N = N
         self.Oproj = ownership_projector
-        self.P_mat = np.zeros((N, N), dtype=float)
+        self.dtype = _inherit_dtype(dtype, ownership_projector, "OnlineProjectionMemory")
+        self.storage = storage
         self.tags: dict[str, np.ndarray] = {}
+        self._rank = 0
+        if storage == "dense":
+            self._P = np.zeros((N, N), dtype=self.dtype)
+        else:
+            # Rows of _basis are the columns of Q; capacity grows geometrically.
+            self._basis = np.zeros((min(N, 16), N), dtype=self.dtype)
+            self._tag_cols: dict[str, int] = {}
+            self._col_tags: list[str | None] = []
+
+    # ---------- Storage views ----------
+    @property
+    def P_mat(self) -> np.ndarray:
+        if self.storage == "dense":
+            return self._P
+        Q = self.basis
+        return Q @ Q.T
+
+    @P_mat.setter
+    def P_mat(self, value: np.ndarray) -> None:
+        if self.storage != "dense":
+            raise AttributeError("P_mat is read-only in factored storage")
+        self._P = np.asarray(value, dtype=self.dtype)
+
+    @property
+    def basis(self) -> np.ndarray:
+        """Orthonormal basis Q of shape (N, k) spanning the stored subspace."""
+        if self.storage == "dense":
+            w, V = np.linalg.eigh(self._P)
+            return V[:, w > 0.5]
+        return self._basis[:self._rank].T
+
+    @property
+    def rank(self) -> int:
+        return self._rank
+
+    def _project(self, x: np.ndarray) -> np.ndarray:
+        if self.storage == "dense":
+            return self._P @ x
+        Qt = self._basis[:self._rank]
+        return Qt.T @ (Qt @ x)
+
+    def _project_rows(self, X: np.ndarray) -> np.ndarray:
+        if self.storage == "dense":
+            return X @ self._P.T
+        Qt = self._basis[:self._rank]
+        return (X @ Qt.T) @ Qt
+
+    # ---------- Updates ----------
+    def _append_column(self, q: np.ndarray) -> int:
+        if self._rank == self._basis.shape[0]:
+            grown = np.zeros((min(self.N, 2 * self._rank), self.N), dtype=self.dtype)
+            grown[:self._rank] = self._basis[:self._rank]
+            self._basis = grown
+        col = self._rank
+        self._basis[col] = q
+        self._col_tags.append(None)
+        self._rank += 1
+        return col
 
     def encode(self, s: np.ndarray, raw_tag: str | None = None) -> None:
-        v = normalize(np.array(s, dtype=float))
-        if np.linalg.norm(self.P_mat) == 0:
-            self.P_mat = np.outer(v, v)
-        else:
-            v_perp = v - self.P_mat @ v
-            norm_sq = float(np.dot(v_perp, v_perp))
-            if norm_sq > 1e-8:
-                q = v_perp / np.sqrt(norm_sq)
-                self.P_mat += np.outer(q, q)
-                self.P_mat = 0.5 * (self.P_mat + self.P_mat.T)
+        v = normalize(np.array(s, dtype=self.dtype))
+        v_perp = v - self._project(v)
+        if self.storage == "factored" and self._rank > 0:
+            # Second Gram-Schmidt pass keeps Q orthonormal as k grows.
+            v_perp -= self._project(v_perp)
+        norm_sq = float(np.dot(v_perp, v_perp))
+        col = None
+        if norm_sq > 1e-8:
+            q = v_perp / np.sqrt(norm_sq)
+            if self.storage == "dense":
+                self._P += np.outer(q, q)
+                self._P = 0.5 * (self._P + self._P.T)
+                self._rank += 1
+            else:
+                col = self._append_column(q)
         if raw_tag is not None:
-            self.tags[raw_tag] = v
+            self._bind_tag(raw_tag, v, col)
+
+    def _bind_tag(self, raw_tag: str, v: np.ndarray, col: int | None) -> None:
+        self.tags[raw_tag] = v
+        if col is not None:
+            old = self._tag_cols.get(raw_tag)
+            if old is not None:
+                self._col_tags[old] = None
+            self._tag_cols[raw_tag] = col
+            self._col_tags[col] = raw_tag
+
+    def encode_batch(self, S: np.ndarray, raw_tags=None) -> None:
+        """
+        Encode the rows of S (B, N) with one blocked projection update.
+
+        Equivalent to B sequential encode calls: the block is projected out of
+        the stored subspace in one GEMM, and a QR of the residuals performs the
+        in-block Gram-Schmidt, dropping rows whose residual would be rejected.
+        """
+        V = normalize_rows(np.atleast_2d(np.array(S, dtype=self.dtype)))
+        tags = _broadcast_tags(raw_tags, V.shape[0])
+        R = V - self._project_rows(V)
+        if self.storage == "factored" and self._rank > 0:
+            R -= self._project_rows(R)
+        accepted = np.arange(V.shape[0])
+        Qb = np.zeros((0, self.N), dtype=self.dtype)
+        while accepted.size:
+            Qc, Rc = np.linalg.qr(R[accepted].T, mode="reduced")
+            diag = np.diag(Rc)
+            ok = diag * diag > 1e-8
+            if ok.all():
+                Qb = (Qc * np.sign(diag)).T
+                break
+            accepted = accepted[ok]
+        cols = {}
+        if self.storage == "dense":
+            self._P += Qb.T @ Qb
+            self._P = 0.5 * (self._P + self._P.T)
+            self._rank += Qb.shape[0]
+        else:
+            for i, q in zip(accepted, Qb):
+                cols[int(i)] = self._append_column(q)
+        for i, raw_tag in enumerate(tags):
+            if raw_tag is not None:
+                self._bind_tag(raw_tag, V[i], cols.get(i))
 
     def selective_revoke(self, raw_tag: str) -> None:
         if raw_tag in self.tags:
             v = self.tags[raw_tag]
-            P_v = np.outer(v, v)
-            self.P_mat = (np.eye(self.N) - P_v) @ self.P_mat @ (np.eye(self.N) - P_v)
-            self.P_mat = 0.5 * (self.P_mat + self.P_mat.T)
+            if self.storage == "dense":
+                # (I - vv^T) P (I - vv^T) expanded as a rank-2 correction.
+                Pv = self._P @ v
+                a = float(np.dot(v, Pv))
+                self._P -= np.outer(v, Pv) + np.outer(Pv, v) - a * np.outer(v, v)
+                self._P = 0.5 * (self._P + self._P.T)
+                self._rank = max(0, self._rank - 1)
+            else:
+                self._downdate(v, self._tag_cols.pop(raw_tag, None))
             del self.tags[raw_tag]
 
+    def _downdate(self, v: np.ndarray, col: int | None) -> None:
+        """Remove the direction Q Q^T v from the basis with one Householder reflection."""
+        k = self._rank
+        if k == 0:
+            return
+        Qt = self._basis[:k]
+        c = Qt @ v
+        c_norm = float(np.linalg.norm(c))
+        if c_norm < 1e-8:
+            return
+        j = col if col is not None else int(np.argmax(np.abs(c)))
+        u = c.copy()
+        u[j] += np.copysign(c_norm, c[j])
+        Qt -= np.outer(u, (2.0 / float(np.dot(u, u))) * (u @ Qt))
+        # Row j now carries the revoked direction; fill it with the last row.
+        last = k - 1
+        if j != last:
+            Qt[j] = Qt[last]
+            moved = self._col_tags[last]
+            self._col_tags[j] = moved
+            if moved is not None:
+                self._tag_cols[moved] = j
+        self._basis[last] = 0.0
+        self._col_tags.pop()
+        self._rank = last
+
     def recall(self, cue: np.ndarray, bias_tag: str | None = None, beta: float = 0.0) -> np.ndarray:
-        x = np.array(cue, dtype=float)
-        rec = self.P_mat @ x
+        x = np.array(cue, dtype=self.dtype)
+        rec = self._project(x)
         if bias_tag is not None and beta != 0.0:
-            enc = OwnershipEncoder(d=self.Oproj.d)
-            u = enc.encode(bias_tag)
-            Phi, _ = self.Oproj.projector(u)
-            rec = (np.eye(self.N) + beta * Phi) @ rec
+            w_hat = self.Oproj.direction(bias_tag)
+            # (I + beta * Phi) rec with Phi = w_hat w_hat^T
+            rec = rec + beta * float(np.dot(w_hat, rec)) * w_hat
         norm = np.linalg.norm(rec)
         if norm < 0.5:
             return np.zeros_like(rec)
         return rec / norm
+
+    def recall_batch(self, X: np.ndarray, bias_tag: str | None = None, beta: float = 0.0) -> np.ndarray:
+        """Recall every row of X (B, N) with a single GEMM against the stored subspace."""
+        X = np.atleast_2d(np.array(X, dtype=self.dtype))
+        rec = self._project_rows(X)
+        if bias_tag is not None and beta != 0.0:
+            w_hat = self.Oproj.direction(bias_tag)
+            rec += beta * np.outer(rec @ w_hat, w_hat)
+        norms = np.linalg.norm(rec, axis=1, keepdims=True)
+        return np.where(norms < 0.5, 0.0, rec / np.where(norms < 0.5, 1.0, norms))
@@ -3,9 +3,19 @@ fpt.events
 Decoupled event interface for projection telemetry and ledger ingestion.
 """
 from __future__ import annotations
+from collections import deque
 from dataclasses import dataclass, field
-from typing import runtime_checkable, Any, Dict, List, Optional, Protocol
+from typing import runtime_checkable, Any, Deque, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple, Union
+import json
+import logging
+import sys
+import threading
 import time
+import numpy as np
+
+logger = logging.getLogger("EventDispatcher")
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "sample")
 
 
 @dataclass(frozen=True)
@@ -20,13 +30,220 @@ class ProjectionEvent:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class _InternTable:
+    """Maps strings to small integer codes; code -1 stands for None."""
+    __slots__ = ("values", "_codes")
+
+    def __init__(self, values: Sequence[str] = ()):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+        for v in values:
+            self.code(v)
+
+    def code(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        c = self._codes.get(value)
+        if c is None:
+            c = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return c
+
+    def encode(self, values: Union[None, str, Sequence[Optional[str]]], n: int) -> np.ndarray:
+        if values is None or isinstance(values, str):
+            return np.full(n, self.code(values), dtype=np.int32)
+        if len(values) != n:
+            raise ValueError(f"Expected {n} values, got {len(values)}")
+        return np.fromiter((self.code(v) for v in values), dtype=np.int32, count=n)
+
+    def decode(self, codes: np.ndarray) -> List[Optional[str]]:
+        lookup = self.values + [None]  # code -1 indexes the trailing None
+        return [lookup[c] for c in codes.tolist()]
+
+
+class ProjectionEventBatch:
+    """
+    Struct-of-arrays batch of projection events.
+
+    Numeric fields are NumPy columns; actions and operator signatures are
+    interned into per-batch vocabularies and stored as int32 codes. Metadata
+    is either one dict shared by the whole batch or a per-event list.
+    Indexing returns a lightweight ProjectionEventView.
+    """
+    __slots__ = ("timestamp_ns", "vector_dim", "projection_norm", "shadow_energy",
+                 "action_codes", "signature_codes", "task_ids", "metadata", "_actions", "_signatures")
+
+    def __init__(
+        self,
+        timestamp_ns: Sequence[int],
+        vector_dim: Union[int, Sequence[int]],
+        projection_norm: Sequence[float],
+        shadow_energy: Sequence[float],
+        action: Union[str, Sequence[str]] = "encode",
+        task_id: Optional[Sequence[Optional[str]]] = None,
+        operator_signature: Union[None, str, Sequence[Optional[str]]] = None,
+        metadata: Union[None, Dict[str, Any], Sequence[Dict[str, Any]]] = None,
+    ):
+        self.timestamp_ns = np.asarray(timestamp_ns, dtype=np.int64).reshape(-1)
+        n = self.timestamp_ns.shape[0]
+        self.vector_dim = np.broadcast_to(np.asarray(vector_dim, dtype=np.int32), (n,)).copy()
+        self.projection_norm = np.asarray(projection_norm, dtype=np.float64).reshape(-1)
+        self.shadow_energy = np.asarray(shadow_energy, dtype=np.float64).reshape(-1)
+        if self.projection_norm.shape[0] != n or self.shadow_energy.shape[0] != n:
+            raise ValueError("All columns must have the same length")
+        self._actions = _InternTable()
+        self._signatures = _InternTable()
+        self.action_codes = self._actions.encode(action, n)
+        self.signature_codes = self._signatures.encode(operator_signature, n)
+        if task_id is not None and len(task_id) != n:
+            raise ValueError(f"Expected {n} task ids, got {len(task_id)}")
+        self.task_ids: Optional[List[Optional[str]]] = None if task_id is None else list(task_id)
+        if metadata is not None and not isinstance(metadata, dict) and len(metadata) != n:
+            raise ValueError(f"Expected {n} metadata entries, got {len(metadata)}")
+        self.metadata = metadata
+
+    @classmethod
+    def from_events(cls, events: Sequence[ProjectionEvent]) -> "ProjectionEventBatch":
+        return cls(
+            timestamp_ns=[e.timestamp_ns for e in events],
+            vector_dim=[e.vector_dim for e in events],
+            projection_norm=[e.projection_norm for e in events],
+            shadow_energy=[e.shadow_energy for e in events],
+            action=[e.action for e in events],
+            task_id=[e.task_id for e in events],
+            operator_signature=[e.operator_signature for e in events],
+            metadata=[e.metadata for e in events],
+        )
+
+    @property
+    def actions(self) -> List[str]:
+        """Action vocabulary; action_codes index into it."""
+        return self._actions.values
+
+    @property
+    def signatures(self) -> List[str]:
+        """Operator signature vocabulary; signature_codes index into it (-1 is None)."""
+        return self._signatures.values
+
+    def __len__(self) -> int:
+        return self.timestamp_ns.shape[0]
+
+    def __getitem__(self, i: int) -> "ProjectionEventView":
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(i)
+        return ProjectionEventView(self, i)
+
+    def __iter__(self) -> Iterator["ProjectionEventView"]:
+        return (ProjectionEventView(self, i) for i in range(len(self)))
+
+    # ---------- Column decoding for bulk writers ----------
+    def action_column(self) -> List[str]:
+        return self._actions.decode(self.action_codes)
+
+    def signature_column(self) -> List[Optional[str]]:
+        return self._signatures.decode(self.signature_codes)
+
+    def task_id_column(self) -> List[Optional[str]]:
+        return self.task_ids if self.task_ids is not None else [None] * len(self)
+
+    def metadata_json_column(self) -> List[str]:
+        """JSON-encoded metadata per event; a shared dict is serialized once."""
+        if self.metadata is None or isinstance(self.metadata, dict):
+            return [json.dumps(self.metadata or {})] * len(self)
+        return [json.dumps(m) for m in self.metadata]
+
+    def to_events(self) -> List[ProjectionEvent]:
+        return [view.to_event() for view in self]
+
+
+class ProjectionEventView:
+    """Read-only single-event view into a ProjectionEventBatch row."""
+    __slots__ = ("_batch", "_i")
+
+    def __init__(self, batch: ProjectionEventBatch, i: int):
+        self._batch = batch
+        self._i = i
+
+    @property
+    def timestamp_ns(self) -> int:
+        return int(self._batch.timestamp_ns[self._i])
+
+    @property
+    def vector_dim(self) -> int:
+        return int(self._batch.vector_dim[self._i])
+
+    @property
+    def projection_norm(self) -> float:
+        return float(self._batch.projection_norm[self._i])
+
+    @property
+    def shadow_energy(self) -> float:
+        return float(self._batch.shadow_energy[self._i])
+
+    @property
+    def action(self) -> str:
+        return self._batch.actions[self._batch.action_codes[self._i]]
+
+    @property
+    def task_id(self) -> Optional[str]:
+        ids = self._batch.task_ids
+        return None if ids is None else ids[self._i]
+
+    @property
+    def operator_signature(self) -> Optional[str]:
+        c = self._batch.signature_codes[self._i]
+        return None if c < 0 else self._batch.signatures[c]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        md = self._batch.metadata
+        if md is None:
+            return {}
+        return md if isinstance(md, dict) else md[self._i]
+
+    def to_event(self) -> ProjectionEvent:
+        return ProjectionEvent(
+            timestamp_ns=self.timestamp_ns,
+            vector_dim=self.vector_dim,
+            projection_norm=self.projection_norm,
+            shadow_energy=self.shadow_energy,
+            action=self.action,
+            task_id=self.task_id,
+            operator_signature=self.operator_signature,
+            metadata=dict(self.metadata),
+        )
+
+    def __repr__(self) -> str:
+        return f"ProjectionEventView(task_id={self.task_id!r}, action={self.action!r}, timestamp_ns={self.timestamp_ns})"
+
+
 @runtime_checkable
 class LedgerListener(Protocol):
+    """
+    Ledger sink for projection events.
+
+    Listeners may also define on_projection_batch(batch) to receive a
+    ProjectionEventBatch in one call; listeners without it get one
+    on_projection call per event (see deliver_batch).
+    """
     def on_projection(self, event: ProjectionEvent) -> None:
         """Handle incoming projection event for ledger inscription or telemetry."""
         ...
 
 
+def deliver_batch(listener: LedgerListener, batch: ProjectionEventBatch) -> None:
+    """Hand a batch to listener.on_projection_batch, or fall back to one ProjectionEvent per row."""
+    on_batch = getattr(listener, "on_projection_batch", None)
+    if on_batch is not None:
+        on_batch(batch)
+    else:
+        for view in batch:
+            listener.on_projection(view.to_event())
+
+
 class EventDispatcher:
     """Dispatches projection events to registered ledger adapters without blocking."""
     def __init__(self):
@@ -38,3 +255,165 @@ class EventDispatcher:
     def dispatch(self, event: ProjectionEvent) -> None:
         for listener in self._listeners:
             listener.on_projection(event)
+
+    def dispatch_batch(self, batch: ProjectionEventBatch) -> None:
+        for listener in self._listeners:
+            deliver_batch(listener, batch)
+
+
+class _ListenerChannel:
+    """Bounded ring of pending events drained by one writer thread for a single listener."""
+    def __init__(self, listener: LedgerListener, capacity: int, overflow: str, sample_every: int):
+        self.listener = listener
+        self.capacity = capacity
+        self.overflow = overflow
+        self.sample_every = sample_every
+        self.ring: Deque[Tuple[float, Union[ProjectionEvent, ProjectionEventBatch]]] = deque()
+        self.cond = threading.Condition()
+        self.closed = False
+        self.busy = False
+        self.enqueued = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self.last_lag_s = 0.0
+        self.max_lag_s = 0.0
+        self._overflow_seen = 0
+        self.thread = threading.Thread(target=self._drain, name=f"ledger-writer-{type(listener).__name__}", daemon=True)
+        self.thread.start()
+
+    def put(self, event: Union[ProjectionEvent, ProjectionEventBatch]) -> None:
+        with self.cond:
+            if self.closed:
+                raise RuntimeError(f"Listener channel for {type(self.listener).__name__} is closed")
+            if len(self.ring) >= self.capacity:
+                if self.overflow == "block":
+                    while len(self.ring) >= self.capacity and not self.closed:
+                        self.cond.wait()
+                    if self.closed:
+                        # Closed while waiting: the writer may already have exited.
+                        raise RuntimeError(f"Listener channel for {type(self.listener).__name__} closed while blocked")
+                elif self.overflow == "drop_oldest":
+                    self.ring.popleft()
+                    self.dropped += 1
+                else:
+                    # sample: admit one of every `sample_every` overflowing events, evicting the oldest
+                    self._overflow_seen += 1
+                    if self._overflow_seen % self.sample_every:
+                        self.dropped += 1
+                        return
+                    self.ring.popleft()
+                    self.dropped += 1
+            self.ring.append((time.monotonic(), event))
+            self.enqueued += 1
+            self.cond.notify_all()
+
+    def _drain(self) -> None:
+        while True:
+            with self.cond:
+                while not self.ring and not self.closed:
+                    self.cond.wait()
+                if not self.ring and self.closed:
+                    return
+                enqueued_at, event = self.ring.popleft()
+                self.busy = True
+                self.cond.notify_all()
+            try:
+                if isinstance(event, ProjectionEventBatch):
+                    deliver_batch(self.listener, event)
+                else:
+                    self.listener.on_projection(event)
+            except Exception as exc:
+                self.failed += 1
+                label = f"batch of {len(event)}" if isinstance(event, ProjectionEventBatch) else f"event {event.task_id}"
+                logger.error(f"Listener {type(self.listener).__name__} failed on {label}: {exc}")
+            lag = time.monotonic() - enqueued_at
+            with self.cond:
+                self.busy = False
+                self.delivered += 1
+                self.last_lag_s = lag
+                self.max_lag_s = max(self.max_lag_s, lag)
+                self.cond.notify_all()
+
+    def wait_idle(self, timeout: Optional[float]) -> bool:
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.ring and not self.busy, timeout=timeout)
+
+    def close(self, timeout: Optional[float]) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        self.thread.join(timeout)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.cond:
+            oldest = time.monotonic() - self.ring[0][0] if self.ring else 0.0
+            return {
+                "queue_depth": len(self.ring),
+                "enqueued": self.enqueued,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "lag_s": max(oldest, self.last_lag_s if self.busy else 0.0),
+                "last_lag_s": self.last_lag_s,
+                "max_lag_s": self.max_lag_s,
+            }
+
+
+class QueuedEventDispatcher(EventDispatcher):
+    """
+    Dispatches projection events through a bounded ring per listener.
+
+    dispatch() only enqueues; each listener is drained by its own writer
+    thread, so a slow listener cannot stall the producer (unless overflow is
+    "block") or the other listeners. Overflow policies: "block" waits for
+    space, "drop_oldest" evicts the oldest pending event, and "sample" keeps
+    one in `sample_every` overflowing events. Dispatching after close(), or
+    while blocked when close() is called, raises RuntimeError. A ProjectionEventBatch passed
+    to dispatch_batch() occupies a single ring slot.
+    """
+    def __init__(self, capacity: int = 10_000, overflow: str = "block", sample_every: int = 10):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        super().__init__()
+        self.capacity = int(capacity)
+        self.overflow = overflow
+        self.sample_every = int(sample_every)
+        self._channels: List[_ListenerChannel] = []
+
+    def register(self, listener: LedgerListener) -> None:
+        super().register(listener)
+        self._channels.append(_ListenerChannel(listener, self.capacity, self.overflow, self.sample_every))
+
+    def dispatch(self, event: ProjectionEvent) -> None:
+        for channel in self._channels:
+            channel.put(event)
+
+    def dispatch_batch(self, batch: ProjectionEventBatch) -> None:
+        for channel in self._channels:
+            channel.put(batch)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every listener has drained its ring; returns False on timeout."""
+        return all(channel.wait_idle(timeout) for channel in self._channels)
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Drain pending events, stop the writer threads, and flush listeners that support it."""
+        for channel in self._channels:
+            channel.close(timeout)
+            flush = getattr(channel.listener, "flush", None)
+            if callable(flush):
+                flush()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-listener queue depth, counters and delivery lag, keyed by listener class and index."""
+        return {
+            f"{type(channel.listener).__name__}[{i}]": channel.metrics()
+            for i, channel in enumerate(self._channels)
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,214 @@
+"""
+fpt.ledger_chain
+Hash chain, Merkle checkpoints and verification for chained projection ledgers.
+
+In chained mode (SovereignLedgerAdapter(chained=True)) every projection_records
+row stores
+
+  prev_hash = row_hash of the previous chained row (GENESIS_HASH for the first)
+  row_hash  = SHA-256(prev_hash || encode_record(row))
+
+where encode_record is a fixed big-endian binary layout, so hashes do not
+depend on JSON formatting or float repr. Every `checkpoint_every` rows a
+ledger_checkpoints row records the id range, the RFC 6962 Merkle root of
+the segment's row hashes and the chain head at its end.
+
+Checkpointed segments can be verified independently, so verify_chain()
+checks them in parallel and, given a state file, resumes after the last
+checkpoint it verified. Resuming re-checks that checkpoint's root and head
+but not the rows beneath it; run without state for a full audit.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import sqlite3
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+from .merkle import merkle_root
+
+GENESIS_HASH = b"\x00" * 32
+
+_NUMERIC = struct.Struct(">qqdd")
+_LENGTH = struct.Struct(">i")
+
+
+def _encode_text(value: Optional[str]) -> bytes:
+    if value is None:
+        return _LENGTH.pack(-1)
+    raw = value.encode("utf-8")
+    return _LENGTH.pack(len(raw)) + raw
+
+
+def encode_record(task_id: Optional[str], timestamp_ns: int, vector_dim: int, projection_norm: float,
+                  shadow_energy: float, action: Optional[str], operator_signature: Optional[str],
+                  metadata_json: Optional[str]) -> bytes:
+    """Canonical binary encoding of one projection_records row (column order of the table)."""
+    return b"".join((
+        _NUMERIC.pack(int(timestamp_ns), int(vector_dim), float(projection_norm), float(shadow_energy)),
+        _encode_text(task_id),
+        _encode_text(action),
+        _encode_text(operator_signature),
+        _encode_text(metadata_json),
+    ))
+
+
+def chain_hash(prev_hash: bytes, record: Sequence[Any]) -> bytes:
+    return hashlib.sha256(prev_hash + encode_record(*record)).digest()
+
+
+# ---------- Verification ----------
+_RECORD_COLUMNS = ("id, task_id, timestamp_ns, vector_dim, projection_norm, shadow_energy, "
+                   "action, operator_signature, metadata_json, prev_hash, row_hash")
+
+
+@dataclass
+class ChainVerification:
+    ok: bool
+    rows_verified: int
+    checkpoints_verified: int
+    last_checkpoint: Optional[int] = None
+    first_bad_id: Optional[int] = None
+    reason: Optional[str] = None
+
+
+def _connect_ro(db_path: str) -> sqlite3.Connection:
+    return sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+
+
+def _walk(rows: Iterable[Tuple[Any, ...]], prev_hash: bytes) -> Tuple[int, bytes, List[bytes], Optional[Tuple[int, str]]]:
+    """Re-hash rows in id order from prev_hash; returns (count, head, row hashes, failure)."""
+    count, hashes = 0, []
+    for row in rows:
+        row_id, record, stored_prev, stored_hash = row[0], row[1:9], row[9], row[10]
+        if stored_hash is None:
+            return count, prev_hash, hashes, (row_id, "row is not chained")
+        if stored_prev != prev_hash:
+            return count, prev_hash, hashes, (row_id, "prev_hash does not link to previous row")
+        expected = chain_hash(prev_hash, record)
+        if stored_hash != expected:
+            return count, prev_hash, hashes, (row_id, "row_hash mismatch")
+        hashes.append(expected)
+        prev_hash = expected
+        count += 1
+    return count, prev_hash, hashes, None
+
+
+def _verify_segment(db_path: str, checkpoint: Tuple[Any, ...], prev_hash: bytes) -> Tuple[int, Optional[Tuple[int, str]]]:
+    seq, first_id, last_id, row_count, root, head = checkpoint
+    conn = _connect_ro(db_path)
+    try:
+        rows = conn.execute(
+            f"SELECT {_RECORD_COLUMNS} FROM projection_records WHERE id BETWEEN ? AND ? ORDER BY id",
+            (first_id, last_id),
+        )
+        count, tip, hashes, failure = _walk(rows, prev_hash)
+    finally:
+        conn.close()
+    if failure is not None:
+        return count, failure
+    if count != row_count:
+        return count, (last_id, f"checkpoint {seq} covers {row_count} rows, found {count}")
+    if tip != head:
+        return count, (last_id, f"checkpoint {seq} chain head mismatch")
+    if merkle_root(hashes) != root:
+        return count, (last_id, f"checkpoint {seq} Merkle root mismatch")
+    return count, None
+
+
+def _load_state(state_path: Optional[str]) -> Optional[dict]:
+    if state_path is None or not os.path.exists(state_path):
+        return None
+    with open(state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(state_path: str, checkpoint: Tuple[Any, ...]) -> None:
+    seq, _, last_id, _, root, head = checkpoint
+    tmp = state_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"checkpoint": seq, "last_id": last_id, "merkle_root": root.hex(), "chain_head": head.hex()}, f)
+    os.replace(tmp, state_path)
+
+
+def verify_chain(db_path: str, workers: int = 1, state_path: Optional[str] = None,
+                 verify_tail: bool = True) -> ChainVerification:
+    """
+    Verify the hash chain and Merkle checkpoints of a chained projection ledger.
+
+    Checkpointed segments are checked on `workers` processes; rows after the
+    last checkpoint are then walked from its chain head. With `state_path`,
+    verification resumes after the checkpoint recorded there and the file is
+    advanced to the last checkpoint that verified. Rows older than the first
+    chained row predate chaining and are skipped; any later row without a
+    row_hash fails verification.
+    """
+    conn = _connect_ro(db_path)
+    try:
+        checkpoints = conn.execute(
+            "SELECT seq, first_id, last_id, row_count, merkle_root, chain_head FROM ledger_checkpoints ORDER BY seq"
+        ).fetchall()
+        # Rows before the first chained row predate chaining; every row after it must be chained.
+        chain_start = conn.execute(
+            "SELECT MIN(id) FROM projection_records WHERE row_hash IS NOT NULL").fetchone()[0]
+        if checkpoints and (chain_start is None or checkpoints[0][1] < chain_start):
+            chain_start = checkpoints[0][1]
+    finally:
+        conn.close()
+
+    prev_hash, start = GENESIS_HASH, 0
+    state = _load_state(state_path)
+    if state is not None:
+        idx = next((i for i, cp in enumerate(checkpoints) if cp[0] == state["checkpoint"]), None)
+        if idx is None:
+            return ChainVerification(False, 0, 0, reason=f"checkpoint {state['checkpoint']} from state file is missing")
+        cp = checkpoints[idx]
+        if cp[4].hex() != state["merkle_root"] or cp[5].hex() != state["chain_head"]:
+            return ChainVerification(False, 0, 0, last_checkpoint=cp[0], first_bad_id=cp[2],
+                                     reason=f"checkpoint {cp[0]} differs from verified state")
+        prev_hash, start = cp[5], idx + 1
+
+    pending = checkpoints[start:]
+    # Each segment starts from the head recorded by the checkpoint before it;
+    # a forged head is caught when that earlier segment is re-hashed.
+    starts = [prev_hash] + [cp[5] for cp in pending[:-1]]
+    if workers > 1 and len(pending) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_verify_segment, [db_path] * len(pending), pending, starts))
+    else:
+        results = [_verify_segment(db_path, cp, h) for cp, h in zip(pending, starts)]
+
+    rows = 0
+    last_ok = checkpoints[start - 1] if start else None
+    for done, (cp, (count, failure)) in enumerate(zip(pending, results)):
+        rows += count
+        if failure is not None:
+            if state_path is not None and last_ok is not None:
+                _save_state(state_path, last_ok)
+            return ChainVerification(False, rows, done, last_checkpoint=last_ok[0] if last_ok else None,
+                                     first_bad_id=failure[0], reason=failure[1])
+        last_ok = cp
+    if state_path is not None and last_ok is not None:
+        _save_state(state_path, last_ok)
+
+    result = ChainVerification(True, rows, len(pending), last_checkpoint=last_ok[0] if last_ok else None)
+    if verify_tail and chain_start is not None:
+        tail_from = last_ok[2] if last_ok else chain_start - 1
+        head = last_ok[5] if last_ok else GENESIS_HASH
+        conn = _connect_ro(db_path)
+        try:
+            tail = conn.execute(
+                f"SELECT {_RECORD_COLUMNS} FROM projection_records WHERE id > ? ORDER BY id",
+                (tail_from,),
+            )
+            count, _, _, failure = _walk(tail, head)
+        finally:
+            conn.close()
+        result.rows_verified += count
+        if failure is not None:
+            result.ok, result.first_bad_id, result.reason = False, failure[0], failure[1]
+    return result
@@ -0,0 +1,327 @@
+"""
+fpt.ledger_reader
+Read-only, index-backed queries over the SQLite ledgers written by fpt.adapters.
+
+Scans are keyset-paginated on (timestamp_ns, id), so each page is a single
+index range seek regardless of how deep into the ledger it starts, and rows
+are returned as ProjectionEventBatch pages rather than per-row objects.
+The indexes are created by the adapters' schema migrations; open the
+database with an adapter once (or call fpt.adapters.migrate_schema) before
+querying a ledger written by an older version.
+
+SegmentLedgerReader reads the segment files of SegmentLedgerAdapter through
+mmap: each segment's records are exposed as a zero-copy NumPy structured
+array, so column analytics never materialize rows.
+"""
+from __future__ import annotations
+import json
+import mmap
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from .adapters import RECORD_DTYPE, SEGMENT_HEADER, SEGMENT_MAGIC, read_seal_marker, read_segment_footer
+from .events import ProjectionEventBatch, ProjectionEventView
+
+# Per-table SQL expressions for the ProjectionEventBatch columns.
+_TABLE_COLUMNS = {
+    "projection_records": {
+        "task_id": "task_id",
+        "timestamp_ns": "timestamp_ns",
+        "vector_dim": "vector_dim",
+        "projection_norm": "projection_norm",
+        "shadow_energy": "shadow_energy",
+        "action": "action",
+        "operator_signature": "operator_signature",
+        "metadata_json": "metadata_json",
+    },
+    "manifold_telemetry": {
+        "task_id": "NULL",
+        "timestamp_ns": "timestamp_ns",
+        "vector_dim": "vector_dim",
+        "projection_norm": "norm",
+        "shadow_energy": "residual_energy",
+        "action": "NULL",
+        "operator_signature": "NULL",
+        "metadata_json": "NULL",
+    },
+}
+
+Cursor = Tuple[int, int]
+
+
+class LedgerReader:
+    """Query API over projection_records (SovereignLedgerAdapter) or manifold_telemetry (TordialManifoldAdapter)."""
+    def __init__(self, db_path: str, table: str = "projection_records", include_metadata: bool = True):
+        if table not in _TABLE_COLUMNS:
+            raise ValueError(f"Unknown ledger table: {table}")
+        self.db_path = db_path
+        self.table = table
+        self.include_metadata = include_metadata
+        self._cols = dict(_TABLE_COLUMNS[table])
+        if not include_metadata:
+            # Skips per-row JSON decoding on large scans.
+            self._cols["metadata_json"] = "NULL"
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(
+            Path(db_path).resolve().as_uri() + "?mode=ro", uri=True)
+        self._select = f"SELECT id, {', '.join(self._cols.values())} FROM {table}"
+
+    def _where(self, start_ns: Optional[int], end_ns: Optional[int], action: Optional[str],
+               task_id: Optional[str]) -> Tuple[List[str], List[Any]]:
+        clauses: List[str] = []
+        params: List[Any] = []
+        if (action is not None or task_id is not None) and self.table != "projection_records":
+            raise ValueError(f"{self.table} has no action/task_id columns")
+        if start_ns is not None:
+            clauses.append("timestamp_ns >= ?")
+            params.append(int(start_ns))
+        if end_ns is not None:
+            clauses.append("timestamp_ns < ?")
+            params.append(int(end_ns))
+        if action is not None:
+            clauses.append("action = ?")
+            params.append(action)
+        if task_id is not None:
+            clauses.append("task_id = ?")
+            params.append(task_id)
+        return clauses, params
+
+    def page(
+        self,
+        start_ns: Optional[int] = None,
+        end_ns: Optional[int] = None,
+        action: Optional[str] = None,
+        task_id: Optional[str] = None,
+        after: Optional[Cursor] = None,
+        limit: int = 10_000,
+    ) -> Tuple[ProjectionEventBatch, Optional[Cursor]]:
+        """
+        Fetch up to `limit` rows in [start_ns, end_ns) ordered by (timestamp_ns, id).
+
+        Returns the page and the cursor to pass as `after` for the next page,
+        or None once the range is exhausted.
+        """
+        clauses, params = self._where(start_ns, end_ns, action, task_id)
+        if after is not None:
+            clauses.append("(timestamp_ns, id) > (?, ?)")
+            params.extend(after)
+        sql = self._select
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp_ns, id LIMIT ?"
+        rows = self._conn.execute(sql, (*params, int(limit))).fetchall()
+        batch = self._to_batch(rows)
+        cursor = (rows[-1][2], rows[-1][0]) if len(rows) == limit else None
+        return batch, cursor
+
+    def scan(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None, action: Optional[str] = None,
+             task_id: Optional[str] = None, page_size: int = 10_000) -> Iterator[ProjectionEventBatch]:
+        """Stream the time range as ProjectionEventBatch pages of at most `page_size` rows."""
+        cursor: Optional[Cursor] = None
+        while True:
+            batch, cursor = self.page(start_ns, end_ns, action, task_id, after=cursor, limit=page_size)
+            if len(batch):
+                yield batch
+            if cursor is None:
+                return
+
+    def iter_range(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+                   action: Optional[str] = None, task_id: Optional[str] = None,
+                   page_size: int = 10_000) -> Iterator[ProjectionEventView]:
+        """Iterate single-event views over the time range, fetching `page_size` rows at a time."""
+        for batch in self.scan(start_ns, end_ns, action, task_id, page_size):
+            yield from batch
+
+    def aggregate_by_action(self, start_ns: Optional[int] = None,
+                            end_ns: Optional[int] = None) -> Dict[Optional[str], Dict[str, float]]:
+        """Per-action count, mean projection norm and max shadow energy over [start_ns, end_ns)."""
+        cols = self._cols
+        clauses, params = self._where(start_ns, end_ns, None, None)
+        sql = (f"SELECT {cols['action']}, COUNT(*), AVG({cols['projection_norm']}), "
+               f"MAX({cols['shadow_energy']}) FROM {self.table}")
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" GROUP BY {cols['action']}"
+        return {
+            action: {"count": count, "mean_norm": mean_norm, "max_shadow_energy": max_shadow}
+            for action, count, mean_norm, max_shadow in self._conn.execute(sql, params)
+        }
+
+    def count(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+              action: Optional[str] = None, task_id: Optional[str] = None) -> int:
+        clauses, params = self._where(start_ns, end_ns, action, task_id)
+        sql = f"SELECT COUNT(*) FROM {self.table}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        return self._conn.execute(sql, params).fetchone()[0]
+
+    def _to_batch(self, rows: List[Tuple[Any, ...]]) -> ProjectionEventBatch:
+        _, task_ids, ts, dims, norms, energies, actions, sigs, metadata = zip(*rows) if rows else ((),) * 9
+        return ProjectionEventBatch(
+            timestamp_ns=ts,
+            vector_dim=dims,
+            projection_norm=norms,
+            shadow_energy=energies,
+            action=[a if a is not None else "encode" for a in actions],
+            task_id=task_ids,
+            operator_signature=sigs,
+            metadata=[json.loads(m) if m else {} for m in metadata] if self.include_metadata else None,
+        )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SegmentLedgerReader:
+    """Zero-copy scans over a SegmentLedgerAdapter directory."""
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self._maps: List[mmap.mmap] = []
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Re-read the segment list, interned strings and the open tail segment."""
+        self.strings: List[str] = []
+        strings_path = self.directory / "strings.log"
+        if strings_path.exists():
+            with open(strings_path, "r", encoding="utf-8") as f:
+                self.strings = [json.loads(line) for line in f if line.endswith("\n")]
+        self._segments: List[Tuple[Path, Optional[Dict[str, Any]], np.ndarray]] = []
+        self._maps = []
+        for path in sorted(self.directory.glob("segment-*.rec")):
+            footer = read_segment_footer(path)
+            self._segments.append((path, footer, self._map_records(path, footer)))
+
+    def _map_records(self, path: Path, footer: Optional[Dict[str, Any]]) -> np.ndarray:
+        end = footer["data_end"] if footer is not None else read_seal_marker(path)
+        if end is None:
+            end = path.stat().st_size
+        count = max(0, (end - SEGMENT_HEADER.size) // RECORD_DTYPE.itemsize)
+        if count == 0:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, record_size, _ = SEGMENT_HEADER.unpack_from(mm, 0)
+        if magic != SEGMENT_MAGIC or record_size != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a projection segment")
+        self._maps.append(mm)
+        return np.frombuffer(mm, dtype=RECORD_DTYPE, count=count, offset=SEGMENT_HEADER.size)
+
+    def __len__(self) -> int:
+        return sum(records.shape[0] for _, _, records in self._segments)
+
+    def segments(self) -> Iterator[np.ndarray]:
+        """Yield each segment's records as a read-only structured array backed by the mmap."""
+        for _, _, records in self._segments:
+            yield records
+
+    def _scan(self, start_ns: Optional[int], end_ns: Optional[int]) -> Iterator[Tuple[Path, np.ndarray]]:
+        lo = -np.inf if start_ns is None else start_ns
+        hi = np.inf if end_ns is None else end_ns
+        for path, footer, records in self._segments:
+            if not records.shape[0]:
+                continue
+            if footer is not None:
+                if footer["ts_max"] < lo or footer["ts_min"] >= hi:
+                    continue
+                if footer["sorted"]:
+                    ts = records["timestamp_ns"]
+                    i = 0 if start_ns is None else int(np.searchsorted(ts, start_ns, side="left"))
+                    j = ts.shape[0] if end_ns is None else int(np.searchsorted(ts, end_ns, side="left"))
+                    if j > i:
+                        yield path, records[i:j]
+                    continue
+            ts = records["timestamp_ns"]
+            mask = (ts >= lo) & (ts < hi)
+            if mask.all():
+                yield path, records
+            elif mask.any():
+                yield path, records[mask]
+
+    def scan(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> Iterator[np.ndarray]:
+        """
+        Yield record arrays with timestamp_ns in [start_ns, end_ns).
+
+        Sealed segments outside the range are skipped via their footer, and
+        time-ordered segments are sliced with a binary search (a view, no copy);
+        other segments are filtered with a boolean mask.
+        """
+        for _, records in self._scan(start_ns, end_ns):
+            yield records
+
+    def scan_batches(self, start_ns: Optional[int] = None, end_ns: Optional[int] = None,
+                     include_metadata: bool = True) -> Iterator[ProjectionEventBatch]:
+        """Like scan(), but materialized as ProjectionEventBatch (task ids and metadata from the side file)."""
+        for path, records in self._scan(start_ns, end_ns):
+            yield self._to_batch(records, path.with_suffix(".meta") if include_metadata else None)
+
+    def column(self, name: str, start_ns: Optional[int] = None, end_ns: Optional[int] = None) -> np.ndarray:
+        """Concatenate one numeric column over the range."""
+        parts = [records[name] for records in self.scan(start_ns, end_ns)]
+        return np.concatenate(parts) if parts else np.zeros(0, dtype=RECORD_DTYPE[name])
+
+    def aggregate_by_action(self, start_ns: Optional[int] = None,
+                            end_ns: Optional[int] = None) -> Dict[Optional[str], Dict[str, float]]:
+        """Per-action count, mean projection norm and max shadow energy, computed on the columns."""
+        size = len(self.strings) + 1  # last slot collects code -1 (no action)
+        counts = np.zeros(size, dtype=np.int64)
+        sums = np.zeros(size)
+        maxima = np.full(size, -np.inf)
+        for records in self.scan(start_ns, end_ns):
+            codes = records["action"]
+            codes = np.where(codes < 0, size - 1, codes)
+            counts += np.bincount(codes, minlength=size)
+            sums += np.bincount(codes, weights=records["projection_norm"], minlength=size)
+            np.maximum.at(maxima, codes, records["shadow_energy"])
+        names = self.strings + [None]
+        return {
+            names[c]: {"count": int(counts[c]), "mean_norm": float(sums[c] / counts[c]),
+                       "max_shadow_energy": float(maxima[c])}
+            for c in np.flatnonzero(counts)
+        }
+
+    def _to_batch(self, records: np.ndarray, meta_path: Optional[Path]) -> ProjectionEventBatch:
+        lookup = self.strings + [None]
+        actions = [lookup[c] if c >= 0 else "encode" for c in records["action"].tolist()]
+        task_ids, metadata = None, None
+        if meta_path is not None:
+            task_ids, metadata = [], []
+            with open(meta_path, "rb") as f:
+                for off, length in zip(records["meta_offset"].tolist(), records["meta_length"].tolist()):
+                    if length == 0:
+                        task_ids.append(None)
+                        metadata.append({})
+                        continue
+                    f.seek(off)
+                    tid, _, md = f.read(length).partition(b"\t")
+                    task_ids.append(json.loads(tid))
+                    metadata.append(json.loads(md))
+        return ProjectionEventBatch(
+            timestamp_ns=records["timestamp_ns"],
+            vector_dim=records["vector_dim"],
+            projection_norm=records["projection_norm"],
+            shadow_energy=records["shadow_energy"],
+            action=actions,
+            task_id=task_ids,
+            operator_signature=[lookup[c] for c in records["signature"].tolist()],
+            metadata=metadata,
+        )
+
+    def close(self) -> None:
+        # Arrays handed out by segments()/scan() keep their mmap alive until released.
+        self._segments = []
+        self._maps = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
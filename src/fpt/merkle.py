@@ -0,0 +1,258 @@
+"""
+fpt.merkle
+RFC 6962 Merkle trees over raw 32-byte SHA-256 digests.
+
+  leaf hash  = SHA-256(0x00 || data)
+  node hash  = SHA-256(0x01 || left || right)
+  empty root = SHA-256(b"")
+
+Each level is one contiguous bytes buffer with a 32-byte slot per node,
+built iteratively bottom-up; an odd last node is carried up unchanged, which
+gives the RFC's largest-power-of-two split. merkle_root() holds only the
+current level and its parent, while MerkleTree keeps every level for
+inclusion, consistency and multi-leaf proofs.
+
+Leaves may be bytes or str (encoded as UTF-8). Callers that already hold
+digests (e.g. SHA-256 hex ids) should pass the raw bytes, not the hex text.
+"""
+from __future__ import annotations
+import hashlib
+from typing import Dict, Iterable, List, Mapping, Sequence, Union
+
+DIGEST_SIZE = 32
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+EMPTY_ROOT = hashlib.sha256(b"").digest()
+
+Leaf = Union[bytes, bytearray, memoryview, str]
+
+_LEAF_HASHER = hashlib.sha256(LEAF_PREFIX)
+_NODE_HASHER = hashlib.sha256(NODE_PREFIX)
+
+
+def hash_leaf(data: Leaf) -> bytes:
+    h = _LEAF_HASHER.copy()
+    h.update(data.encode("utf-8") if isinstance(data, str) else data)
+    return h.digest()
+
+
+def hash_node(left: bytes, right: bytes) -> bytes:
+    h = _NODE_HASHER.copy()
+    h.update(left)
+    h.update(right)
+    return h.digest()
+
+
+def hash_leaves(leaves: Iterable[Leaf]) -> bytes:
+    """Leaf-hash a batch into one contiguous buffer of len(leaves) * 32 bytes."""
+    base, digests = _LEAF_HASHER, []
+    append = digests.append
+    for data in leaves:
+        h = base.copy()
+        h.update(data.encode("utf-8") if isinstance(data, str) else data)
+        append(h.digest())
+    return b"".join(digests)
+
+
+def _parent_level(level: bytes) -> bytes:
+    """Hash adjacent pairs of a level buffer; an odd last node is carried up as is."""
+    sha256, prefix, pair = hashlib.sha256, NODE_PREFIX, 2 * DIGEST_SIZE
+    paired = len(level) - len(level) % pair
+    parent = b"".join([sha256(prefix + level[i:i + pair]).digest() for i in range(0, paired, pair)])
+    return parent + level[paired:] if paired < len(level) else parent
+
+
+def root_from_hashes(level: bytes) -> bytes:
+    """Merkle root of a buffer of concatenated leaf hashes."""
+    if len(level) % DIGEST_SIZE:
+        raise ValueError(f"leaf hash buffer length {len(level)} is not a multiple of {DIGEST_SIZE}")
+    if not level:
+        return EMPTY_ROOT
+    level = bytes(level)
+    while len(level) > DIGEST_SIZE:
+        level = _parent_level(level)
+    return level
+
+
+def merkle_root(leaves: Iterable[Leaf]) -> bytes:
+    """RFC 6962 Merkle tree hash of `leaves`."""
+    return root_from_hashes(hash_leaves(leaves))
+
+
+# ---------- Full tree & proofs ----------
+def _largest_power_of_two_below(n: int) -> int:
+    return 1 << ((n - 1).bit_length() - 1)
+
+
+class MerkleTree:
+    """All levels of an RFC 6962 tree; levels[0] holds the leaf hashes."""
+
+    def __init__(self, leaves: Iterable[Leaf] = ()):
+        self._build(hash_leaves(leaves))
+
+    @classmethod
+    def from_leaf_hashes(cls, level: bytes) -> "MerkleTree":
+        if len(level) % DIGEST_SIZE:
+            raise ValueError(f"leaf hash buffer length {len(level)} is not a multiple of {DIGEST_SIZE}")
+        tree = cls.__new__(cls)
+        tree._build(bytes(level))
+        return tree
+
+    def _build(self, level: bytes) -> None:
+        self.levels: List[bytes] = [level]
+        while len(level) > DIGEST_SIZE:
+            level = _parent_level(level)
+            self.levels.append(level)
+
+    @property
+    def size(self) -> int:
+        return len(self.levels[0]) // DIGEST_SIZE
+
+    @property
+    def root(self) -> bytes:
+        return bytes(self.levels[-1]) if self.size else EMPTY_ROOT
+
+    def _node(self, height: int, index: int) -> bytes:
+        return bytes(self.levels[height][index * DIGEST_SIZE:(index + 1) * DIGEST_SIZE])
+
+    def leaf_hash(self, index: int) -> bytes:
+        if not 0 <= index < self.size:
+            raise IndexError(f"leaf index {index} out of range for tree of size {self.size}")
+        return self._node(0, index)
+
+    def _subtree(self, start: int, end: int) -> bytes:
+        # Ranges produced by the consistency recursion are either aligned
+        # perfect subtrees or end at the tree size, so each is a stored node.
+        height = (end - start - 1).bit_length()
+        return self._node(height, start >> height)
+
+    def inclusion_proof(self, index: int) -> List[bytes]:
+        """Audit path for leaf `index`, leaf level first."""
+        if not 0 <= index < self.size:
+            raise IndexError(f"leaf index {index} out of range for tree of size {self.size}")
+        proof = []
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling * DIGEST_SIZE < len(level):
+                proof.append(bytes(level[sibling * DIGEST_SIZE:(sibling + 1) * DIGEST_SIZE]))
+            index >>= 1
+        return proof
+
+    def consistency_proof(self, old_size: int) -> List[bytes]:
+        """Proof that the first `old_size` leaves form a prefix of this tree (RFC 6962 2.1.2)."""
+        if not 0 <= old_size <= self.size:
+            raise ValueError(f"old_size {old_size} must be within [0, {self.size}]")
+        if old_size in (0, self.size):
+            return []
+        # Unrolled SUBPROOF recursion; `m` counts old leaves within [start, end).
+        proof: List[bytes] = []
+        m, start, end, complete = old_size, 0, self.size, True
+        while m != end - start:
+            k = _largest_power_of_two_below(end - start)
+            if m <= k:
+                proof.append(self._subtree(start + k, end))
+                end = start + k
+            else:
+                proof.append(self._subtree(start, start + k))
+                m, start, complete = m - k, start + k, False
+        if not complete:
+            proof.append(self._subtree(start, end))
+        proof.reverse()
+        return proof
+
+    def multi_proof(self, indices: Iterable[int]) -> List[bytes]:
+        """Sibling hashes needed to rebuild the root from the leaves at `indices`, bottom-up."""
+        known = sorted(set(indices))
+        if known and not (0 <= known[0] and known[-1] < self.size):
+            raise IndexError(f"leaf indices must lie in [0, {self.size})")
+        proof: List[bytes] = []
+        for height, level in enumerate(self.levels[:-1]):
+            count = len(level) // DIGEST_SIZE
+            present = set(known)
+            for i in known:
+                sibling = i ^ 1
+                if sibling < count and sibling not in present:
+                    proof.append(self._node(height, sibling))
+            known = sorted({i >> 1 for i in known})
+        return proof
+
+
+# ---------- Verification ----------
+def verify_inclusion(leaf_hash: bytes, index: int, size: int, proof: Sequence[bytes], root: bytes) -> bool:
+    """Check an inclusion proof for the leaf hash at `index` in a tree of `size` leaves."""
+    if not 0 <= index < size:
+        return False
+    fn, sn, r = index, size - 1, leaf_hash
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = hash_node(p, r)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            r = hash_node(r, p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(old_size: int, new_size: int, old_root: bytes, new_root: bytes,
+                       proof: Sequence[bytes]) -> bool:
+    """Check that the tree of `old_size` leaves is a prefix of the tree of `new_size` leaves."""
+    if not 0 <= old_size <= new_size:
+        return False
+    if old_size == 0:
+        return not proof
+    if old_size == new_size:
+        return not proof and old_root == new_root
+    path = list(proof)
+    if old_size & (old_size - 1) == 0:
+        path.insert(0, old_root)
+    if not path:
+        return False
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+    fr = sr = path[0]
+    for c in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = hash_node(c, fr)
+            sr = hash_node(c, sr)
+            while not fn & 1 and fn:
+                fn >>= 1
+                sn >>= 1
+        else:
+            sr = hash_node(sr, c)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and fr == old_root and sr == new_root
+
+
+def verify_multi_proof(leaf_hashes: Mapping[int, bytes], size: int, proof: Sequence[bytes], root: bytes) -> bool:
+    """Check a MerkleTree.multi_proof for the given {index: leaf_hash} map."""
+    if not leaf_hashes or any(not 0 <= i < size for i in leaf_hashes):
+        return False
+    nodes: Dict[int, bytes] = dict(leaf_hashes)
+    supplied, count = iter(proof), size
+    try:
+        while count > 1:
+            parents: Dict[int, bytes] = {}
+            for i in sorted(nodes):
+                parent = i >> 1
+                if parent in parents:
+                    continue
+                sibling = i ^ 1
+                if sibling >= count:
+                    parents[parent] = nodes[i]
+                    continue
+                other = nodes[sibling] if sibling in nodes else next(supplied)
+                parents[parent] = hash_node(nodes[i], other) if i < sibling else hash_node(other, nodes[i])
+            nodes, count = parents, (count + 1) // 2
+    except StopIteration:
+        return False
+    return next(supplied, None) is None and nodes.get(0) == root
@@ -2,19 +2,47 @@
 async_dispatch_pipeline.py
 Asynchronous worker pool and task dispatcher for Feedback Processor Theory.
 Supports batch chunking, concurrent processing, backpressure, and DLQ routing.
+Handlers can run inline on the event loop or in a thread/process executor.
+Failed tasks are re-enqueued through a delay heap with jittered backoff, so
+retries never hold a worker slot or block the event loop.
 """
 from __future__ import annotations
 import asyncio
+import heapq
+import inspect
+import itertools
 import logging
+import pickle
 import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Union
 
+from .dead_letter import DeadLetterBackend, DeadLetterError
 from .ingestion_recovery import IngestionPipeline
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
 logger = logging.getLogger("AsyncDispatcher")
 
+EXECUTOR_MODES = (None, "thread", "process")
+_HANDLER_REGISTRY: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+
+
+def register_handler(name: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+    """Register a picklable handler by name so it can be dispatched to process workers."""
+    try:
+        pickle.dumps(handler)
+    except Exception as exc:
+        raise TypeError(f"Handler '{name}' is not picklable: {exc}") from exc
+    _HANDLER_REGISTRY[name] = handler
+
+
+def _mark_retrieved(future: asyncio.Future) -> None:
+    # Failures are already logged and dead-lettered; fire-and-forget callers should not
+    # also get "exception was never retrieved" warnings. Awaiting the future still raises.
+    if not future.cancelled():
+        future.exception()
+
 
 @dataclass
 class ProcessingTask:
@@ -22,6 +50,7 @@ class ProcessingTask:
     payload: Dict[str, Any]
     retries: int = 0
     created_at: float = field(default_factory=time.time)
+    future: Optional[asyncio.Future] = field(default=None, repr=False, compare=False)
 
 
 class AsyncWorkerPool:
@@ -31,12 +60,70 @@ class AsyncWorkerPool:
         max_queue_size: int = 1000,
         max_retries: int = 3,
         base_backoff: float = 0.05,
+        executor: Optional[str] = None,
+        executor_workers: Optional[int] = None,
+        dead_letter_queue: Optional[DeadLetterBackend] = None,
     ):
+        if executor not in EXECUTOR_MODES:
+            raise ValueError(f"Unknown executor mode: {executor}")
         self.num_workers = num_workers
         self.queue: asyncio.Queue[Optional[ProcessingTask]] = asyncio.Queue(maxsize=max_queue_size)
-        self.recovery = IngestionPipeline(max_retries=max_retries, base_delay=base_backoff)
+        self.recovery = IngestionPipeline(
+            max_retries=max_retries, base_delay=base_backoff, dead_letter_queue=dead_letter_queue
+        )
         self.workers: List[asyncio.Task] = []
+        self.executor_mode = executor
+        self.executor_workers = executor_workers or num_workers
+        self._executor: Optional[Executor] = None
         self._is_running = False
+        self._in_flight = 0
+        self._processed = 0
+        self._failed = 0
+        self._busy_s = [0.0] * num_workers
+        self._started_at: Optional[float] = None
+        self._delayed: List[tuple] = []
+        self._delay_seq = itertools.count()
+        self._delay_wakeup = asyncio.Event()
+        self._delay_task: Optional[asyncio.Task] = None
+        self._outstanding = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+
+    async def _attempt(self, task: ProcessingTask, handler: Callable[[Dict[str, Any]], Any]) -> Any:
+        """Run a single handler attempt for task and return its result; raises on failure."""
+        if self._executor is None:
+            result = handler(task.payload)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, handler, task.payload)
+
+    def _schedule_retry(self, task: ProcessingTask, delay: float) -> None:
+        heapq.heappush(self._delayed, (time.monotonic() + delay, next(self._delay_seq), task))
+        self._delay_wakeup.set()
+
+    async def _delay_loop(self):
+        """Move tasks whose backoff has elapsed from the delay heap back onto the queue."""
+        while True:
+            self._delay_wakeup.clear()
+            if not self._delayed:
+                await self._delay_wakeup.wait()
+                continue
+            due = self._delayed[0][0] - time.monotonic()
+            if due > 0:
+                try:
+                    await asyncio.wait_for(self._delay_wakeup.wait(), timeout=due)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            _, _, task = heapq.heappop(self._delayed)
+            await self.queue.put(task)
+
+    def _finish(self) -> None:
+        self._outstanding -= 1
+        if self._outstanding == 0:
+            self._drained.set()
 
     async def _worker_loop(self, worker_id: int, handler: Callable[[Dict[str, Any]], Any]):
         logger.info(f"Worker-{worker_id} started.")
@@ -46,40 +133,120 @@ class AsyncWorkerPool:
                 self.queue.task_done()
                 break
 
+            self._in_flight += 1
+            t0 = time.perf_counter()
             try:
-                success = self.recovery.process_record_with_recovery(
-                    record={"id": task.task_id, "data": task.payload},
-                    handler=lambda r: handler(r["data"]),
-                )
-                if not success:
-                    logger.warning(f"Worker-{worker_id}: Task {task.task_id} routed to DLQ.")
+                result = await self._attempt(task, handler)
+                self._processed += 1
+                if task.future is not None and not task.future.done():
+                    task.future.set_result(result)
+                self._finish()
             except Exception as exc:
-                logger.error(f"Worker-{worker_id}: Unhandled exception processing {task.task_id}: {exc}")
+                task.retries += 1
+                if task.retries < self.recovery.max_retries:
+                    backoff = self.recovery.backoff_delay(task.retries, jitter=True)
+                    logger.warning(f"Worker-{worker_id}: Attempt {task.retries} failed for {task.task_id}: {exc}. Re-enqueueing in {backoff:.2f}s...")
+                    self._schedule_retry(task, backoff)
+                else:
+                    self._failed += 1
+                    try:
+                        self.recovery.route_to_dlq({"id": task.task_id, "data": task.payload})
+                        logger.warning(f"Worker-{worker_id}: Task {task.task_id} routed to DLQ.")
+                    except Exception as dlq_exc:
+                        logger.error(f"Worker-{worker_id}: Failed to route {task.task_id} to DLQ: {dlq_exc}")
+                    finally:
+                        if task.future is not None and not task.future.done():
+                            error = DeadLetterError(task.task_id, exc)
+                            error.__cause__ = exc
+                            task.future.set_exception(error)
+                        self._finish()
             finally:
+                self._busy_s[worker_id] += time.perf_counter() - t0
+                self._in_flight -= 1
                 self.queue.task_done()
 
         logger.info(f"Worker-{worker_id} shutdown.")
 
-    async def start(self, handler: Callable[[Dict[str, Any]], Any]):
+    def _create_executor(self) -> Optional[Executor]:
+        if self.executor_mode == "thread":
+            return ThreadPoolExecutor(max_workers=self.executor_workers, thread_name_prefix="fpt-worker")
+        if self.executor_mode == "process":
+            return ProcessPoolExecutor(max_workers=self.executor_workers)
+        return None
+
+    async def start(self, handler: Union[str, Callable[[Dict[str, Any]], Any]]):
+        if isinstance(handler, str):
+            handler = _HANDLER_REGISTRY[handler]
+        elif self.executor_mode == "process":
+            try:
+                pickle.dumps(handler)
+            except Exception as exc:
+                raise TypeError(f"Process executor requires a picklable handler: {exc}") from exc
+        self._executor = self._create_executor()
         self._is_running = True
+        self._started_at = time.perf_counter()
+        self._delay_task = asyncio.create_task(self._delay_loop())
         self.workers = [
             asyncio.create_task(self._worker_loop(i, handler))
             for i in range(self.num_workers)
         ]
 
-    async def submit(self, task_id: str, payload: Dict[str, Any]):
-        task = ProcessingTask(task_id=task_id, payload=payload)
+    async def submit(self, task_id: str, payload: Dict[str, Any], future: Optional[asyncio.Future] = None) -> asyncio.Future:
+        """
+        Enqueue a task, waiting for queue space (backpressure).
+
+        Returns a future that resolves with the handler's return value, or
+        raises DeadLetterError once the task is routed to the DLQ.
+        """
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            future.add_done_callback(_mark_retrieved)
+        task = ProcessingTask(task_id=task_id, payload=payload, future=future)
+        self._outstanding += 1
+        self._drained.clear()
         await self.queue.put(task)
+        return future
 
-    async def submit_batch(self, batch: List[Dict[str, Any]]):
+    async def submit_batch(self, batch: List[Dict[str, Any]]) -> List[asyncio.Future]:
+        futures = []
         for item in batch:
             task_id = item.get("id", f"task_{time.time_ns()}")
-            await self.submit(task_id=task_id, payload=item)
+            futures.append(await self.submit(task_id=task_id, payload=item))
+        return futures
+
+    async def replay_dead_letters(self, rate_limit: Optional[float] = None, batch_size: int = 100) -> int:
+        """Resubmit dead-lettered tasks through submit_batch, at most rate_limit per second."""
+        return await self.recovery.dead_letter_queue.replay(self, rate_limit=rate_limit, batch_size=batch_size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, in-flight count, throughput counters and worker utilization."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "queue_depth": self.queue.qsize(),
+            "in_flight": self._in_flight,
+            "delayed": len(self._delayed),
+            "processed": self._processed,
+            "failed": self._failed,
+            "executor": self.executor_mode,
+            "executor_workers": self.executor_workers if self._executor is not None else 0,
+            "worker_utilization": [busy / elapsed if elapsed > 0 else 0.0 for busy in self._busy_s],
+        }
 
     async def shutdown(self):
+        await self._drained.wait()
         await self.queue.join()
+        if self._delay_task is not None:
+            self._delay_task.cancel()
+            await asyncio.gather(self._delay_task, return_exceptions=True)
+            self._delay_task = None
         self._is_running = False
-        for _ in range(self.num_workers):
+        # One sentinel per running worker; a pool that never started has none.
+        for _ in self.workers:
             await self.queue.put(None)
         await asyncio.gather(*self.workers)
+        self.workers = []
+        self.recovery.dead_letter_queue.flush()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
         logger.info("Worker pool gracefully stopped.")
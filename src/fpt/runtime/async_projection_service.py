@@ -1,15 +1,42 @@
 """
 async_projection_service.py
 Asynchronous batch projection service integrating AsyncWorkerPool with OnlineProjectionMemory.
+
+Encode and recall requests are kept as numpy arrays and coalesced into
+micro-batches of up to `max_batch` rows, waiting at most `max_wait_ms` for
+a batch to fill. Each micro-batch runs as one encode_batch/recall_batch
+call on the memory, and the per-request futures are resolved from its result.
+Other actions (revoke, ...) pass through the same queue as single-request
+barriers, so every request reaches the worker pool in submission order.
+
+submit() and the recall/encode/revoke coroutines give request/response
+semantics over the same worker pool; completion latency is tracked per
+action in log-bucketed histograms (see latency_summary()).
 """
 from __future__ import annotations
 import asyncio
+import itertools
+import time
+from dataclasses import dataclass, field
 from typing import Any, Dict, List, Optional
 import numpy as np
 
-from .async_dispatch_pipeline import AsyncWorkerPool
+from .async_dispatch_pipeline import AsyncWorkerPool, _mark_retrieved
+from .metrics import LatencyHistogram
 from ..algebra.living_zero_projection import OnlineProjectionMemory, OwnershipProjector
 
+BATCHED_ACTIONS = {"encode": "encode", "add": "encode", "recall": "recall", "project": "recall"}
+
+
+@dataclass
+class _PendingBlock:
+    kind: str
+    vectors: np.ndarray
+    future: asyncio.Future
+    raw_tags: Optional[List[Optional[str]]] = None
+    task_ids: List[str] = field(default_factory=list)
+    payload: Optional[Dict[str, Any]] = None
+
 
 class AsyncProjectionService:
     def __init__(
@@ -18,23 +45,38 @@ class AsyncProjectionService:
         d: int = 64,
         num_workers: int = 4,
         max_queue_size: int = 1000,
+        max_batch: int = 256,
+        max_wait_ms: float = 2.0,
+        storage: str = "dense",
+        dtype=np.float64,
     ):
         self.N = N
         self.d = d
-        self.projector = OwnershipProjector(N=N, d=d)
-        self.memory = OnlineProjectionMemory(N=N, ownership_projector=self.projector)
+        self.projector = OwnershipProjector(N=N, d=d, dtype=dtype)
+        self.memory = OnlineProjectionMemory(N=N, ownership_projector=self.projector, storage=storage)
         self.pool = AsyncWorkerPool(num_workers=num_workers, max_queue_size=max_queue_size)
+        self.max_batch = int(max_batch)
+        self.max_wait_ms = float(max_wait_ms)
+        self._pending: asyncio.Queue[Optional[_PendingBlock]] = asyncio.Queue(maxsize=max_queue_size)
+        self._batcher: Optional[asyncio.Task] = None
+        self._batch_seq = itertools.count()
+        self._task_seq = itertools.count()
+        self.latency: Dict[str, LatencyHistogram] = {}
         self._lock = asyncio.Lock()
 
     def _handle_projection_task(self, payload: Dict[str, Any]):
         action = payload.get("action", "recall")
-        vector = np.array(payload["vector"], dtype=float)
+        if action == "encode_batch":
+            return self.memory.encode_batch(payload["vectors"], payload.get("raw_tags"))
+        if action == "recall_batch":
+            return self.memory.recall_batch(payload["vectors"])
+        if action == "revoke":
+            pattern_id = payload["pattern_id"]
+            return self.memory.selective_revoke(pattern_id)
 
+        vector = np.asarray(payload["vector"], dtype=self.memory.dtype)
         if action in ("encode", "add"):
             return self.memory.encode(vector)
-        elif action == "revoke":
-            pattern_id = payload["pattern_id"]
-            return self.memory.selective_revoke(pattern_id)
         elif action in ("recall", "project"):
             return self.memory.recall(vector)
         else:
@@ -42,17 +84,184 @@ class AsyncProjectionService:
 
     async def start(self):
         await self.pool.start(handler=self._handle_projection_task)
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    # ---------- Micro-batching ----------
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        carry: Optional[_PendingBlock] = None
+        closing = False
+        while not closing or carry is not None:
+            first = carry if carry is not None else await self._pending.get()
+            carry = None
+            if first is None:
+                break
+            blocks, rows = [first], first.vectors.shape[0]
+            deadline = loop.time() + self.max_wait_ms / 1000.0
+            while first.kind != "direct" and rows < self.max_batch:
+                try:
+                    nxt = self._pending.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        nxt = await asyncio.wait_for(self._pending.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if nxt is None:
+                    closing = True
+                    break
+                if nxt.kind != first.kind or rows + nxt.vectors.shape[0] > self.max_batch:
+                    carry = nxt
+                    break
+                blocks.append(nxt)
+                rows += nxt.vectors.shape[0]
+            try:
+                await self._dispatch(blocks)
+            except Exception as exc:
+                # Fail this batch's requests only; the batcher keeps serving the queue.
+                for block in blocks:
+                    if not block.future.done():
+                        block.future.set_exception(exc)
+
+    async def _dispatch(self, blocks: List[_PendingBlock]) -> None:
+        kind = blocks[0].kind
+        if kind == "direct":
+            block = blocks[0]
+            await self.pool.submit(task_id=block.task_ids[0], payload=block.payload, future=block.future)
+            return
+        vectors = blocks[0].vectors if len(blocks) == 1 else np.concatenate([b.vectors for b in blocks])
+        payload: Dict[str, Any] = {"action": f"{kind}_batch", "vectors": vectors}
+        if kind == "encode":
+            payload["raw_tags"] = [t for b in blocks for t in (b.raw_tags or [None] * b.vectors.shape[0])]
+        payload["task_ids"] = [tid for b in blocks for tid in b.task_ids]
+        batch_future = asyncio.get_running_loop().create_future()
+        batch_future.add_done_callback(lambda f: self._resolve_blocks(blocks, f))
+        await self.pool.submit(task_id=f"microbatch_{next(self._batch_seq)}", payload=payload, future=batch_future)
+
+    @staticmethod
+    def _resolve_blocks(blocks: List[_PendingBlock], batch_future: asyncio.Future) -> None:
+        exc = batch_future.exception()
+        offset = 0
+        for block in blocks:
+            n = block.vectors.shape[0]
+            if block.future.done():
+                pass
+            elif exc is not None:
+                block.future.set_exception(exc)
+            elif block.kind == "recall":
+                block.future.set_result(batch_future.result()[offset:offset + n])
+            else:
+                block.future.set_result(None)
+            offset += n
+
+    async def _enqueue_block(self, kind: str, vectors: np.ndarray, task_ids: List[str], raw_tags=None,
+                             payload: Optional[Dict[str, Any]] = None) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_mark_retrieved)
+        await self._pending.put(_PendingBlock(kind=kind, vectors=vectors, future=future,
+                                              raw_tags=raw_tags, task_ids=task_ids, payload=payload))
+        return future
 
-    async def ingest_vector(self, task_id: str, vector: np.ndarray, action: str = "encode"):
-        payload = {"action": action, "vector": vector.tolist()}
-        await self.pool.submit(task_id=task_id, payload=payload)
+    async def _enqueue_direct(self, task_id: str, payload: Dict[str, Any]) -> asyncio.Future:
+        return await self._enqueue_block("direct", np.empty((0, self.N), dtype=self.memory.dtype),
+                                         [task_id], payload=payload)
 
-    async def ingest_batch(self, batch_vectors: List[np.ndarray], action: str = "encode"):
-        batch = [
-            {"id": f"batch_{idx}", "action": action, "vector": v.tolist()}
-            for idx, v in enumerate(batch_vectors)
-        ]
-        await self.pool.submit_batch(batch)
+    def _check_width(self, vectors: np.ndarray) -> None:
+        if vectors.shape[1] != self.N:
+            raise ValueError(f"Expected vectors of length {self.N}, got {vectors.shape[1]}")
+
+    # ---------- Request/response API ----------
+    def _track(self, action: str, future: asyncio.Future, t0: float) -> None:
+        hist = self.latency.get(action)
+        if hist is None:
+            hist = self.latency[action] = LatencyHistogram()
+        future.add_done_callback(lambda _: hist.record(time.perf_counter() - t0))
+
+    async def submit(self, task_id: str, vector: Optional[np.ndarray] = None, action: str = "recall",
+                     raw_tag: Optional[str] = None, **payload: Any) -> asyncio.Future:
+        """
+        Queue one request and return a future for its result.
+
+        Encode/recall requests join a micro-batch and resolve with the recall
+        row (or None for encode); a vector of the wrong length fails only its
+        own future with ValueError. Other actions run as single pool tasks, in
+        order with the batches around them, and resolve with the handler
+        result. Failed requests raise DeadLetterError.
+        """
+        t0 = time.perf_counter()
+        kind = BATCHED_ACTIONS.get(action)
+        if kind is None:
+            payload = dict(payload, action=action)
+            if vector is not None:
+                payload["vector"] = vector
+            future = await self._enqueue_direct(task_id, payload)
+        else:
+            try:
+                vectors = np.asarray(vector, dtype=self.memory.dtype).reshape(1, -1)
+                self._check_width(vectors)
+            except ValueError as exc:
+                future = asyncio.get_running_loop().create_future()
+                future.add_done_callback(_mark_retrieved)
+                future.set_exception(exc)
+                return future
+            tags = [raw_tag] if raw_tag is not None else None
+            block_future = await self._enqueue_block(kind, vectors, [task_id], raw_tags=tags)
+            future = asyncio.ensure_future(self._first_row(block_future))
+            future.add_done_callback(_mark_retrieved)
+        self._track(action, future, t0)
+        return future
+
+    async def recall(self, vector: np.ndarray) -> np.ndarray:
+        return await (await self.submit(f"recall_{next(self._task_seq)}", vector, action="recall"))
+
+    async def encode(self, vector: np.ndarray, raw_tag: Optional[str] = None) -> None:
+        await (await self.submit(f"encode_{next(self._task_seq)}", vector, action="encode", raw_tag=raw_tag))
+
+    async def revoke(self, pattern_id: str) -> None:
+        await (await self.submit(f"revoke_{next(self._task_seq)}", action="revoke", pattern_id=pattern_id))
+
+    def latency_summary(self) -> Dict[str, Dict[str, float]]:
+        """Per-action completion latency: count, mean, p50/p95/p99 and max (seconds)."""
+        return {action: hist.summary() for action, hist in self.latency.items()}
+
+    @staticmethod
+    async def _first_row(block_future: asyncio.Future):
+        result = await block_future
+        return None if result is None else result[0]
+
+    # ---------- Ingestion API ----------
+    async def ingest_vector(self, task_id: str, vector: np.ndarray, action: str = "encode") -> asyncio.Future:
+        """Fire-and-forget form of submit(); the returned future may be ignored."""
+        return await self.submit(task_id, vector, action=action)
+
+    async def ingest_batch(self, batch_vectors: List[np.ndarray], action: str = "encode") -> List[asyncio.Future]:
+        """Queue a block of vectors in chunks of at most max_batch rows; returns one future per chunk."""
+        if len(batch_vectors) == 0:
+            return []
+        t0 = time.perf_counter()
+        kind = BATCHED_ACTIONS.get(action)
+        if kind is None:
+            futures = [
+                await self._enqueue_direct(f"batch_{idx}", {"action": action, "vector": v})
+                for idx, v in enumerate(batch_vectors)
+            ]
+        else:
+            V = np.asarray(batch_vectors, dtype=self.memory.dtype).reshape(len(batch_vectors), -1)
+            self._check_width(V)
+            futures = []
+            for start in range(0, V.shape[0], self.max_batch):
+                chunk = V[start:start + self.max_batch]
+                ids = [f"batch_{idx}" for idx in range(start, start + chunk.shape[0])]
+                futures.append(await self._enqueue_block(kind, chunk, ids))
+        for future in futures:
+            self._track(action, future, t0)
+        return futures
 
     async def shutdown(self):
+        if self._batcher is not None:
+            await self._pending.put(None)
+            await self._batcher
+            self._batcher = None
         await self.pool.shutdown()
@@ -0,0 +1,458 @@
+"""
+dead_letter.py
+Bounded dead-letter queue backends for the runtime pipeline.
+
+Each backend stores entries shaped like {"record": {...}, "timestamp": float}
+and enforces a size cap (max_entries) and an optional age cap (max_age_s).
+The segment-file and SQLite backends buffer appends and write them in
+batches, so a failure burst produces one write per batch instead of one
+per failed record. Inside a running event loop a timer also flushes a
+buffer that has been idle for flush_interval_s.
+
+replay() removes entries only after they were resubmitted, so a failed
+replay leaves them in the queue (delivery is at-least-once).
+"""
+from __future__ import annotations
+import asyncio
+import itertools
+import json
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class DeadLetterError(Exception):
+    """Raised through a task's future when the task exhausts its retries and is dead-lettered."""
+
+    def __init__(self, task_id: str, error: BaseException):
+        super().__init__(f"Task {task_id} routed to DLQ: {error!r}")
+        self.task_id = task_id
+        self.error = error
+
+
+def _dumps(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o))
+
+
+class DeadLetterBackend(ABC):
+    """Common interface: list-like reads, batched appends, pop_batch() and replay()."""
+
+    def __init__(self, max_entries: int = 10_000, max_age_s: Optional[float] = None):
+        self.max_entries = int(max_entries)
+        self.max_age_s = max_age_s
+
+    # ---------- Storage hooks ----------
+    @abstractmethod
+    def append(self, entry: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    def _peek_batch(self, n: int):
+        """Return (entries, token): up to n of the oldest entries, left in place."""
+
+    @abstractmethod
+    def _ack(self, token) -> None:
+        """Remove the entries returned by the _peek_batch() that produced `token`."""
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    # ---------- Shared behaviour ----------
+    def pop_batch(self, n: int) -> List[Dict[str, Any]]:
+        """Remove and return up to n of the oldest entries."""
+        entries, token = self._peek_batch(n)
+        self._ack(token)
+        return entries
+
+    def extend(self, entries) -> None:
+        for entry in entries:
+            self.append(entry)
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _expired(self, entry: Dict[str, Any], now: float) -> bool:
+        return self.max_age_s is not None and now - entry["timestamp"] > self.max_age_s
+
+    async def replay(self, pool, rate_limit: Optional[float] = None, batch_size: int = 100) -> int:
+        """
+        Drain entries back into pool.submit_batch, oldest first.
+
+        Only the entries queued when replay starts are resubmitted; records
+        that fail again and are dead-lettered during the replay wait for the
+        next call. A batch is removed only once submit_batch returns; if it
+        raises, the batch stays queued and the error propagates. rate_limit
+        caps the replay at that many entries per second. Returns the number
+        of entries resubmitted.
+        """
+        replayed, remaining = 0, len(self)
+        while True:
+            if remaining <= 0:
+                return replayed
+            entries, token = self._peek_batch(min(batch_size, remaining))
+            if not entries:
+                self._ack(token)  # drops any expired entries that were skipped
+                return replayed
+            t0 = time.monotonic()
+            batch = [dict(e["record"].get("data", {}), id=e["record"].get("id")) for e in entries]
+            await pool.submit_batch(batch)
+            self._ack(token)
+            replayed += len(entries)
+            remaining -= len(entries)
+            if rate_limit:
+                wait = len(entries) / rate_limit - (time.monotonic() - t0)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+
+class RingBufferDLQ(DeadLetterBackend):
+    """In-memory ring buffer; the oldest entries are evicted once max_entries is reached."""
+
+    def __init__(self, max_entries: int = 10_000, max_age_s: Optional[float] = None):
+        super().__init__(max_entries=max_entries, max_age_s=max_age_s)
+        self._ring: deque = deque(maxlen=self.max_entries)
+
+    def _prune(self) -> None:
+        if self.max_age_s is None:
+            return
+        now = time.time()
+        while self._ring and self._expired(self._ring[0], now):
+            self._ring.popleft()
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self._ring.append(entry)
+        self._prune()
+
+    def _peek_batch(self, n: int):
+        self._prune()
+        entries = list(itertools.islice(self._ring, n))
+        return entries, entries
+
+    def _ack(self, token) -> None:
+        # Match by identity: appends made meanwhile may already have evicted some.
+        for entry in token:
+            if self._ring and self._ring[0] is entry:
+                self._ring.popleft()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self._prune()
+        return iter(list(self._ring))
+
+    def __len__(self) -> int:
+        self._prune()
+        return len(self._ring)
+
+
+class _BufferedDLQ(DeadLetterBackend):
+    """Append buffer flushed on a size (flush_every) or time (flush_interval_s) threshold."""
+
+    def __init__(self, max_entries: int, max_age_s: Optional[float], flush_every: int, flush_interval_s: float):
+        super().__init__(max_entries=max_entries, max_age_s=max_age_s)
+        self.flush_every = int(flush_every)
+        self.flush_interval_s = float(flush_interval_s)
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._flush_timer: Optional[asyncio.TimerHandle] = None
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        self._buffer.append(entry)
+        if (len(self._buffer) >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_interval_s):
+            self.flush()
+        elif self._flush_timer is None:
+            self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        # Only possible inside an event loop; synchronous callers rely on the
+        # next append, flush() or close().
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_timer = loop.call_later(self.flush_interval_s, self._flush_on_timer)
+
+    def _flush_on_timer(self) -> None:
+        self._flush_timer = None
+        self.flush()
+
+    def flush(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._buffer:
+            buffered, self._buffer = self._buffer, []
+            self._write(buffered)
+        self._last_flush = time.monotonic()
+
+    @abstractmethod
+    def _write(self, entries: List[Dict[str, Any]]) -> None:
+        ...
+
+
+class SegmentFileDLQ(_BufferedDLQ):
+    """
+    Append-only JSONL segment files under `directory`.
+
+    A cursor file records the first unconsumed (segment, line); fully consumed
+    or expired segments are deleted. Trimming to max_entries advances the cursor.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_entries: int = 100_000,
+        max_age_s: Optional[float] = None,
+        segment_max_entries: int = 10_000,
+        flush_every: int = 256,
+        flush_interval_s: float = 0.05,
+        fsync: bool = True,
+    ):
+        super().__init__(max_entries, max_age_s, flush_every, flush_interval_s)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_entries = int(segment_max_entries)
+        self.fsync = fsync
+        self._cursor_path = self.directory / "cursor.json"
+        self._segments: List[Path] = sorted(self.directory.glob("dlq-*.jsonl"))
+        self._counts: Dict[Path, int] = {}
+        self._newest: Dict[Path, float] = {}
+        for seg in self._segments:
+            with seg.open("r", encoding="utf-8") as fh:
+                lines = [json.loads(line) for line in fh if line.strip()]
+            self._counts[seg] = len(lines)
+            self._newest[seg] = max((e["timestamp"] for e in lines), default=0.0)
+        self._cursor = 0
+        if self._cursor_path.exists() and self._segments:
+            state = json.loads(self._cursor_path.read_text())
+            if state.get("segment") == self._segments[0].name:
+                self._cursor = int(state.get("line", 0))
+        self._fh = None
+        self._seq = itertools.count(
+            int(self._segments[-1].stem.split("-")[1]) + 1 if self._segments else 0
+        )
+
+    def _new_segment(self) -> Path:
+        seg = self.directory / f"dlq-{next(self._seq):08d}.jsonl"
+        self._segments.append(seg)
+        self._counts[seg] = 0
+        self._newest[seg] = 0.0
+        return seg
+
+    def _write(self, entries: List[Dict[str, Any]]) -> None:
+        i = 0
+        while i < len(entries):
+            if not self._segments or self._counts[self._segments[-1]] >= self.segment_max_entries:
+                if self._fh is not None:
+                    self._fh.close()
+                    self._fh = None
+                self._new_segment()
+            seg = self._segments[-1]
+            if self._fh is None:
+                self._fh = seg.open("a", encoding="utf-8")
+            chunk = entries[i:i + self.segment_max_entries - self._counts[seg]]
+            self._fh.write("".join(_dumps(e) + "\n" for e in chunk))
+            self._counts[seg] += len(chunk)
+            self._newest[seg] = max([self._newest[seg]] + [e["timestamp"] for e in chunk])
+            i += len(chunk)
+        self._fh.flush()
+        if self.fsync:
+            os.fsync(self._fh.fileno())
+        self._enforce_caps()
+
+    def _stored(self) -> int:
+        return sum(self._counts[s] for s in self._segments) - self._cursor
+
+    def _drop_head_segment(self) -> None:
+        seg = self._segments.pop(0)
+        if self._fh is not None and not self._segments:
+            self._fh.close()
+            self._fh = None
+        seg.unlink(missing_ok=True)
+        del self._counts[seg], self._newest[seg]
+        self._cursor = 0
+
+    def _advance(self, n: int) -> None:
+        while n > 0 and self._segments:
+            remaining = self._counts[self._segments[0]] - self._cursor
+            if n >= remaining:
+                n -= remaining
+                self._drop_head_segment()
+            else:
+                self._cursor += n
+                n = 0
+        self._save_cursor()
+
+    def _consume_to(self, seg: Path, line: int) -> None:
+        """Move the cursor up to (seg, line), unless caps already moved it further."""
+        while self._segments and self._segments[0].name < seg.name:
+            self._drop_head_segment()
+        if self._segments and self._segments[0] == seg and line > self._cursor:
+            self._advance(line - self._cursor)
+        else:
+            self._save_cursor()
+
+    def _save_cursor(self) -> None:
+        state = {"segment": self._segments[0].name if self._segments else None, "line": self._cursor}
+        tmp = self._cursor_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self._cursor_path)
+
+    def _enforce_caps(self) -> None:
+        if self.max_age_s is not None:
+            cutoff = time.time() - self.max_age_s
+            while len(self._segments) > 1 and self._newest[self._segments[0]] < cutoff:
+                self._drop_head_segment()
+        excess = self._stored() - self.max_entries
+        if excess > 0:
+            self._advance(excess)
+        else:
+            self._save_cursor()
+
+    def _read(self) -> Iterator[Dict[str, Any]]:
+        now = time.time()
+        for k, seg in enumerate(list(self._segments)):
+            with seg.open("r", encoding="utf-8") as fh:
+                lines = itertools.islice(fh, self._cursor if k == 0 else 0, None)
+                for line in lines:
+                    entry = json.loads(line)
+                    if not self._expired(entry, now):
+                        yield entry
+
+    def _peek_batch(self, n: int):
+        self.flush()
+        out: List[Dict[str, Any]] = []
+        end = None
+        now = time.time()
+        for k, seg in enumerate(list(self._segments)):
+            start = self._cursor if k == 0 else 0
+            with seg.open("r", encoding="utf-8") as fh:
+                for offset, line in enumerate(itertools.islice(fh, start, None), start + 1):
+                    end = (seg, offset)
+                    entry = json.loads(line)
+                    if not self._expired(entry, now):
+                        out.append(entry)
+                    if len(out) >= n:
+                        break
+            if len(out) >= n:
+                break
+        return out, end
+
+    def _ack(self, token) -> None:
+        if token is not None:
+            self._consume_to(*token)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        return iter(list(self._read()))
+
+    def __len__(self) -> int:
+        if self.max_age_s is None:
+            return self._stored() + len(self._buffer)
+        return sum(1 for _ in self._read()) + len(self._buffer)
+
+    def close(self) -> None:
+        super().close()
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class SQLiteDLQ(_BufferedDLQ):
+    """SQLite-backed DLQ using one long-lived WAL connection and executemany group commits."""
+
+    def __init__(
+        self,
+        db_path: str = "dead_letters.db",
+        max_entries: int = 100_000,
+        max_age_s: Optional[float] = None,
+        flush_every: int = 256,
+        flush_interval_s: float = 0.05,
+    ):
+        super().__init__(max_entries, max_age_s, flush_every, flush_interval_s)
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS dead_letters (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL,
+                record_json TEXT
+            )
+        """)
+        self._conn.commit()
+
+    def _write(self, entries: List[Dict[str, Any]]) -> None:
+        self._conn.executemany(
+            "INSERT INTO dead_letters (timestamp, record_json) VALUES (?, ?)",
+            [(e["timestamp"], _dumps(e["record"])) for e in entries],
+        )
+        if self.max_age_s is not None:
+            self._conn.execute("DELETE FROM dead_letters WHERE timestamp < ?", (self._cutoff(),))
+        self._conn.execute(
+            """
+            DELETE FROM dead_letters WHERE id <= (
+                SELECT id FROM dead_letters ORDER BY id DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    def _cutoff(self) -> float:
+        return time.time() - self.max_age_s if self.max_age_s is not None else float("-inf")
+
+    def _rows(self, limit: int = -1):
+        cutoff = self._cutoff()
+        return self._conn.execute(
+            "SELECT id, timestamp, record_json FROM dead_letters WHERE timestamp >= ? ORDER BY id LIMIT ?",
+            (cutoff, limit),
+        ).fetchall()
+
+    def _peek_batch(self, n: int):
+        self.flush()
+        rows = self._rows(n)
+        entries = [{"record": json.loads(r[2]), "timestamp": r[1]} for r in rows]
+        return entries, rows[-1][0] if rows else None
+
+    def _ack(self, token) -> None:
+        if token is not None:
+            self._conn.execute("DELETE FROM dead_letters WHERE id <= ?", (token,))
+            self._conn.commit()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.flush()
+        return iter([{"record": json.loads(r[2]), "timestamp": r[1]} for r in self._rows()])
+
+    def __len__(self) -> int:
+        stored = self._conn.execute(
+            "SELECT COUNT(*) FROM dead_letters WHERE timestamp >= ?", (self._cutoff(),)
+        ).fetchone()[0]
+        return stored + len(self._buffer)
+
+    def close(self) -> None:
+        super().close()
+        self._conn.close()
@@ -3,18 +3,43 @@ ingestion_recovery.py
 Dead-letter queue, exponential backoff, and idempotent retry wrapper for data ingestion.
 """
 from __future__ import annotations
+import asyncio
+import inspect
+import random
 import time
 import logging
-from typing import Callable, Any
+from typing import Callable, Any, Optional
+
+from .dead_letter import DeadLetterBackend, RingBufferDLQ
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("IngestionRecovery")
 
 class IngestionPipeline:
-    def __init__(self, max_retries: int = 3, base_delay: float = 0.5):
+    def __init__(
+        self,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        jitter: float = 0.5,
+        dead_letter_queue: Optional[DeadLetterBackend] = None,
+    ):
         self.max_retries = max_retries
         self.base_delay = base_delay
-        self.dead_letter_queue: list[dict[str, Any]] = []
+        self.jitter = jitter
+        self.dead_letter_queue: DeadLetterBackend = (
+            dead_letter_queue if dead_letter_queue is not None else RingBufferDLQ()
+        )
+
+    def backoff_delay(self, attempt: int, jitter: bool = False) -> float:
+        """Exponential backoff for a 1-based attempt, optionally scaled by a random factor in [1 - jitter, 1 + jitter]."""
+        delay = self.base_delay * (2 ** (attempt - 1))
+        if jitter and self.jitter > 0:
+            delay *= random.uniform(1.0 - self.jitter, 1.0 + self.jitter)
+        return delay
+
+    def route_to_dlq(self, record: dict[str, Any]) -> None:
+        logger.error(f"Record {record.get('id', 'unknown')} failed after {self.max_retries} attempts. Routing to DLQ.")
+        self.dead_letter_queue.append({"record": record, "timestamp": time.time()})
 
     def process_record_with_recovery(self, record: dict[str, Any], handler: Callable[[dict[str, Any]], None]) -> bool:
         for attempt in range(1, self.max_retries + 1):
@@ -22,10 +47,27 @@ class IngestionPipeline:
                 handler(record)
                 return True
             except Exception as e:
-                backoff = self.base_delay * (2 ** (attempt - 1))
+                backoff = self.backoff_delay(attempt)
                 logger.warning(f"Ingestion attempt {attempt} failed for record {record.get('id', 'unknown')}: {e}. Retrying in {backoff:.2f}s...")
                 time.sleep(backoff)
 
-        logger.error(f"Record {record.get('id', 'unknown')} failed after {self.max_retries} attempts. Routing to DLQ.")
-        self.dead_letter_queue.append({"record": record, "timestamp": time.time()})
+        self.route_to_dlq(record)
+        return False
+
+    async def process_record_with_recovery_async(self, record: dict[str, Any], handler: Callable[[dict[str, Any]], Any]) -> bool:
+        """Async variant: awaits coroutine handlers and backs off with jittered asyncio.sleep."""
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                result = handler(record)
+                if inspect.isawaitable(result):
+                    await result
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    break
+                backoff = self.backoff_delay(attempt, jitter=True)
+                logger.warning(f"Ingestion attempt {attempt} failed for record {record.get('id', 'unknown')}: {e}. Retrying in {backoff:.2f}s...")
+                await asyncio.sleep(backoff)
+
+        self.route_to_dlq(record)
         return False
@@ -0,0 +1,58 @@
+"""
+metrics.py
+Lightweight latency histograms for runtime services.
+"""
+from __future__ import annotations
+import math
+from typing import Dict, List
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram with constant memory per action.
+
+    Buckets grow geometrically from `min_s` by `growth`; percentiles report the
+    upper edge of the bucket holding the requested rank, so they are accurate
+    to within one growth factor (about 9% at the default).
+    """
+
+    def __init__(self, min_s: float = 1e-6, max_s: float = 100.0, growth: float = 2 ** 0.125):
+        self.min_s = float(min_s)
+        self.growth = float(growth)
+        self._log_growth = math.log(self.growth)
+        self.n_buckets = int(math.ceil(math.log(max_s / min_s) / self._log_growth)) + 1
+        self.counts: List[int] = [0] * self.n_buckets
+        self.count = 0
+        self.total_s = 0.0
+        self.max_seen_s = 0.0
+
+    def record(self, seconds: float) -> None:
+        if seconds <= self.min_s:
+            idx = 0
+        else:
+            idx = min(self.n_buckets - 1, int(math.log(seconds / self.min_s) / self._log_growth) + 1)
+        self.counts[idx] += 1
+        self.count += 1
+        self.total_s += seconds
+        self.max_seen_s = max(self.max_seen_s, seconds)
+
+    def percentile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = max(1, int(math.ceil(q / 100.0 * self.count)))
+        seen = 0
+        for idx, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.min_s * self.growth ** idx, self.max_seen_s)
+        return self.max_seen_s
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean_s": self.total_s / self.count if self.count else 0.0,
+            "p50_s": self.percentile(50),
+            "p95_s": self.percentile(95),
+            "p99_s": self.percentile(99),
+            "max_s": self.max_seen_s,
+        }
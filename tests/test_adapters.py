@@ -84,3 +84,397 @@ def test_event_dispatcher_multi_adapter_fanout():
 
         assert count_sov == 1
         assert count_tor == 1
+
+
+def test_group_commit_buffers_until_threshold_or_flush():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "group.db")
+        adapter = SovereignLedgerAdapter(db_path=db_file, durability="group",
+                                         batch_size=3, flush_interval_ms=60_000)
+
+        def count():
+            with sqlite3.connect(db_file) as conn:
+                return conn.execute("SELECT COUNT(*) FROM projection_records").fetchone()[0]
+
+        for i in range(4):
+            adapter.on_projection(ProjectionEvent(
+                timestamp_ns=time.time_ns(), vector_dim=8, projection_norm=1.0,
+                shadow_energy=0.0, task_id=f"g{i}",
+            ))
+        assert count() == 3
+        adapter.flush()
+        assert count() == 4
+        adapter.close()
+        with sqlite3.connect(db_file) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_group_commit_flushes_idle_trailing_batch():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "idle.db")
+        adapter = SovereignLedgerAdapter(db_path=db_file, durability="group",
+                                         batch_size=1000, flush_interval_ms=20)
+        adapter.on_projection(ProjectionEvent(
+            timestamp_ns=time.time_ns(), vector_dim=8, projection_norm=1.0, shadow_energy=0.0, task_id="idle",
+        ))
+        deadline = time.monotonic() + 5.0
+        count = 0
+        while count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+            with sqlite3.connect(db_file) as conn:
+                count = conn.execute("SELECT COUNT(*) FROM projection_records").fetchone()[0]
+        assert count == 1
+        adapter.close()
+
+
+def test_unclosed_adapters_are_collectable_and_closed_adapters_reject_writes():
+    import gc
+    import weakref
+    from fpt.adapters import SegmentLedgerAdapter, _OPEN_ADAPTERS
+
+    event = ProjectionEvent(timestamp_ns=1, vector_dim=4, projection_norm=0.5, shadow_energy=0.0)
+    with tempfile.TemporaryDirectory() as tmp:
+        adapters = [
+            SovereignLedgerAdapter(db_path=os.path.join(tmp, "a.db"), durability="group", flush_interval_ms=10),
+            TordialManifoldAdapter(db_path=os.path.join(tmp, "b.db"), durability="none", flush_interval_ms=10),
+            SegmentLedgerAdapter(os.path.join(tmp, "seg"), durability="group", flush_interval_ms=10),
+        ]
+        for adapter in adapters:
+            assert adapter in _OPEN_ADAPTERS
+            adapter.close()
+            assert adapter not in _OPEN_ADAPTERS
+            with pytest.raises(ValueError, match="is closed"):
+                adapter.on_projection(event)
+
+        dropped = SovereignLedgerAdapter(db_path=os.path.join(tmp, "c.db"), durability="group", flush_interval_ms=10)
+        ref = weakref.ref(dropped)
+        del dropped
+        time.sleep(0.05)  # let the idle flusher run while the adapter is unreferenced
+        gc.collect()
+        assert ref() is None
+
+
+def test_adapter_context_manager_flushes_on_exit():
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "ctx.db")
+        with TordialManifoldAdapter(db_path=db_file, durability="none", batch_size=1000) as adapter:
+            for _ in range(10):
+                adapter.on_projection(ProjectionEvent(
+                    timestamp_ns=time.time_ns(), vector_dim=4, projection_norm=0.5, shadow_energy=0.1,
+                ))
+        with sqlite3.connect(db_file) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM manifold_telemetry").fetchone()[0] == 10
+        with pytest.raises(ValueError):
+            TordialManifoldAdapter(db_path=db_file, durability="sometimes")
+
+
+def test_adapters_bulk_insert_event_batches():
+    import numpy as np
+    from fpt.events import ProjectionEventBatch
+
+    n = 500
+    batch = ProjectionEventBatch(
+        timestamp_ns=np.arange(n, dtype=np.int64),
+        vector_dim=16,
+        projection_norm=np.linspace(0.0, 1.0, n),
+        shadow_energy=np.zeros(n),
+        action=["encode", "recall"] * (n // 2),
+        task_id=[f"bulk_{i}" for i in range(n)],
+        operator_signature="sig_bulk",
+        metadata={"source": "batch"},
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        sov_file = os.path.join(tmp, "sov.db")
+        tor_file = os.path.join(tmp, "tor.db")
+        with SovereignLedgerAdapter(db_path=sov_file) as sov, TordialManifoldAdapter(db_path=tor_file) as tor:
+            sov.on_projection_batch(batch)
+            tor.on_projection_batch(batch)
+
+        with sqlite3.connect(sov_file) as conn:
+            rows = conn.execute(
+                "SELECT task_id, timestamp_ns, action, operator_signature, metadata_json "
+                "FROM projection_records ORDER BY id"
+            ).fetchall()
+        with sqlite3.connect(tor_file) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM manifold_telemetry").fetchone()[0]
+
+    assert len(rows) == n and count == n
+    assert rows[3] == ("bulk_3", 3, "recall", "sig_bulk", '{"source": "batch"}')
+
+
+def test_schema_migration_adds_indexes_to_existing_ledger():
+    from fpt.adapters import SCHEMA_MIGRATIONS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "legacy.db")
+        with sqlite3.connect(db_file) as conn:
+            conn.execute("""
+                CREATE TABLE projection_records (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, task_id TEXT, timestamp_ns INTEGER,
+                    vector_dim INTEGER, projection_norm REAL, shadow_energy REAL, action TEXT,
+                    operator_signature TEXT, metadata_json TEXT
+                )
+            """)
+        SovereignLedgerAdapter(db_path=db_file).close()
+        SovereignLedgerAdapter(db_path=db_file).close()  # re-opening is a no-op
+
+        with sqlite3.connect(db_file) as conn:
+            indexes = {r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'projection_records'")}
+            version = conn.execute(
+                "SELECT version FROM schema_version WHERE table_name = 'projection_records'").fetchone()[0]
+            plan = " ".join(r[-1] for r in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM projection_records WHERE task_id = 'x'"))
+
+    assert {"idx_projection_records_task_id", "idx_projection_records_timestamp",
+            "idx_projection_records_action"} <= indexes
+    assert version == len(SCHEMA_MIGRATIONS["projection_records"])
+    assert "idx_projection_records_task_id" in plan
+
+
+def test_ledger_reader_range_scans_aggregates_and_pages():
+    import numpy as np
+    from fpt.events import ProjectionEventBatch
+    from fpt.ledger_reader import LedgerReader
+
+    n = 1000
+    batch = ProjectionEventBatch(
+        timestamp_ns=np.arange(n, dtype=np.int64) // 2,  # duplicate timestamps exercise the (ts, id) cursor
+        vector_dim=8,
+        projection_norm=np.arange(n) / n,
+        shadow_energy=np.arange(n) * 1e-3,
+        action=["encode", "recall"] * (n // 2),
+        task_id=[f"r{i}" for i in range(n)],
+        metadata={"k": 1},
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "ledger.db")
+        with SovereignLedgerAdapter(db_path=db_file, durability="group") as adapter:
+            adapter.on_projection_batch(batch)
+        tor_file = os.path.join(tmp, "tor.db")
+        with TordialManifoldAdapter(db_path=tor_file, durability="group") as tor:
+            tor.on_projection_batch(batch)
+
+        with LedgerReader(db_path=db_file) as reader:
+            pages = list(reader.scan(start_ns=100, end_ns=300, page_size=64))
+            ids = [tid for p in pages for tid in p.task_ids]
+            assert ids == [f"r{i}" for i in range(200, 600)]
+            assert max(len(p) for p in pages) == 64
+
+            recalls = list(reader.iter_range(start_ns=100, end_ns=110, action="recall", page_size=3))
+            assert [v.task_id for v in recalls] == [f"r{i}" for i in range(201, 220, 2)]
+            assert recalls[0].metadata == {"k": 1}
+
+            first, cursor = reader.page(limit=10)
+            second, _ = reader.page(after=cursor, limit=10)
+            assert second.task_ids[0] == "r10"
+
+            agg = reader.aggregate_by_action()
+            assert agg["encode"]["count"] == agg["recall"]["count"] == n // 2
+            assert abs(agg["recall"]["max_shadow_energy"] - 0.999) < 1e-12
+            assert abs(agg["encode"]["mean_norm"] - np.arange(0, n, 2).mean() / n) < 1e-12
+            assert reader.count(task_id="r7") == 1
+
+        with LedgerReader(db_path=tor_file, table="manifold_telemetry", include_metadata=False) as reader:
+            assert sum(len(p) for p in reader.scan(end_ns=50)) == 100
+            with pytest.raises(ValueError):
+                reader.count(action="encode")
+
+
+def test_ledger_reader_opens_paths_with_uri_metacharacters():
+    from fpt.ledger_reader import LedgerReader
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "run?1#a%20b.db")
+        with SovereignLedgerAdapter(db_path=db_file) as adapter:
+            adapter.on_projection(ProjectionEvent(timestamp_ns=1, vector_dim=4, projection_norm=0.5,
+                                                  shadow_energy=0.0, action="encode", task_id="q"))
+        with LedgerReader(db_path=db_file) as reader:
+            assert reader.count() == 1
+        assert all(name.startswith("run?1#a%20b.db") for name in os.listdir(tmp))
+
+
+def _chained_events(n, offset=0):
+    return [
+        ProjectionEvent(timestamp_ns=1_000 + i, vector_dim=8, projection_norm=0.1 * (i % 10),
+                        shadow_energy=1e-3 * i, action="encode", task_id=f"c{i}",
+                        operator_signature="sig", metadata={"i": i})
+        for i in range(offset, offset + n)
+    ]
+
+
+def test_chained_ledger_checkpoints_and_verifies():
+    from fpt.events import ProjectionEventBatch
+    from fpt.ledger_chain import verify_chain, GENESIS_HASH
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "chain.db")
+        with SovereignLedgerAdapter(db_path=db_file, durability="group", chained=True, checkpoint_every=16) as adapter:
+            for ev in _chained_events(20):
+                adapter.on_projection(ev)
+        # Re-opening resumes the chain and the partially filled segment.
+        with SovereignLedgerAdapter(db_path=db_file, durability="group", chained=True, checkpoint_every=16) as adapter:
+            adapter.on_projection_batch(ProjectionEventBatch.from_events(_chained_events(30, offset=20)))
+
+        with sqlite3.connect(db_file) as conn:
+            first_prev = conn.execute("SELECT prev_hash FROM projection_records WHERE id = 1").fetchone()[0]
+            checkpoints = conn.execute("SELECT seq, first_id, last_id, row_count FROM ledger_checkpoints").fetchall()
+        assert first_prev == GENESIS_HASH
+        assert checkpoints == [(0, 1, 16, 16), (1, 17, 32, 16), (2, 33, 48, 16)]
+
+        result = verify_chain(db_file)
+        assert result.ok and result.rows_verified == 50 and result.checkpoints_verified == 3
+
+        state = os.path.join(tmp, "verify_state.json")
+        assert verify_chain(db_file, workers=2, state_path=state).ok
+        resumed = verify_chain(db_file, state_path=state)
+        assert resumed.ok and resumed.checkpoints_verified == 0 and resumed.rows_verified == 2
+
+        with sqlite3.connect(db_file) as conn:
+            conn.execute("UPDATE projection_records SET projection_norm = 0.5 WHERE id = 20")
+        tampered = verify_chain(db_file)
+        assert not tampered.ok and tampered.first_bad_id == 20 and tampered.last_checkpoint == 0
+
+        with sqlite3.connect(db_file) as conn:
+            conn.execute("DELETE FROM projection_records WHERE id = 49")
+        assert verify_chain(db_file, state_path=state).first_bad_id == 50
+
+
+
+def test_chain_verification_skips_only_legacy_rows():
+    from fpt.ledger_chain import verify_chain
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "chain?#%.db")
+        with SovereignLedgerAdapter(db_path=db_file) as adapter:
+            for ev in _chained_events(3):
+                adapter.on_projection(ev)
+        with SovereignLedgerAdapter(db_path=db_file, chained=True, checkpoint_every=4) as adapter:
+            for ev in _chained_events(9, offset=3):
+                adapter.on_projection(ev)
+        result = verify_chain(db_file)
+        assert result.ok and result.rows_verified == 9 and result.checkpoints_verified == 2
+
+        with sqlite3.connect(db_file) as conn:
+            conn.execute("INSERT INTO projection_records (id, task_id, timestamp_ns, vector_dim, projection_norm, "
+                         "shadow_energy) VALUES (1000, 'forged', 1, 8, 0.1, 0.0)")
+        forged = verify_chain(db_file)
+        assert not forged.ok and forged.first_bad_id == 1000 and forged.reason == "row is not chained"
+
+        with sqlite3.connect(db_file) as conn:
+            conn.execute("UPDATE projection_records SET projection_norm = 0.9, prev_hash = NULL, row_hash = NULL "
+                         "WHERE id IN (6, 12)")
+        tampered = verify_chain(db_file)
+        assert not tampered.ok and tampered.first_bad_id == 6
+
+
+def test_segment_ledger_roundtrip_and_mmap_scans():
+    import numpy as np
+    from fpt.adapters import SegmentLedgerAdapter
+    from fpt.events import ProjectionEventBatch
+    from fpt.ledger_reader import SegmentLedgerReader
+
+    n = 2500
+    batch = ProjectionEventBatch(
+        timestamp_ns=np.arange(n, dtype=np.int64),
+        vector_dim=32,
+        projection_norm=np.linspace(0.0, 1.0, n),
+        shadow_energy=np.arange(n) * 1e-4,
+        action=["encode", "recall"] * (n // 2),
+        task_id=[f"s{i}" for i in range(n)],
+        operator_signature="sig_seg",
+        metadata={"src": "bulk"},
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        with SegmentLedgerAdapter(directory=tmp, durability="group", segment_max_records=1000) as adapter:
+            adapter.on_projection_batch(batch)
+        # Reopening appends to the unsealed tail segment.
+        with SegmentLedgerAdapter(directory=tmp, durability="per_event", segment_max_records=1000) as adapter:
+            adapter.on_projection(ProjectionEvent(timestamp_ns=n, vector_dim=32, projection_norm=0.5,
+                                                  shadow_energy=9.0, action="revoke", task_id="last"))
+
+        files = sorted(os.listdir(tmp))
+        assert [f for f in files if f.endswith(".rec")] == [
+            "segment-00000000.rec", "segment-00000001.rec", "segment-00000002.rec"]
+
+        with SegmentLedgerReader(tmp) as reader:
+            assert len(reader) == n + 1
+            first = next(reader.segments())
+            assert not first.flags.writeable  # zero-copy view over the mmap
+            norms = reader.column("projection_norm", start_ns=900, end_ns=1100)
+            assert np.allclose(norms, batch.projection_norm[900:1100])
+
+            agg = reader.aggregate_by_action()
+            assert agg["encode"]["count"] == agg["recall"]["count"] == n // 2
+            assert agg["revoke"] == {"count": 1, "mean_norm": 0.5, "max_shadow_energy": 9.0}
+
+            pages = list(reader.scan_batches(start_ns=2498))
+            views = [v for p in pages for v in p]
+            assert [v.task_id for v in views] == ["s2498", "s2499", "last"]
+            assert views[0].metadata == {"src": "bulk"} and views[0].operator_signature == "sig_seg"
+            assert views[-1].action == "revoke" and views[-1].operator_signature is None
+
+
+def test_segment_ledger_drops_torn_tail_record():
+    from fpt.adapters import SegmentLedgerAdapter, RECORD_DTYPE
+    from fpt.ledger_reader import SegmentLedgerReader
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with SegmentLedgerAdapter(directory=tmp) as adapter:
+            for i in range(3):
+                adapter.on_projection(ProjectionEvent(timestamp_ns=i, vector_dim=4, projection_norm=1.0,
+                                                      shadow_energy=0.0, task_id=f"t{i}"))
+        seg = os.path.join(tmp, "segment-00000000.rec")
+        with open(seg, "ab") as f:
+            f.write(b"\x01" * (RECORD_DTYPE.itemsize // 2))
+        with SegmentLedgerAdapter(directory=tmp) as adapter:
+            adapter.on_projection(ProjectionEvent(timestamp_ns=3, vector_dim=4, projection_norm=1.0,
+                                                  shadow_energy=0.0, task_id="t3"))
+        with SegmentLedgerReader(tmp) as reader:
+            ids = [v.task_id for b in reader.scan_batches() for v in b]
+    assert ids == ["t0", "t1", "t2", "t3"]
+
+
+def _segment_event(i, action="encode"):
+    return ProjectionEvent(timestamp_ns=i, vector_dim=4, projection_norm=1.0, shadow_energy=0.0,
+                           action=action, task_id=f"t{i}")
+
+
+def test_segment_ledger_recovers_torn_strings_log():
+    from fpt.adapters import SegmentLedgerAdapter
+    from fpt.ledger_reader import SegmentLedgerReader
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with SegmentLedgerAdapter(directory=tmp) as adapter:
+            adapter.on_projection(_segment_event(0, "encode"))
+        with open(os.path.join(tmp, "strings.log"), "ab") as f:
+            f.write(b'"rev')  # crash mid-line
+        with SegmentLedgerAdapter(directory=tmp) as adapter:
+            adapter.on_projection(_segment_event(1, "revoke"))
+        with SegmentLedgerReader(tmp) as reader:
+            assert [v.action for b in reader.scan_batches() for v in b] == ["encode", "revoke"]
+
+
+def test_segment_ledger_redoes_interrupted_seal():
+    import json
+    from fpt.adapters import SegmentLedgerAdapter, read_segment_footer
+    from fpt.ledger_reader import SegmentLedgerReader
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with SegmentLedgerAdapter(directory=tmp, segment_max_records=4) as adapter:
+            for i in range(3):
+                adapter.on_projection(_segment_event(i))
+        # Crash after the seal marker was written but mid-way through the footer.
+        seg = Path(tmp) / "segment-00000000.rec"
+        seg.with_suffix(".sealing").write_text(json.dumps({"data_end": seg.stat().st_size}))
+        with open(seg, "ab") as f:
+            f.write(b'{"count": 3, "record_si')
+        with SegmentLedgerReader(tmp) as reader:
+            assert len(reader) == 3
+
+        with SegmentLedgerAdapter(directory=tmp, segment_max_records=3) as adapter:
+            adapter.on_projection(_segment_event(3))
+        assert read_segment_footer(seg)["count"] == 3
+        assert not seg.with_suffix(".sealing").exists()
+        with SegmentLedgerReader(tmp) as reader:
+            assert [v.task_id for b in reader.scan_batches() for v in b] == ["t0", "t1", "t2", "t3"]
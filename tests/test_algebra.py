@@ -0,0 +1,368 @@
+import math
+import numpy as np
+import pytest
+from fpt.algebra.living_zero_core import (
+    OwnershipEncoder, OwnershipProjector, OwnershipMemory, CA3Dynamics, CA3Ensemble, MemoryBand, normalize,
+)
+from fpt.algebra.living_zero_projection import OnlineProjectionMemory
+
+
+def _patterns(N, P, seed):
+    rng = np.random.RandomState(seed)
+    return [normalize(rng.normal(size=(N,))) for _ in range(P)]
+
+
+def test_factored_storage_matches_dense():
+    N, d, P = 128, 32, 12
+    O = OwnershipProjector(N=N, d=d, seed=3)
+    dense = OnlineProjectionMemory(N=N, ownership_projector=O)
+    fact = OnlineProjectionMemory(N=N, ownership_projector=O, storage="factored")
+    patterns = _patterns(N, P, 3)
+    for i, p in enumerate(patterns):
+        dense.encode(p, raw_tag=f"owner:{i}")
+        fact.encode(p, raw_tag=f"owner:{i}")
+
+    assert fact.rank == P
+    Q = fact.basis
+    assert Q.shape == (N, P)
+    assert np.allclose(Q.T @ Q, np.eye(P), atol=1e-10)
+    assert np.allclose(fact.P_mat, dense.P_mat, atol=1e-10)
+
+    cue = normalize(patterns[0] + 0.3 * normalize(np.random.RandomState(4).normal(size=(N,))))
+    assert np.allclose(fact.recall(cue, bias_tag="owner:0", beta=0.5),
+                       dense.recall(cue, bias_tag="owner:0", beta=0.5), atol=1e-10)
+
+
+def test_factored_revoke_is_rank_one_downdate():
+    N, d, P = 128, 32, 10
+    O = OwnershipProjector(N=N, d=d, seed=5)
+    dense = OnlineProjectionMemory(N=N, ownership_projector=O)
+    fact = OnlineProjectionMemory(N=N, ownership_projector=O, storage="factored")
+    patterns = _patterns(N, P, 5)
+    for i, p in enumerate(patterns):
+        dense.encode(p, raw_tag=f"owner:{i}")
+        fact.encode(p, raw_tag=f"owner:{i}")
+
+    dense.selective_revoke("owner:0")
+    fact.selective_revoke("owner:0")
+    assert np.allclose(fact.P_mat, dense.P_mat, atol=1e-10)
+
+    # Later revokes keep the factored basis an exact projector.
+    fact.selective_revoke("owner:9")
+    fact.selective_revoke("owner:4")
+    assert fact.rank == P - 3
+    assert np.allclose(fact.basis.T @ fact.basis, np.eye(P - 3), atol=1e-10)
+    assert float(np.dot(fact.recall(patterns[0]), patterns[0])) < 0.1
+    assert float(np.dot(fact.recall(patterns[1]), patterns[1])) > 0.95
+
+
+def test_factored_storage_rejects_dense_assignment():
+    O = OwnershipProjector(N=16, d=16)
+    mem = OnlineProjectionMemory(N=16, ownership_projector=O, storage="factored")
+    with pytest.raises(AttributeError):
+        mem.P_mat = np.eye(16)
+    with pytest.raises(ValueError):
+        OnlineProjectionMemory(N=16, ownership_projector=O, storage="sparse")
+
+
+@pytest.mark.parametrize("storage", ["dense", "factored"])
+def test_projection_encode_batch_matches_sequential(storage):
+    N, d, P = 96, 32, 24
+    O = OwnershipProjector(N=N, d=d, seed=8)
+    seq = OnlineProjectionMemory(N=N, ownership_projector=O, storage=storage)
+    blk = OnlineProjectionMemory(N=N, ownership_projector=O, storage=storage)
+    S = np.array(_patterns(N, P, 8))
+    S[7] = S[3]  # duplicate row is rejected by both paths
+    tags = [f"owner:{i}" for i in range(P)]
+    for s, t in zip(S, tags):
+        seq.encode(s, raw_tag=t)
+    blk.encode_batch(S[:10], tags[:10])
+    blk.encode_batch(S[10:], tags[10:])
+
+    assert blk.rank == seq.rank == P - 1
+    assert np.allclose(blk.P_mat, seq.P_mat, atol=1e-10)
+    X = S + 0.2 * np.random.RandomState(9).normal(size=S.shape)
+    batch = blk.recall_batch(X, bias_tag="owner:2", beta=0.5)
+    single = np.array([seq.recall(x, bias_tag="owner:2", beta=0.5) for x in X])
+    assert np.allclose(batch, single, atol=1e-10)
+
+
+def test_ownership_encode_batch_matches_sequential():
+    N, d, B = 64, 16, 9
+    O = OwnershipProjector(N=N, d=d, seed=11)
+    seq = OwnershipMemory(N=N, ownership_projector=O, eta=1e-2, gamma=1.5, weight_decay=1e-3)
+    blk = OwnershipMemory(N=N, ownership_projector=O, eta=1e-2, gamma=1.5, weight_decay=1e-3)
+    S = np.array(_patterns(N, B, 11))
+    tags = ["owner:a", None, "owner:b"] * 3
+    for s, t in zip(S, tags):
+        seq.encode(s, raw_tag=t)
+    blk.encode_batch(S, tags)
+    assert np.allclose(blk.W, seq.W, atol=1e-12)
+
+    X0 = S + 0.3 * np.random.RandomState(12).normal(size=S.shape)
+    batch = blk.recall_batch(X0, steps=5, bias_tag="owner:a", beta=2.0)
+    single = np.array([seq.recall_iter(x, steps=5, bias_tag="owner:a", beta=2.0) for x in X0])
+    assert np.allclose(batch, single, atol=1e-8)
+
+
+def test_direction_cache_is_bounded_lru():
+    O = OwnershipProjector(N=32, d=8, seed=1, cache_size=2)
+    _, w_ref = O.projector(OwnershipEncoder(d=8).encode("owner:a"))
+    assert np.allclose(O.direction("owner:a"), w_ref)
+    O.direction("owner:a")
+    O.direction("owner:b")
+    O.direction("owner:a")   # refresh a; b is now least recent
+    O.direction("owner:c")   # evicts b
+    info = O.cache_info()
+    assert (info["hits"], info["misses"], info["size"]) == (2, 3, 2)
+    O.direction("owner:b")
+    assert O.cache_info()["misses"] == 4
+
+
+def test_direction_cache_is_safe_under_concurrent_lookups():
+    import pickle
+    from concurrent.futures import ThreadPoolExecutor
+    O = OwnershipProjector(N=32, d=8, seed=1, cache_size=4)
+    tags = [f"owner:{i % 7}" for i in range(4000)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        dirs = list(pool.map(O.direction, tags))
+    for tag, w_hat in zip(tags[:7], dirs[:7]):
+        assert np.allclose(w_hat, O.direction(tag))
+    info = O.cache_info()
+    assert info["size"] <= 4 and info["hits"] + info["misses"] == len(tags) + 7
+
+    clone = pickle.loads(pickle.dumps(O))
+    assert np.allclose(clone.direction("owner:3"), O.direction("owner:3"))
+
+
+def test_rank_one_ownership_updates_match_dense_reference():
+    N, d = 48, 12
+    O = OwnershipProjector(N=N, d=d, seed=6)
+    mem = OwnershipMemory(N=N, ownership_projector=O, eta=1e-2, gamma=1.5)
+    s = _patterns(N, 1, 6)[0]
+    Phi, _ = O.projector(OwnershipEncoder(d=d).encode("owner:x"))
+    M = np.eye(N) + 1.5 * Phi
+    assert np.allclose(mem.ownership_hebb_multiplicative(s, "owner:x"),
+                       M @ (np.outer(s, s) * 1e-2) @ M.T, atol=1e-14)
+
+    mem.encode(s, raw_tag="owner:x")
+    mem.encode(_patterns(N, 1, 7)[0])
+    R = np.eye(N) - 0.7 * Phi
+    expected = R @ mem.W @ R.T
+    mem.selective_revoke("owner:x", rho=0.7)
+    assert np.allclose(mem.W, expected, atol=1e-14)
+
+
+def test_ca3_simulate_matches_step_loop():
+    N = 64
+    O = OwnershipProjector(N=N, d=16, seed=13)
+    mem = OwnershipMemory(N=N, ownership_projector=O, eta=5e-3, gamma=1.5)
+    pats = _patterns(N, 5, 13)
+    mem.encode(pats[0], raw_tag="owner:c")
+    ca3_a = CA3Dynamics(N=N, memory=mem)
+    ca3_b = CA3Dynamics(N=N, memory=mem)
+    for i, p in enumerate(pats):
+        ca3_a.encode_pattern(i, p, strength=0.5 * (i + 1))
+        ca3_b.encode_pattern(i, p, strength=0.5 * (i + 1))
+
+    x0 = normalize(pats[0] + 0.02 * normalize(np.random.RandomState(14).normal(size=(N,))))
+    x = x0.copy(); events = []
+    for t in range(120):
+        x = ca3_a.step(x)
+        trig, theta, r = ca3_a.reward_handshake(x, 0)
+        if trig:
+            events.append((t, theta, r))
+
+    x_sim, events_sim = ca3_b.simulate(x0, 120, target_pid=0)
+    assert np.allclose(x_sim, x, atol=1e-10)
+    assert len(events_sim) == len(events) > 0
+    assert np.isclose(ca3_b.alpha[0], ca3_a.alpha[0])
+    assert np.isclose(ca3_b.P, ca3_a.P)
+
+
+def test_ca3_alpha_snapshot_rejects_item_mutation_and_handshake_gets_copy():
+    N = 32
+    mem = OwnershipMemory(N=N, ownership_projector=OwnershipProjector(N=N, d=8, seed=3))
+    ca3 = CA3Dynamics(N=N, memory=mem)
+    p, q = _patterns(N, 2, 3)
+    ca3.encode_pattern(0, p, strength=0.5)
+    ca3.encode_pattern(1, q, strength=0.25)
+    with pytest.raises(TypeError):
+        ca3.alpha[0] = 2.0
+    with pytest.raises(TypeError):
+        ca3.patterns[0] = q
+    ca3.alpha = {0: 2.0}
+    assert dict(ca3.alpha) == {0: 2.0, 1: 0.0}
+    with pytest.raises(KeyError):
+        ca3.alpha = {7: 1.0}
+
+    seen = []
+    x, events = ca3.simulate(p, 5, target_pid=0, eps=math.pi,
+                             on_handshake=lambda t, x_t, theta, r: seen.append(x_t))
+    assert len(seen) == len(events) == 5
+    assert not any(s is x for s in seen)
+    assert not np.allclose(seen[0], seen[-1])
+
+
+def test_ca3_ensemble_matches_independent_trajectories():
+    N, B = 48, 4
+    O = OwnershipProjector(N=N, d=12, seed=21)
+    mem = OwnershipMemory(N=N, ownership_projector=O, eta=5e-3, gamma=1.5)
+    pats = _patterns(N, 3, 21)
+    mem.encode(pats[0], raw_tag="owner:e")
+    base = CA3Dynamics(N=N, memory=mem)
+    for i, p in enumerate(pats):
+        base.encode_pattern(i, p, strength=0.5)
+    taus = np.array([0.1, 0.2, 0.1, 0.05])
+    kappas = np.array([1e-2, 5e-2, 0.0, 1e-1])
+    x0 = normalize(pats[0] + 0.02 * normalize(np.random.RandomState(22).normal(size=(N,))))
+
+    ens = CA3Ensemble.from_dynamics(base, B, tau=taus)
+    X, events = ens.simulate(x0, 80, target_pid=0, kappa_r=kappas)
+    for i in range(B):
+        ca3 = CA3Dynamics(N=N, memory=mem, tau=taus[i])
+        for j, p in enumerate(pats):
+            ca3.encode_pattern(j, p, strength=0.5)
+        x, ev = ca3.simulate(x0, 80, target_pid=0, kappa_r=kappas[i])
+        assert np.allclose(X[i], x, atol=1e-10)
+        assert events[i] == len(ev)
+        assert np.isclose(ens.alpha[0][i], ca3.alpha[0])
+        assert np.isclose(ens.P[i], ca3.P)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_ca3_ensemble_sharded_run_matches_lockstep(executor):
+    N, B = 32, 6
+    O = OwnershipProjector(N=N, d=8, seed=23)
+    mem = OwnershipMemory(N=N, ownership_projector=O)
+    p = _patterns(N, 1, 23)[0]
+    a = CA3Ensemble(N, mem, B, dt=np.linspace(0.005, 0.02, B))
+    b = CA3Ensemble(N, mem, B, dt=np.linspace(0.005, 0.02, B))
+    a.encode_pattern(0, p, strength=0.5); b.encode_pattern(0, p, strength=0.5)
+    per_row = dict(Vd=np.linspace(0.5, 1.5, B), R=np.ones(B), noise_std=np.zeros(B),
+                   kappa_r=np.linspace(1e-3, 1e-2, B), eps=np.full(B, 0.1))
+    X_a, ev_a = a.simulate(p, 40, target_pid=0, **per_row)
+    X_b, ev_b = b.simulate(p, 40, target_pid=0, workers=3, executor=executor, **per_row)
+    assert np.allclose(X_a, X_b, atol=1e-12)
+    assert np.array_equal(ev_a, ev_b)
+    assert np.allclose(a.P, b.P)
+
+
+def test_ca3_ensemble_sharded_run_accepts_generator_seed():
+    N, B = 16, 4
+    mem = OwnershipMemory(N=N, ownership_projector=OwnershipProjector(N=N, d=8, seed=24))
+    p = _patterns(N, 1, 24)[0]
+    runs = []
+    for _ in range(2):
+        ens = CA3Ensemble(N, mem, B)
+        ens.encode_pattern(0, p, strength=0.5)
+        X, _ = ens.simulate(p, 10, noise_std=0.05, seed=np.random.default_rng(7), workers=2, executor="thread")
+        runs.append(X)
+    assert np.array_equal(runs[0], runs[1])
+    assert not np.allclose(runs[0][0], runs[0][2])
+
+
+def test_check_states_matches_per_state_checks():
+    N, B = 48, 12
+    rng = np.random.RandomState(5)
+    P = np.array(_patterns(N, B, seed=6))
+    X = P + rng.normal(scale=0.4, size=P.shape)
+    X[0] = P[0]  # exact recall lands in the handshake band
+    mem = OnlineProjectionMemory(N=N, ownership_projector=OwnershipProjector(N=N))
+    mem.encode_batch(P[:6])
+    band = MemoryBand()
+
+    batch = band.check_states(X, P, mem.P_mat)
+    for i in range(B):
+        single = band.check_state(X[i], P[i], mem.P_mat)
+        for key, value in single.items():
+            assert np.isclose(batch[key][i], value), key
+    assert batch["in_handshake"][0]
+
+
+def test_check_states_structured_output_and_precomputed_wx():
+    from fpt.algebra.living_zero_core import STATE_CHECK_DTYPE
+
+    N, B = 40, 9
+    rng = np.random.RandomState(8)
+    mem = OwnershipMemory(N=N, ownership_projector=OwnershipProjector(N=N), eta=0.05)
+    P = np.array(_patterns(N, B, seed=9))
+    mem.encode_batch(P)
+    X = 3.0 * P + rng.normal(scale=0.5, size=P.shape)  # unnormalized states
+    band = MemoryBand()
+
+    out = band.check_states(X, P, mem.W)
+    assert out.dtype == STATE_CHECK_DTYPE and out.shape == (B,)
+    for i in range(B):
+        single = band.check_state(X[i], P[i], mem.W)
+        assert np.isclose(out["theta_rad"][i], single["theta_rad"])
+        assert np.isclose(out["spectral_norm"][i], single["spectral_norm"])
+        assert out["stable"][i] == single["stable"]
+
+    from_wx = band.check_states(X, P, WX=X @ mem.W.T)
+    assert np.allclose(from_wx["spectral_norm"], out["spectral_norm"])
+    assert (from_wx["in_spectral_band"] == out["in_spectral_band"]).all()
+    with pytest.raises(ValueError):
+        band.check_states(X, P)
+
+
+@pytest.mark.parametrize("storage", ["dense", "factored"])
+def test_float32_projection_memory_stays_float32_and_tracks_float64(storage):
+    N, P = 256, 24
+    X = np.array(_patterns(N, P, seed=21))
+    rng = np.random.RandomState(22)
+    cues = X + 0.3 * rng.normal(size=X.shape) / np.sqrt(N)
+
+    recalls = {}
+    for dtype in (np.float64, np.float32):
+        proj = OwnershipProjector(N=N, dtype=dtype)
+        mem = OnlineProjectionMemory(N=N, ownership_projector=proj, storage=storage)
+        mem.encode_batch(X[:P // 2], raw_tags=[f"t{i}" for i in range(P // 2)])
+        for i in range(P // 2, P):
+            mem.encode(X[i], raw_tag=f"t{i}")
+        mem.selective_revoke("t0")
+        rec = mem.recall_batch(cues, bias_tag="t1", beta=0.2)
+        assert mem.P_mat.dtype == rec.dtype == np.dtype(dtype)
+        recalls[dtype] = np.einsum("ij,ij->i", rec, X)
+
+    assert np.max(np.abs(recalls[np.float32] - recalls[np.float64])) < 1e-4
+
+
+def test_float32_hebbian_memory_and_dynamics_bound_drift():
+    N = 128
+    X = np.array(_patterns(N, 6, seed=31))
+    final = {}
+    for dtype in (np.float64, np.float32):
+        mem = OwnershipMemory(N=N, ownership_projector=OwnershipProjector(N=N, dtype=dtype), eta=0.05)
+        mem.encode_batch(X, raw_tags="owner:a")
+        ca3 = CA3Dynamics(N=N, memory=mem)
+        ca3.encode_pattern(0, X[0], strength=0.5)
+        x, _ = ca3.simulate(X[0] + 0.05 * X[1], 200)
+        ens = CA3Ensemble.from_dynamics(ca3, B=3)
+        Xe, _ = ens.simulate(X[:3], 50, noise_std=0.0)
+        assert mem.W.dtype == x.dtype == Xe.dtype == ens._alpha.dtype == np.dtype(dtype)
+        final[dtype] = (mem.recall_batch(X, steps=5), x)
+
+    sims32 = np.einsum("ij,ij->i", final[np.float32][0], X)
+    sims64 = np.einsum("ij,ij->i", final[np.float64][0], X)
+    assert np.max(np.abs(sims32 - sims64)) < 1e-3
+    assert abs(float(normalize(final[np.float32][1]) @ X[0]) - float(normalize(final[np.float64][1]) @ X[0])) < 1e-4
+
+
+def test_dtype_mismatch_and_unsupported_dtypes_are_rejected():
+    proj = OwnershipProjector(N=16, dtype=np.float32)
+    with pytest.raises(ValueError):
+        OwnershipMemory(N=16, ownership_projector=proj, dtype=np.float64)
+    with pytest.raises(ValueError):
+        OnlineProjectionMemory(N=16, ownership_projector=proj, dtype=np.float64)
+    with pytest.raises(ValueError):
+        OwnershipProjector(N=16, dtype=np.float16)
+
+
+@pytest.mark.parametrize("dtype", [np.float16, np.longdouble, np.int64])
+def test_inferred_unsupported_dtypes_fall_back_to_float64(dtype):
+    x = np.ones(4, dtype=dtype)
+    assert normalize(x).dtype == np.float64
+    assert MemoryBand().check_state(x, x, np.eye(4))["stable"]
+    with pytest.raises(ValueError):
+        normalize(x, dtype=dtype)
@@ -0,0 +1,76 @@
+import threading
+import pytest
+from append_log import AppendLog, open_append_log
+
+
+def _lines(path):
+    return path.read_bytes().splitlines()
+
+
+def test_group_mode_writes_once_per_batch_and_runs_commit_callbacks_in_order(tmp_path):
+    path = tmp_path / "log.jsonl"
+    committed = []
+    log = AppendLog(path, durability="group", batch_size=3, flush_interval_ms=60_000)
+    log.append("a\n", on_commit=lambda: committed.append("a"))
+    log.append(b"b\n", on_commit=lambda: committed.append("b"))
+    assert _lines(path) == [] and committed == []
+
+    log.append("c\n", on_commit=lambda: committed.append("c"))
+    assert _lines(path) == [b"a", b"b", b"c"]
+    assert committed == ["a", "b", "c"]
+
+    log.append_many(["d\n", "e\n"])
+    log.flush()
+    assert _lines(path) == [b"a", b"b", b"c", b"d", b"e"]
+    log.close()
+
+
+def test_per_event_mode_commits_every_append(tmp_path):
+    path = tmp_path / "log.jsonl"
+    with AppendLog(path, durability="per_event", batch_size=100) as log:
+        log.append("x\n")
+        assert _lines(path) == [b"x"]
+    with pytest.raises(ValueError):
+        AppendLog(path, durability="per_entry")
+
+
+def test_idle_buffer_is_flushed_by_background_thread(tmp_path):
+    path = tmp_path / "log.jsonl"
+    committed = threading.Event()
+    log = AppendLog(path, durability="group", batch_size=1000, flush_interval_ms=10)
+    log.append("idle\n", on_commit=committed.set)
+    assert committed.wait(2.0)
+    assert _lines(path) == [b"idle"]
+    log.close()
+
+
+def test_close_flushes_and_rejects_further_appends(tmp_path):
+    path = tmp_path / "log.jsonl"
+    log = AppendLog(path, durability="none", batch_size=1000, flush_interval_ms=60_000)
+    log.append("last\n")
+    log.close()
+    assert _lines(path) == [b"last"]
+    assert log.closed
+    with pytest.raises(ValueError):
+        log.append("late\n")
+    log.close()  # idempotent
+
+
+def test_open_append_log_shares_one_writer_until_last_holder_closes(tmp_path):
+    path = tmp_path / "shared.jsonl"
+    first = open_append_log(path, batch_size=1000, flush_interval_ms=60_000)
+    second = open_append_log(str(path))
+    assert first is second
+
+    first.append("one\n")
+    first.close()
+    assert not second.closed and _lines(path) == [b"one"]
+    second.append("two\n")
+    second.close()
+    assert second.closed and _lines(path) == [b"one", b"two"]
+
+    reopened = open_append_log(path, durability="per_event")
+    assert reopened is not first and reopened.durability == "per_event"
+    reopened.append("three\n")
+    assert _lines(path) == [b"one", b"two", b"three"]
+    reopened.close()
@@ -1,3 +1,4 @@
+import dataclasses
 import pytest
 import time
 from fpt.events import ProjectionEvent, EventDispatcher
@@ -30,3 +31,170 @@ def test_event_dispatch_flow():
     assert len(adapter.recorded_events) == 1
     assert adapter.recorded_events[0].task_id == "tx_001"
     assert adapter.recorded_events[0].projection_norm == 0.998
+
+
+def _event(i):
+    return ProjectionEvent(
+        timestamp_ns=time.time_ns(), vector_dim=4, projection_norm=1.0, shadow_energy=0.0, task_id=f"e{i}",
+    )
+
+
+def test_queued_dispatcher_isolates_slow_listener():
+    import threading
+    from fpt.events import QueuedEventDispatcher
+
+    release = threading.Event()
+
+    class SlowAdapter(MockLedgerAdapter):
+        def on_projection(self, event):
+            release.wait(5)
+            super().on_projection(event)
+
+    fast, slow = MockLedgerAdapter(), SlowAdapter()
+    dispatcher = QueuedEventDispatcher(capacity=100, overflow="block")
+    dispatcher.register(fast)
+    dispatcher.register(slow)
+
+    start = time.monotonic()
+    for i in range(20):
+        dispatcher.dispatch(_event(i))
+    assert time.monotonic() - start < 1.0
+    assert dispatcher.flush(timeout=0.05) is False
+    assert len(fast.recorded_events) == 20
+    depth = dispatcher.metrics()["SlowAdapter[1]"]["queue_depth"]
+    assert depth >= 19
+
+    release.set()
+    dispatcher.close()
+    assert [e.task_id for e in slow.recorded_events] == [f"e{i}" for i in range(20)]
+
+
+def test_queued_dispatcher_drop_oldest_and_sample_policies():
+    import threading
+    import pytest
+    from fpt.events import QueuedEventDispatcher
+
+    for policy, expected_dropped in (("drop_oldest", 7), ("sample", 7)):
+        gate, started = threading.Event(), threading.Event()
+
+        class Gated(MockLedgerAdapter):
+            def on_projection(self, event):
+                started.set()
+                gate.wait(5)
+                super().on_projection(event)
+
+        sink = Gated()
+        dispatcher = QueuedEventDispatcher(capacity=3, overflow=policy, sample_every=3)
+        dispatcher.register(sink)
+        dispatcher.dispatch(_event(0))
+        assert started.wait(5)  # writer thread picked up e0 and blocks in the listener
+        for i in range(1, 11):
+            dispatcher.dispatch(_event(i))
+        assert dispatcher.metrics()["Gated[0]"]["dropped"] == expected_dropped
+        gate.set()
+        dispatcher.close()
+        ids = [e.task_id for e in sink.recorded_events]
+        if policy == "drop_oldest":
+            assert ids == ["e0", "e8", "e9", "e10"]
+        else:
+            assert ids[0] == "e0" and len(ids) == 4
+
+    with pytest.raises(ValueError):
+        QueuedEventDispatcher(overflow="explode")
+
+
+def test_projection_event_batch_columns_and_views():
+    import numpy as np
+    from fpt.events import ProjectionEventBatch
+
+    events = [
+        ProjectionEvent(timestamp_ns=100 + i, vector_dim=8, projection_norm=0.5 * i, shadow_energy=0.1,
+                        action="encode" if i % 2 else "recall", task_id=f"t{i}",
+                        operator_signature="sig_a" if i < 3 else None, metadata={"i": i})
+        for i in range(5)
+    ]
+    batch = ProjectionEventBatch.from_events(events)
+
+    assert len(batch) == 5
+    assert batch.timestamp_ns.dtype == np.int64
+    assert sorted(batch.actions) == ["encode", "recall"]
+    assert batch.signatures == ["sig_a"]
+    assert batch.signature_codes.tolist() == [0, 0, 0, -1, -1]
+    assert batch[-1].operator_signature is None
+    assert batch[2].to_event() == events[2]
+    assert batch.to_events() == events
+    with pytest.raises(AttributeError):
+        batch[0].extra = 1
+
+    shared = ProjectionEventBatch(timestamp_ns=[1, 2, 3], vector_dim=4, projection_norm=[1.0, 1.0, 1.0],
+                                  shadow_energy=[0.0, 0.0, 0.0], metadata={"src": "bulk"})
+    assert shared.metadata_json_column() == ['{"src": "bulk"}'] * 3
+    assert shared[1].action == "encode" and shared[1].task_id is None
+    with pytest.raises(ValueError):
+        ProjectionEventBatch(timestamp_ns=[1, 2], vector_dim=4, projection_norm=[1.0], shadow_energy=[0.0, 0.0])
+
+
+def test_dispatch_batch_prefers_batch_hook_and_falls_back():
+    from fpt.events import ProjectionEventBatch, QueuedEventDispatcher
+
+    class BatchAdapter(MockLedgerAdapter):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+
+        def on_projection_batch(self, batch):
+            self.batches.append(batch)
+
+    batch = ProjectionEventBatch(timestamp_ns=[1, 2], vector_dim=4, projection_norm=[1.0, 0.9],
+                                 shadow_energy=[0.0, 0.1], task_id=["a", "b"])
+    for dispatcher in (EventDispatcher(), QueuedEventDispatcher(capacity=4)):
+        per_event, bulk = MockLedgerAdapter(), BatchAdapter()
+        dispatcher.register(per_event)
+        dispatcher.register(bulk)
+        dispatcher.dispatch_batch(batch)
+        if isinstance(dispatcher, QueuedEventDispatcher):
+            dispatcher.close()
+        assert [e.task_id for e in per_event.recorded_events] == ["a", "b"]
+        assert all(isinstance(e, ProjectionEvent) for e in per_event.recorded_events)
+        assert dataclasses.asdict(per_event.recorded_events[1])["shadow_energy"] == 0.1
+        assert bulk.batches == [batch] and bulk.recorded_events == []
+
+
+def test_blocked_dispatch_raises_when_dispatcher_closes():
+    import threading
+    from fpt.events import QueuedEventDispatcher
+
+    gate, started = threading.Event(), threading.Event()
+
+    class Gated(MockLedgerAdapter):
+        def on_projection(self, event):
+            started.set()
+            gate.wait(5)
+            super().on_projection(event)
+
+    sink = Gated()
+    dispatcher = QueuedEventDispatcher(capacity=1, overflow="block")
+    dispatcher.register(sink)
+    dispatcher.dispatch(_event(0))
+    assert started.wait(5)
+    dispatcher.dispatch(_event(1))  # fills the ring
+
+    errors = []
+
+    def produce():
+        try:
+            dispatcher.dispatch(_event(2))
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    dispatcher._channels[0].close(timeout=0)  # mark closed; the writer is still held by the gate
+    gate.set()
+    producer.join(5)
+    dispatcher.close()
+
+    assert len(errors) == 1
+    assert [e.task_id for e in sink.recorded_events] == ["e0", "e1"]
+    with pytest.raises(RuntimeError):
+        dispatcher.dispatch(_event(3))
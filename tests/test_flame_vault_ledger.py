@@ -0,0 +1,165 @@
+import importlib
+import sys
+import types
+import pytest
+
+
+class _Socket:
+    def __init__(self, sent):
+        self.sent = sent
+
+    def sendto(self, data, addr):
+        self.sent.append((addr[1], data))
+
+
+@pytest.fixture
+def vault(tmp_path, monkeypatch):
+    """flame_vault_ledger imported inside tmp_path with its signing and relay modules stubbed."""
+    monkeypatch.chdir(tmp_path)
+    sent = []
+    rmp_core = types.ModuleType("rmp_core")
+    rmp_core.sign_receipt = lambda data: f"sig:{data['index']}"
+    rmp_core.verify_receipt = lambda entry, receipt: receipt == f"sig:{entry['index']}"
+    orbital_relay = types.ModuleType("orbital_relay")
+    orbital_relay.OrbitalRelay = lambda: types.SimpleNamespace(
+        udp_sock=_Socket(sent), rmp=types.SimpleNamespace(udp_sock=_Socket(sent)))
+    flame_lock = types.ModuleType("flame_lock_v2_proof")
+    flame_lock.FlameLockV2 = lambda: None
+    for name, module in (("rmp_core", rmp_core), ("orbital_relay", orbital_relay),
+                         ("flame_lock_v2_proof", flame_lock)):
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, "flame_vault_ledger", raising=False)
+    module = importlib.import_module("flame_vault_ledger")
+    module.sent = sent
+    yield module
+    sys.modules.pop("flame_vault_ledger", None)
+
+
+def test_entries_are_broadcast_only_after_their_batch_commits(vault):
+    from append_log import open_append_log
+    shared = open_append_log(vault.LEDGER_PATH, flush_interval_ms=60_000)
+    ledger = vault.FlameVaultLedger(durability="group")
+    ledger.log_event("A", {"n": 1})
+    assert vault.sent == [] and vault.LEDGER_PATH.read_bytes() == b""
+
+    ledger.flush()
+    assert vault.LEDGER_PATH.read_bytes().count(b"\n") == 1
+    assert sorted(port for port, _ in vault.sent) == [7979, 7980]
+    ledger.close()
+    shared.close()
+
+
+def test_close_releases_only_this_ledgers_reference(vault):
+    from append_log import open_append_log
+    other = open_append_log(vault.LEDGER_PATH)
+    ledger = vault.FlameVaultLedger()
+    assert ledger.log is other
+    ledger.close()
+    ledger.close()
+    assert not other.closed
+    other.close()
+    assert other.closed
+
+
+def _legacy_root(leaves):
+    # The ledger's original full-tree build: hex concatenation, odd node paired with itself.
+    import hashlib
+    nodes = [hashlib.sha256(leaf.encode()).hexdigest() for leaf in leaves]
+    if not nodes:
+        return hashlib.sha256(b"genesis").hexdigest()
+    while len(nodes) > 1:
+        nodes = [hashlib.sha256((nodes[i] + (nodes[i + 1] if i + 1 < len(nodes) else nodes[i])).encode()).hexdigest()
+                 for i in range(0, len(nodes), 2)]
+    return nodes[0]
+
+
+def test_frontier_root_matches_legacy_tree(vault):
+    frontier = vault.MerkleFrontier()
+    leaves = []
+    assert frontier.root() == _legacy_root(leaves)
+    for i in range(70):
+        leaves.append(f'{{"n": {i}}}')
+        frontier.append(leaves[-1])
+        assert frontier.root() == _legacy_root(leaves)
+    restored = vault.MerkleFrontier.from_dict(frontier.to_dict())
+    assert restored.root() == frontier.root() and restored.size == 70
+
+
+def _fill(vault, n, **kwargs):
+    ledger = vault.FlameVaultLedger(**kwargs)
+    for i in range(n):
+        ledger.log_event("E", {"n": i})
+    return ledger
+
+
+def test_restart_catches_up_lagging_frontier(vault):
+    import json
+    ledger = _fill(vault, 3)
+    ledger.flush()
+    lagging = vault.FRONTIER_PATH.read_text()
+    for i in range(3, 9):
+        ledger.log_event("E", {"n": i})
+    head_root = ledger.head.merkle_root
+    ledger.close()
+    vault.FRONTIER_PATH.write_text(lagging)
+
+    restarted = vault.FlameVaultLedger()
+    assert restarted.size == 9 and restarted.frontier.root() == head_root
+    assert json.loads(vault.FRONTIER_PATH.read_text())["size"] == 9
+    restarted.log_event("E", {"n": 9})
+    assert restarted.verify_ledger(workers=1)
+    restarted.close()
+
+
+def test_restart_rebuilds_stale_frontier(vault):
+    import json
+    ledger = _fill(vault, 5)
+    head_root = ledger.head.merkle_root
+    ledger.close()
+    state = json.loads(vault.FRONTIER_PATH.read_text())
+    state["peaks"] = ["0" * 64 if p is not None else None for p in state["peaks"]]
+    vault.FRONTIER_PATH.write_text(json.dumps(state))
+
+    restarted = vault.FlameVaultLedger()
+    assert restarted.frontier.root() == head_root
+    assert vault.MerkleFrontier.from_dict(json.loads(vault.FRONTIER_PATH.read_text())).root() == head_root
+    restarted.close()
+
+
+def _tamper(vault, index, old, new):
+    lines = vault.LEDGER_PATH.read_bytes().splitlines(keepends=True)
+    assert old in lines[index]
+    lines[index] = lines[index].replace(old, new)
+    vault.LEDGER_PATH.write_bytes(b"".join(lines))
+
+
+def test_verify_resumes_from_checkpoint_and_rejects_tampered_checkpoint_line(vault):
+    ledger = _fill(vault, 5)
+    assert ledger.verify_ledger(workers=1, chunk_lines=2)
+    assert vault.CHECKPOINT_PATH.exists()
+    for i in range(5, 8):
+        ledger.log_event("E", {"n": i})
+    assert ledger.verify_ledger(workers=1, chunk_lines=2)
+
+    _tamper(vault, 7, b'"n":7', b'"n":9')
+    assert not ledger.verify_ledger(workers=1)
+    ledger.close()
+
+
+def test_full_audit_ignores_checkpoint(vault):
+    ledger = _fill(vault, 6)
+    assert ledger.verify_ledger(workers=1)
+    _tamper(vault, 1, b'"n":1', b'"n":4')
+    # The checkpointed tail is untouched, so a resumed run only re-checks the last line.
+    assert ledger.verify_ledger(workers=1)
+    assert not ledger.verify_ledger(workers=1, resume=False)
+    ledger.close()
+
+
+def test_small_ledger_verifies_without_process_pool(vault, monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started for a small ledger")
+    monkeypatch.setattr(vault, "ProcessPoolExecutor", no_pool)
+    ledger = _fill(vault, 4)
+    assert ledger.verify_ledger()
+    ledger.close()
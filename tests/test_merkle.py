@@ -0,0 +1,73 @@
+import hashlib
+import pytest
+from fpt.merkle import (
+    EMPTY_ROOT,
+    MerkleTree,
+    hash_leaf,
+    hash_leaves,
+    hash_node,
+    merkle_root,
+    verify_consistency,
+    verify_inclusion,
+    verify_multi_proof,
+)
+
+
+def _reference_root(hashes):
+    # RFC 6962 MTH: split at the largest power of two below n.
+    if not hashes:
+        return hashlib.sha256(b"").digest()
+    if len(hashes) == 1:
+        return hashes[0]
+    k = 1 << ((len(hashes) - 1).bit_length() - 1)
+    return hash_node(_reference_root(hashes[:k]), _reference_root(hashes[k:]))
+
+
+def _leaves(n):
+    return [hashlib.sha256(str(i).encode()).digest() for i in range(n)]
+
+
+def test_merkle_root_matches_rfc6962_split():
+    assert merkle_root([]) == EMPTY_ROOT
+    for n in range(1, 40):
+        leaves = _leaves(n)
+        expected = _reference_root([hash_leaf(leaf) for leaf in leaves])
+        assert merkle_root(leaves) == expected
+        assert MerkleTree(leaves).root == expected
+    assert hash_leaves(["a", b"a"]) == hash_leaf(b"a") * 2
+
+
+def test_inclusion_proofs_verify_and_reject_wrong_position():
+    for n in (1, 2, 5, 8, 13):
+        tree = MerkleTree(_leaves(n))
+        for i in range(n):
+            proof = tree.inclusion_proof(i)
+            assert verify_inclusion(tree.leaf_hash(i), i, n, proof, tree.root)
+            if n > 1:
+                assert not verify_inclusion(tree.leaf_hash(i), (i + 1) % n, n, proof, tree.root)
+    with pytest.raises(IndexError):
+        MerkleTree(_leaves(3)).inclusion_proof(3)
+
+
+def test_consistency_proofs_between_prefixes():
+    leaves = _leaves(21)
+    tree = MerkleTree(leaves)
+    for m in range(tree.size + 1):
+        old_root = merkle_root(leaves[:m])
+        proof = tree.consistency_proof(m)
+        assert verify_consistency(m, tree.size, old_root, tree.root, proof)
+        if 0 < m < tree.size:
+            assert not verify_consistency(m, tree.size, hash_leaf(b"forged"), tree.root, proof)
+
+
+def test_multi_proof_shares_siblings_and_detects_tampering():
+    tree = MerkleTree(_leaves(11))
+    indices = [0, 1, 6, 10]
+    proof = tree.multi_proof(indices)
+    known = {i: tree.leaf_hash(i) for i in indices}
+    assert len(proof) < sum(len(tree.inclusion_proof(i)) for i in indices)
+    assert verify_multi_proof(known, tree.size, proof, tree.root)
+
+    known[6] = hash_leaf(b"tampered")
+    assert not verify_multi_proof(known, tree.size, proof, tree.root)
+    assert not verify_multi_proof({0: tree.leaf_hash(0)}, tree.size, proof, tree.root)
@@ -0,0 +1,90 @@
+import asyncio
+import pytest
+from core.raft_governance import RaftEngine
+from core.raft_transport import AsyncTCPTransport, InProcessTransport
+
+
+def _entries(start, stop, term=0):
+    return [{"index": i, "term": term, "timestamp_ns": 0, "command_type": "GOVERNANCE_STEP",
+             "payload": {"cycle_id": i}} for i in range(start, stop)]
+
+
+def test_follower_batches_truncates_conflicts_and_recovers(tmp_path):
+    f = RaftEngine("f", ["l", "f"], storage_dir=str(tmp_path))
+    assert f.handle_append_entries(1, "l", 0, 0, _entries(1, 6, term=1), 0) == (True, 1)
+    assert f.last_log_index == 5
+
+    # A gap or a mismatched prev term is rejected.
+    assert f.handle_append_entries(1, "l", 7, 1, _entries(8, 9, term=1), 0)[0] is False
+    assert f.handle_append_entries(1, "l", 5, 0, _entries(6, 7, term=1), 0)[0] is False
+
+    # A new leader overwrites the uncommitted suffix from index 4.
+    ok, _ = f.handle_append_entries(2, "l", 3, 1, _entries(4, 6, term=2), 4)
+    assert ok and [e.term for e in f.log] == [1, 1, 1, 2, 2]
+    assert f.commit_index == 4 and f.state_machine.cycle_id == 4
+
+    restarted = RaftEngine("f", ["l", "f"], storage_dir=str(tmp_path))
+    assert [e.term for e in restarted.log] == [1, 1, 1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_inprocess_cluster_commits_and_catches_up_after_compaction(tmp_path):
+    hub = InProcessTransport()
+    ids = ["n0", "n1", "n2"]
+    nodes = [RaftEngine(n, ids, storage_dir=str(tmp_path / n), max_log_window=50,
+                        transport=hub, max_batch=16) for n in ids]
+    leader = nodes[0]
+
+    hub.down.add("n2")
+    await asyncio.gather(*(leader.submit("GOVERNANCE_STEP", {"cycle_id": i}) for i in range(1, 201)))
+    assert leader.commit_index == 200 and leader.snapshot_base > 0
+    assert nodes[2].last_log_index == 0
+
+    # n2 missed entries that were compacted away, so it is sent a snapshot and then the tail.
+    hub.down.clear()
+    await leader.replicate()
+    await leader.replicate()
+    for node in nodes:
+        assert node.last_applied == 200
+        assert node.state_machine.cycle_id == 200
+
+
+@pytest.mark.asyncio
+async def test_tcp_transport_replicates(tmp_path):
+    addresses = {}
+    ids = ["t0", "t1", "t2"]
+    transports = []
+    for n in ids:
+        t = AsyncTCPTransport("127.0.0.1", 0, addresses)
+        await t.start()
+        addresses[n] = ("127.0.0.1", t.port)
+        transports.append(t)
+    nodes = [RaftEngine(n, ids, storage_dir=str(tmp_path / n), transport=t) for n, t in zip(ids, transports)]
+
+    await asyncio.gather(*(nodes[0].submit("GOVERNANCE_STEP", {"cycle_id": i}) for i in range(1, 41)))
+    await nodes[0].replicate()
+    assert [n.last_applied for n in nodes] == [40, 40, 40]
+    for t in transports:
+        await t.close()
+
+
+def test_interrupted_snapshot_write_keeps_previous_snapshot(tmp_path, monkeypatch):
+    import json
+    import core.raft_governance as rg
+    f = RaftEngine("f", ["l", "f"], storage_dir=str(tmp_path))
+    f.handle_append_entries(1, "l", 0, 0, _entries(1, 4, term=1), 3)
+    f.compact_log()
+    with open(f.snapshot_file) as fh:
+        assert json.load(fh)["last_included_index"] == 3
+
+    def torn_dump(obj, fp, **kwargs):
+        fp.write('{"last_included_index": ')
+        raise OSError("disk full")
+    f.handle_append_entries(1, "l", 3, 1, _entries(4, 6, term=1), 5)
+    monkeypatch.setattr(rg.json, "dump", torn_dump)
+    with pytest.raises(OSError):
+        f.compact_log()
+    monkeypatch.undo()
+
+    restarted = RaftEngine("f", ["l", "f"], storage_dir=str(tmp_path))
+    assert restarted.snapshot_base == 3 and restarted.last_log_index == 5
@@ -0,0 +1,431 @@
+import threading
+import pytest
+from fpt.runtime.async_dispatch_pipeline import AsyncWorkerPool, register_handler
+
+
+def square_handler(payload):
+    if payload.get("corrupt"):
+        raise ValueError("Corrupted data chunk")
+    return payload["val"] ** 2
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_runs_handlers_off_loop():
+    loop_thread = threading.get_ident()
+    seen = []
+
+    def handler(payload):
+        seen.append((payload["val"], threading.get_ident()))
+
+    pool = AsyncWorkerPool(num_workers=2, base_backoff=0.001, executor="thread", executor_workers=2)
+    await pool.start(handler=handler)
+    for i in range(6):
+        await pool.submit(f"t{i}", {"val": i})
+    await pool.shutdown()
+
+    assert sorted(v for v, _ in seen) == list(range(6))
+    assert all(tid != loop_thread for _, tid in seen)
+    stats = pool.stats()
+    assert stats["processed"] == 6 and stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    assert len(stats["worker_utilization"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_process_executor_with_registered_handler():
+    register_handler("square", square_handler)
+    pool = AsyncWorkerPool(num_workers=2, max_retries=2, base_backoff=0.001, executor="process", executor_workers=2)
+    await pool.start(handler="square")
+    await pool.submit("ok", {"val": 3})
+    await pool.submit("bad", {"val": 4, "corrupt": True})
+    await pool.shutdown()
+
+    assert pool.stats()["processed"] == 1
+    assert len(pool.recovery.dead_letter_queue) == 1
+    assert pool.recovery.dead_letter_queue[0]["record"]["id"] == "bad"
+
+
+@pytest.mark.asyncio
+async def test_process_executor_rejects_unpicklable_handler():
+    pool = AsyncWorkerPool(num_workers=1, executor="process")
+    with pytest.raises(TypeError):
+        await pool.start(handler=lambda payload: None)
+    with pytest.raises(TypeError):
+        register_handler("lambda", lambda payload: None)
+
+
+@pytest.mark.asyncio
+async def test_failed_task_is_reenqueued_without_holding_worker():
+    import asyncio
+    attempts = {"flaky": 0}
+    order = []
+
+    def handler(payload):
+        order.append(payload["name"])
+        if payload["name"] == "flaky":
+            attempts["flaky"] += 1
+            if attempts["flaky"] < 3:
+                raise ConnectionResetError("Temporary drop")
+
+    pool = AsyncWorkerPool(num_workers=1, max_retries=3, base_backoff=0.02)
+    await pool.start(handler=handler)
+    await pool.submit("f", {"name": "flaky"})
+    await pool.submit("a", {"name": "a"})
+    await pool.submit("b", {"name": "b"})
+    await asyncio.sleep(0)
+    await pool.shutdown()
+
+    # The single worker served a and b while flaky was waiting out its backoff.
+    assert order[:3] == ["flaky", "a", "b"]
+    assert attempts["flaky"] == 3
+    assert len(pool.recovery.dead_letter_queue) == 0
+    assert pool.stats()["delayed"] == 0
+
+
+@pytest.mark.asyncio
+async def test_shutdown_of_unstarted_pool_is_a_no_op():
+    pool = AsyncWorkerPool(num_workers=2)
+    await pool.shutdown()
+    await pool.start(handler=square_handler)
+    assert await (await pool.submit("after", {"val": 5})) == 25
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_async_recovery_variant_routes_to_dlq():
+    from fpt.runtime.ingestion_recovery import IngestionPipeline
+    pipe = IngestionPipeline(max_retries=3, base_delay=0.001)
+    calls = []
+
+    async def failing(record):
+        calls.append(record["id"])
+        raise ValueError("Invalid format")
+
+    assert await pipe.process_record_with_recovery_async({"id": "ok"}, lambda r: None) is True
+    assert await pipe.process_record_with_recovery_async({"id": "bad"}, failing) is False
+    assert calls == ["bad"] * 3
+    assert pipe.dead_letter_queue[0]["record"]["id"] == "bad"
+    assert 0.0005 <= pipe.backoff_delay(1, jitter=True) <= 0.0015
+
+
+def _entry(i, ts=None):
+    import time
+    return {"record": {"id": f"r{i}", "data": {"val": i}}, "timestamp": time.time() if ts is None else ts}
+
+
+def test_ring_buffer_dlq_enforces_size_and_age_caps():
+    import time
+    from fpt.runtime.dead_letter import RingBufferDLQ
+    dlq = RingBufferDLQ(max_entries=3, max_age_s=60)
+    dlq.append(_entry(0, ts=time.time() - 120))
+    for i in range(1, 6):
+        dlq.append(_entry(i))
+    assert [e["record"]["id"] for e in dlq] == ["r3", "r4", "r5"]
+    assert [e["record"]["id"] for e in dlq.pop_batch(2)] == ["r3", "r4"]
+    assert len(dlq) == 1
+
+
+def test_segment_file_dlq_batches_writes_and_survives_restart(tmp_path):
+    from fpt.runtime.dead_letter import SegmentFileDLQ
+    dlq = SegmentFileDLQ(str(tmp_path), max_entries=8, segment_max_entries=3, flush_every=4, flush_interval_s=60)
+    for i in range(3):
+        dlq.append(_entry(i))
+    assert not list(tmp_path.glob("dlq-*.jsonl"))  # still buffered
+    for i in range(3, 12):
+        dlq.append(_entry(i))
+    dlq.close()
+
+    reopened = SegmentFileDLQ(str(tmp_path), max_entries=8, segment_max_entries=3)
+    assert len(reopened) == 8
+    assert [e["record"]["id"] for e in reopened.pop_batch(3)] == ["r4", "r5", "r6"]
+    reopened.close()
+    again = SegmentFileDLQ(str(tmp_path), max_entries=8, segment_max_entries=3)
+    assert [e["record"]["id"] for e in again] == [f"r{i}" for i in range(7, 12)]
+    again.close()
+
+
+def test_sqlite_dlq_caps_and_pops(tmp_path):
+    import time
+    from fpt.runtime.dead_letter import SQLiteDLQ
+    with SQLiteDLQ(str(tmp_path / "dlq.db"), max_entries=5, max_age_s=60, flush_every=10) as dlq:
+        dlq.append(_entry(0, ts=time.time() - 120))
+        for i in range(1, 9):
+            dlq.append(_entry(i))
+        assert len(dlq) == 9  # buffered rows count until the flush applies the caps
+        dlq.flush()
+        assert [e["record"]["id"] for e in dlq] == ["r4", "r5", "r6", "r7", "r8"]
+        assert [e["record"]["data"]["val"] for e in dlq.pop_batch(2)] == [4, 5]
+        assert len(dlq) == 3
+
+
+@pytest.mark.asyncio
+async def test_dead_letters_replay_into_pool(tmp_path):
+    from fpt.runtime.dead_letter import SQLiteDLQ
+    healed = {"ok": False}
+    seen = []
+
+    def handler(payload):
+        if not healed["ok"]:
+            raise ValueError("downstream unavailable")
+        seen.append(payload["val"])
+
+    dlq = SQLiteDLQ(str(tmp_path / "replay.db"))
+    pool = AsyncWorkerPool(num_workers=2, max_retries=1, dead_letter_queue=dlq)
+    await pool.start(handler=handler)
+    for i in range(5):
+        await pool.submit(f"t{i}", {"val": i})
+    await pool.shutdown()
+    assert len(dlq) == 5
+
+    healed["ok"] = True
+    await pool.start(handler=handler)
+    assert await pool.replay_dead_letters(rate_limit=1000, batch_size=2) == 5
+    await pool.shutdown()
+    assert sorted(seen) == [0, 1, 2, 3, 4]
+    assert len(dlq) == 0
+    dlq.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["ring", "segment", "sqlite"])
+async def test_failed_replay_keeps_dead_letters(tmp_path, backend):
+    from fpt.runtime.dead_letter import RingBufferDLQ, SegmentFileDLQ, SQLiteDLQ
+    dlq = {
+        "ring": lambda: RingBufferDLQ(),
+        "segment": lambda: SegmentFileDLQ(str(tmp_path)),
+        "sqlite": lambda: SQLiteDLQ(str(tmp_path / "dlq.db")),
+    }[backend]()
+    for i in range(3):
+        dlq.append(_entry(i))
+
+    class ClosedPool:
+        async def submit_batch(self, batch):
+            raise RuntimeError("queue closed")
+
+    class RecordingPool:
+        def __init__(self):
+            self.ids = []
+
+        async def submit_batch(self, batch):
+            self.ids.extend(item["id"] for item in batch)
+
+    with pytest.raises(RuntimeError):
+        await dlq.replay(ClosedPool(), batch_size=2)
+    assert [e["record"]["id"] for e in dlq] == ["r0", "r1", "r2"]
+    pool = RecordingPool()
+    assert await dlq.replay(pool, batch_size=2) == 3
+    assert pool.ids == ["r0", "r1", "r2"] and len(dlq) == 0
+    dlq.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend", ["ring", "segment", "sqlite"])
+async def test_replay_stops_at_entries_queued_when_it_started(tmp_path, backend):
+    import asyncio
+    from fpt.runtime.dead_letter import RingBufferDLQ, SegmentFileDLQ, SQLiteDLQ
+    dlq = {
+        "ring": lambda: RingBufferDLQ(),
+        "segment": lambda: SegmentFileDLQ(str(tmp_path)),
+        "sqlite": lambda: SQLiteDLQ(str(tmp_path / "dlq.db")),
+    }[backend]()
+    for i in range(3):
+        dlq.append(_entry(i))
+
+    class StillFailingPool:
+        async def submit_batch(self, batch):
+            await asyncio.sleep(0)
+            for item in batch:
+                dlq.append({"record": {"id": item["id"], "data": {}}, "timestamp": _entry(0)["timestamp"]})
+
+    assert await asyncio.wait_for(dlq.replay(StillFailingPool(), batch_size=2), timeout=2.0) == 3
+    assert [e["record"]["id"] for e in dlq] == ["r0", "r1", "r2"]
+    dlq.close()
+
+
+def test_incomplete_dead_letter_backend_fails_at_construction():
+    from fpt.runtime.dead_letter import DeadLetterBackend
+
+    class AppendOnly(DeadLetterBackend):
+        def append(self, entry):
+            pass
+
+    with pytest.raises(TypeError):
+        AppendOnly()
+
+
+@pytest.mark.asyncio
+async def test_segment_file_dlq_flushes_idle_buffer_and_skips_expired_in_len(tmp_path):
+    import asyncio
+    import time
+    from fpt.runtime.dead_letter import SegmentFileDLQ
+    dlq = SegmentFileDLQ(str(tmp_path), max_age_s=60, flush_every=100, flush_interval_s=0.02)
+    dlq.append(_entry(0, ts=time.time() - 120))
+    dlq.append(_entry(1))
+    await asyncio.sleep(0.1)
+    assert not dlq._buffer
+    assert sum(1 for _ in tmp_path.glob("dlq-*.jsonl")) == 1
+    assert len(dlq) == 1
+    dlq.close()
+
+
+@pytest.mark.asyncio
+async def test_projection_service_coalesces_vectors_into_micro_batches():
+    import asyncio
+    import numpy as np
+    from fpt.runtime.async_projection_service import AsyncProjectionService
+
+    N = 16
+    service = AsyncProjectionService(N=N, d=N, num_workers=2, max_batch=4, max_wait_ms=20)
+    calls = []
+    encode_batch = service.memory.encode_batch
+    service.memory.encode_batch = lambda S, tags=None: (calls.append(len(S)), encode_batch(S, tags))[1]
+    await service.start()
+
+    rng = np.random.RandomState(0)
+    vectors = [v / np.linalg.norm(v) for v in rng.normal(size=(6, N))]
+    for i, v in enumerate(vectors[:3]):
+        await service.ingest_vector(f"e{i}", v, action="encode")
+    await asyncio.gather(*await service.ingest_batch(vectors[3:], action="encode"))
+    recalled = await asyncio.gather(*[
+        await service.ingest_vector(f"r{i}", v, action="recall") for i, v in enumerate(vectors)
+    ])
+    await service.shutdown()
+
+    assert sum(calls) == 6 and len(calls) < 6
+    assert service.memory.rank == 6
+    for rec, v in zip(recalled, vectors):
+        assert isinstance(rec, np.ndarray) and float(rec @ v) > 0.99
+    assert len(service.pool.recovery.dead_letter_queue) == 0
+
+
+@pytest.mark.asyncio
+async def test_projection_service_unknown_action_still_dead_letters():
+    import numpy as np
+    from fpt.runtime.async_projection_service import AsyncProjectionService
+    from fpt.runtime.dead_letter import DeadLetterError
+
+    service = AsyncProjectionService(N=8, d=8, num_workers=1)
+    service.pool.recovery.base_delay = 0.001
+    await service.start()
+    fut = await service.ingest_vector("bad_action", np.ones(8), action="unknown_op")
+    with pytest.raises(DeadLetterError) as info:
+        await fut
+    assert isinstance(info.value.error, ValueError)
+    await service.shutdown()
+    assert service.pool.recovery.dead_letter_queue[0]["record"]["id"] == "bad_action"
+
+
+@pytest.mark.asyncio
+async def test_pool_submit_returns_result_future():
+    from fpt.runtime.dead_letter import DeadLetterError
+    pool = AsyncWorkerPool(num_workers=2, max_retries=1)
+    await pool.start(handler=square_handler)
+    ok = await pool.submit("ok", {"val": 7})
+    bad = await pool.submit("bad", {"val": 1, "corrupt": True})
+    assert await ok == 49
+    with pytest.raises(DeadLetterError):
+        await bad
+    futures = await pool.submit_batch([{"id": "b0", "val": 2}, {"id": "b1", "val": 3}])
+    assert [await f for f in futures] == [4, 9]
+    await pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_dlq_failure_still_resolves_task_and_keeps_worker():
+    import asyncio
+    from fpt.runtime.dead_letter import DeadLetterError, RingBufferDLQ
+
+    class BrokenDLQ(RingBufferDLQ):
+        def append(self, entry):
+            raise OSError("dead-letter store unavailable")
+
+    pool = AsyncWorkerPool(num_workers=1, max_retries=1)
+    pool.recovery.dead_letter_queue = BrokenDLQ()
+    await pool.start(handler=square_handler)
+    bad = await pool.submit("bad", {"val": 1, "corrupt": True})
+    with pytest.raises(DeadLetterError):
+        await asyncio.wait_for(bad, timeout=2.0)
+    assert await asyncio.wait_for(await pool.submit("ok", {"val": 3}), timeout=2.0) == 9
+    await asyncio.wait_for(pool.shutdown(), timeout=2.0)
+
+
+@pytest.mark.asyncio
+async def test_projection_service_request_response_and_latency():
+    import numpy as np
+    from fpt.runtime.async_projection_service import AsyncProjectionService
+
+    N = 16
+    service = AsyncProjectionService(N=N, d=N, num_workers=2, max_wait_ms=1)
+    await service.start()
+    rng = np.random.RandomState(1)
+    p0, p1 = (v / np.linalg.norm(v) for v in rng.normal(size=(2, N)))
+    await service.encode(p0, raw_tag="owner:a")
+    await service.encode(p1, raw_tag="owner:b")
+    assert float(await service.recall(p0) @ p0) > 0.99
+    await service.revoke("owner:a")
+    assert float(await service.recall(p0) @ p0) < 0.1
+    await service.shutdown()
+
+    summary = service.latency_summary()
+    assert summary["recall"]["count"] == 2 and summary["encode"]["count"] == 2
+    assert summary["revoke"]["count"] == 1
+    for stats in summary.values():
+        assert 0.0 < stats["p50_s"] <= stats["p95_s"] <= stats["p99_s"] <= stats["max_s"]
+
+
+@pytest.mark.asyncio
+async def test_projection_service_rejects_bad_width_and_keeps_batching():
+    import asyncio
+    import numpy as np
+    from fpt.runtime.async_projection_service import AsyncProjectionService
+
+    N = 32
+    service = AsyncProjectionService(N=N, d=N, num_workers=1, max_wait_ms=20)
+    await service.start()
+    good = await service.submit("good", np.ones(N) / np.sqrt(N), action="recall")
+    bad = await service.submit("bad", np.ones(16), action="recall")
+    with pytest.raises(ValueError):
+        await bad
+    assert (await asyncio.wait_for(good, 1.0)).shape == (N,)
+    assert not service._batcher.done()
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_projection_service_empty_batch_is_a_no_op():
+    import numpy as np
+    from fpt.runtime.async_projection_service import AsyncProjectionService
+
+    service = AsyncProjectionService(N=16, d=16, num_workers=1)
+    await service.start()
+    assert await service.ingest_batch([]) == []
+    assert await service.ingest_batch(np.empty((0, 16)), action="recall") == []
+    assert await service.ingest_batch([], action="revoke") == []
+    await service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_projection_service_revoke_waits_for_pending_encode():
+    import numpy as np
+    from fpt.runtime.async_projection_service import AsyncProjectionService
+
+    N = 16
+    service = AsyncProjectionService(N=N, d=N, num_workers=2, max_wait_ms=50)
+    await service.start()
+    x = np.random.RandomState(2).normal(size=N)
+    encoded = await service.submit("enc", x / np.linalg.norm(x), action="encode", raw_tag="t")
+    revoked = await service.submit("rev", action="revoke", pattern_id="t")
+    await encoded
+    await revoked
+    await service.shutdown()
+    assert service.memory.rank == 0
+
+
+def test_latency_histogram_percentiles():
+    from fpt.runtime.metrics import LatencyHistogram
+    hist = LatencyHistogram()
+    for ms in range(1, 101):
+        hist.record(ms / 1000.0)
+    assert hist.count == 100
+    assert 0.045 <= hist.percentile(50) <= 0.055
+    assert 0.090 <= hist.percentile(95) <= 0.104
+    assert hist.percentile(100) == pytest.approx(0.1)
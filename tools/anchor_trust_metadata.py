@@ -1,25 +1,13 @@
 #!/usr/bin/env python3
-import hashlib, json, time
+import os, sys, hashlib, json, time
 from pathlib import Path
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from fpt.merkle import merkle_root
+
 LEDGER_PATH = Path("governance_state.json")
 ANCHOR_OUTPUT_PATH = Path("anchored_trust_registry.json")
 
-class MerkleAccumulator:
-    def __init__(self, leaves):
-        self.leaves = [hashlib.sha256(l.encode('utf-8')).hexdigest() for l in leaves]
-        self.root = self._build_tree(self.leaves)
-
-    def _build_tree(self, level):
-        if not level: return hashlib.sha256(b"").hexdigest()
-        if len(level) == 1: return level[0]
-        nxt = []
-        for i in range(0, len(level), 2):
-            left = level[i]
-            right = level[i+1] if i+1 < len(level) else left
-            nxt.append(hashlib.sha256((left + right).encode('utf-8')).hexdigest())
-        return self._build_tree(nxt)
-
 def build_default_records():
     return [
         {
@@ -65,24 +53,24 @@ def anchor_metadata():
     leaf_payloads, processed_assets = [], []
     for item in records:
         canonical_str = json.dumps(item, sort_keys=True)
-        h = hashlib.sha256(canonical_str.encode('utf-8')).hexdigest()
-        leaf_payloads.append(h)
+        digest = hashlib.sha256(canonical_str.encode('utf-8')).digest()
+        leaf_payloads.append(digest)
         e = dict(item)
-        e["asset_hash"] = h
+        e["asset_hash"] = digest.hex()
         processed_assets.append(e)
 
-    merkle = MerkleAccumulator(leaf_payloads)
+    asset_root = merkle_root(leaf_payloads).hex()
     payload = {
         "timestamp_epoch": time.time(),
         "timestamp_iso": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "governance_cycle_id": cycle_id,
         "frequency_target_hz": freq_target,
-        "merkle_asset_root": merkle.root,
+        "merkle_asset_root": asset_root,
         "total_assets_indexed": len(processed_assets),
         "assets": processed_assets,
         "cryptographic_profile": {
             "hash_algorithm": "SHA-256",
-            "tree_structure": "Balanced Binary Merkle Accumulator",
+            "tree_structure": "RFC 6962 Merkle Tree (raw SHA-256 asset digests)",
             "fpt_omega_coupling": 3.204423
         }
     }
@@ -91,7 +79,7 @@ def anchor_metadata():
         json.dump(payload, f, indent=2)
 
     print(f"[+] Total Records Anchored: {len(processed_assets)}")
-    print(f"[+] Merkle Asset Root:     {merkle.root}")
+    print(f"[+] Merkle Asset Root:     {asset_root}")
     print(f"[+] Output Written:        {ANCHOR_OUTPUT_PATH}")
 
 if __name__ == "__main__":
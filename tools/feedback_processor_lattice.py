@@ -1,21 +1,9 @@
 #!/usr/bin/env python3
-import hashlib, json, math
+import os, sys, math
 from typing import List, Dict, Any
 
-class MerkleTree:
-    def __init__(self, leaves: List[str]):
-        self.leaves = [hashlib.sha256(l.encode('utf-8')).hexdigest() for l in leaves]
-        self.root = self._build_tree(self.leaves)
-
-    def _build_tree(self, level: List[str]) -> str:
-        if not level: return hashlib.sha256(b"").hexdigest()
-        if len(level) == 1: return level[0]
-        nxt = []
-        for i in range(0, len(level), 2):
-            left = level[i]
-            right = level[i+1] if i+1 < len(level) else left
-            nxt.append(hashlib.sha256((left + right).encode('utf-8')).hexdigest())
-        return self._build_tree(nxt)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from fpt.merkle import merkle_root
 
 class LatticeFeedbackProcessor:
     PI_STATIC: float = math.pi
@@ -51,10 +39,9 @@ class LatticeFeedbackProcessor:
             self.nodes[idx] = upd
             leaves.append(f"cycle:{self.cycle_count}|node:{idx}|coords:{[round(v, 6) for v in upd]}|slip:{round(slip, 6)}")
 
-        merkle = MerkleTree(leaves)
         return {
             "cycle": self.cycle_count,
-            "merkle_root": merkle.root,
+            "merkle_root": merkle_root(leaves).hex(),
             "damping_gamma": round(gamma, 6),
             "step_phase_slip": round(slip, 6),
             "accumulated_slip": round(self.total_accumulated_slip, 6),
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
-import asyncio, hashlib, json, math, time
+import os, sys, asyncio, hashlib, json, math, time
 from typing import Dict, Any, List, Tuple
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+from fpt.merkle import merkle_root
+
 class LatticePQCValidator:
     Q_MODULUS: int = 8380417
     GAMMA1: int = 524288
@@ -112,8 +115,9 @@ class BioHarmonicCouncilMesh:
             node.ingest_gossip([proposals[l_idx], proposals[r_idx]])
             node.reconcile_state()
 
-        leaves = [p["payload_hash"] for p in proposals]
-        global_root = hashlib.sha256("".join(sorted(leaves)).encode()).hexdigest()
+        # Sorted so the root does not depend on proposal order.
+        leaves = sorted(bytes.fromhex(p["payload_hash"]) for p in proposals)
+        global_root = merkle_root(leaves).hex()
         avg_vector = [round(sum(n.state_vector[a] for n in self.nodes) / len(self.nodes), 6) for a in range(3)]
         avg_ec = sum(p["energy_charge"] for p in proposals) / len(proposals)
         max_slip = max(p["step_slip"] for p in proposals)